@@ -0,0 +1,131 @@
+"""
+동시 연결 수에 따른 처리량 / 지연시간 (동기 라우트 vs async 라우트 + utils.data 비동기 API)
+  python -m benchmarks.bench_async [--posts 20000] [--connections 50 200 1000] [--seconds 5] [--backend json|sqlite]
+
+좋아요 API 를 두 가지로 띄운다.
+  - sync : 예전처럼 def 라우트가 요청 스레드에서 바로 저장소를 쓴다 (routers.likes 의 동기 함수를 그대로 호출)
+  - async: 지금의 routers.likes (async def + aread / awrite)
+--connections 개의 연결이 --seconds 초 동안 좋아요 상태 조회(80%) / 좋아요·취소(20%)를 계속 보내는 동안,
+연결 하나가 저장소를 거의 쓰지 않는 GET /posts (응답 캐시) 를 보내며 지연시간을 잰다.
+json 저장소(snapshot)는 좋아요 하나마다 likes/posts 파일을 다시 쓰므로 쓰기가 느리다.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.dataset import make_dataset
+
+
+def percentile(samples, q: float) -> float:
+    return samples[min(int(len(samples) * q), len(samples) - 1)] if samples else float("nan")
+
+
+def build_sync_app():
+    # 비동기 API 를 쓰기 전의 좋아요 라우트 (같은 동기 함수를 요청 스레드에서 바로 실행)
+    from fastapi import APIRouter, Depends, FastAPI, status
+
+    from routers import likes, posts
+    from utils.auth import get_current_identity
+
+    router = APIRouter(prefix="/likes")
+
+    @router.post("/posts/{postId}", status_code=status.HTTP_201_CREATED)
+    def like_post(postId: int, current_user: dict = Depends(get_current_identity)):
+        return likes._like_post(postId, current_user)
+
+    @router.delete("/posts/{postId}", status_code=status.HTTP_204_NO_CONTENT)
+    def unlike_post(postId: int, current_user: dict = Depends(get_current_identity)):
+        likes._unlike_post(postId, current_user)
+
+    @router.get("/posts/{postId}")
+    def get_like_status(postId: int, current_user: dict = Depends(get_current_identity)):
+        return likes._get_like_status(postId, current_user)
+
+    app = FastAPI()
+    app.include_router(router)
+    app.include_router(posts.router)
+    return app
+
+
+async def run_load(app, headers, post_ids, connections: int, seconds: float):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    counts = {"requests": 0, "errors": 0}
+    probe = []
+    deadline = time.perf_counter() + seconds
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def connection(index: int):
+            rng = random.Random(index)
+            header = headers[index % len(headers)]
+            while time.perf_counter() < deadline:
+                post_id = rng.choice(post_ids)
+                roll = rng.random()
+                if roll < 0.1:
+                    response = await client.post(f"/likes/posts/{post_id}", headers=header)
+                elif roll < 0.2:
+                    response = await client.delete(f"/likes/posts/{post_id}", headers=header)
+                else:
+                    response = await client.get(f"/likes/posts/{post_id}", headers=header)
+                counts["requests"] += 1
+                if response.status_code >= 500:
+                    counts["errors"] += 1
+
+        async def prober():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get("/posts?page=1&limit=20")
+                probe.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+                await asyncio.sleep(0.01)
+
+        started = time.perf_counter()
+        await asyncio.gather(prober(), *(connection(i) for i in range(connections)))
+        elapsed = time.perf_counter() - started
+    probe.sort()
+    return counts, elapsed, probe
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--connections", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    args = parser.parse_args()
+
+    root = make_dataset(posts=args.posts, users=args.users, comments=0, likes=0)
+    sys.path.insert(0, os.getcwd())
+    os.chdir(root)
+    os.environ["DATA_BACKEND"] = args.backend
+    if args.backend == "sqlite":
+        from utils.storage.migrate import migrate
+        migrate("data", os.path.join("data", "social.db"))
+
+    from main import app as async_app
+    from utils import data
+    from utils.auth import create_access_token
+
+    headers = [{"Authorization": "Bearer " + create_access_token({"sub": f"user-{i}"}, user={"nickname": f"닉네임{i}"})}
+               for i in range(args.users)]
+    post_ids = [p["postId"] for p in data.load_data("posts") if not p.get("is_deleted")][:1000]
+    sync_app = build_sync_app()
+
+    print(f"backend={args.backend} posts={args.posts} seconds={args.seconds}")
+    for connections in args.connections:
+        for label, app in (("sync", sync_app), ("async", async_app)):
+            counts, elapsed, probe = asyncio.run(run_load(app, headers, post_ids, connections, args.seconds))
+            data.close_async()
+            print(f"{connections:>5} conns {label:<5}  {counts['requests'] / elapsed:7.0f} req/s  "
+                  f"errors {counts['errors']:>4}  GET /posts p50 {statistics.median(probe) * 1e3:8.1f} ms  "
+                  f"p99 {percentile(probe, 0.99) * 1e3:8.1f} ms  ({len(probe)} probes)")
+
+
+if __name__ == "__main__":
+    main()
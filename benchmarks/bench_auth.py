@@ -0,0 +1,74 @@
+"""
+인증 캐시 / 토큰 클레임 전/후 비교 (get_current_user, get_current_identity)
+  python -m benchmarks.bench_auth [--users 1000] [--requests 20000] [--backend json|sqlite]
+
+유저 --users 명의 토큰을 돌려 가며
+  1) get_current_user 만 직접 호출한 지연시간 (토큰 검증 + 유저 조회)
+  2) get_current_identity 지연시간 (토큰 클레임만 보고 유저 조회 안 함)
+  3) GET /users/me 를 --requests 번 요청한 requests/sec
+를 인증 캐시를 끈 경우(AUTH_CACHE_SIZE=0 과 같음)와 켠 경우로 잰다.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from benchmarks.dataset import make_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    args = parser.parse_args()
+
+    root = make_dataset(posts=1_000, users=args.users, comments=0, likes=0)
+    sys.path.insert(0, os.getcwd())
+    os.chdir(root)
+    os.environ["DATA_BACKEND"] = args.backend
+    if args.backend == "sqlite":
+        from utils.storage.migrate import migrate
+        migrate("data", os.path.join("data", "social.db"))
+
+    from fastapi.testclient import TestClient
+    from main import app
+    from utils import auth
+
+    client = TestClient(app)
+    tokens = [auth.create_access_token({"sub": f"user-{i}"}, user={"nickname": f"닉네임{i}"})
+              for i in range(args.users)]
+    caches = [auth.token_cache, auth.user_cache]
+    sizes = [cache.max_size for cache in caches]
+
+    print(f"backend={args.backend} users={args.users} requests={args.requests}")
+    for enabled in (False, True):
+        for cache, size in zip(caches, sizes):
+            cache.clear()
+            cache.max_size = size if enabled else 0
+        label = "cache" if enabled else "off"
+
+        for dependency in (auth.get_current_user, auth.get_current_identity):
+            for token in tokens:  # 캐시 채우기 (끈 경우에는 저장소 캐시만 데워진다)
+                dependency(token)
+            samples = []
+            for i in range(args.requests):
+                token = tokens[i % len(tokens)]
+                started = time.perf_counter()
+                dependency(token)
+                samples.append(time.perf_counter() - started)
+            samples.sort()
+            print(f"{dependency.__name__:<20} {label:<5}  mean {statistics.fmean(samples) * 1e6:8.1f} us  "
+                  f"p99 {samples[int(len(samples) * 0.99)] * 1e6:8.1f} us")
+
+        started = time.perf_counter()
+        for i in range(args.requests):
+            response = client.get("/users/me", headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"})
+            assert response.status_code == 200, response.text
+        elapsed = time.perf_counter() - started
+        print(f"GET /users/me        {label:<5}  {args.requests / elapsed:8.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+load_data 캐시 전/후 처리량 비교
+  python -m benchmarks.bench_data_cache [--posts 100000] [--requests 50]
+
+캐시를 끈 상태(매 요청마다 json.load)와 켠 상태에서
+GET /comments/post/{postId}, GET /posts 의 requests/sec 를 잰다.
+"""
+import argparse
+import os
+import sys
+import time
+
+from benchmarks.dataset import make_dataset
+
+
+def measure(client, url: str, requests: int) -> float:
+    client.get(url)  # 워밍업 (캐시가 켜져 있으면 여기서 채워진다)
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url)
+        assert response.status_code == 200, response.text
+    return requests / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    root = make_dataset(posts=args.posts, comments=args.posts * 2, likes=args.posts)
+    sys.path.insert(0, os.getcwd())
+    os.chdir(root)
+
+    from fastapi.testclient import TestClient
+    from main import app
+    from utils import data
+
+    client = TestClient(app)
+    backend = data.get_backend()
+    urls = ["/comments/post/1", "/posts?page=1&limit=20"]
+
+    print(f"posts={args.posts} requests={args.requests}")
+    for url in urls:
+        backend.cache_enabled = False
+        backend.clear_cache()
+        before = measure(client, url, args.requests)
+
+        backend.cache_enabled = True
+        backend.clear_cache()
+        after = measure(client, url, args.requests)
+        print(f"{url:<28} no-cache {before:8.1f} req/s   cache {after:8.1f} req/s   x{after / before:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+데이터 파일 형식별 저장/읽기 시간과 파일 크기
+  python -m benchmarks.bench_formats [--sizes 10000,100000,1000000]
+
+posts 와 같은 모양의 레코드를 JSONFileBackend 로 저장(replace_all)하고
+캐시 없이 다시 읽어서(load_all) 형식마다 시간과 파일 크기를 잰다.
+(load 시간에는 파싱 뒤 Collection 인덱스를 만드는 시간도 들어 있다)
+msgpack 패키지가 없으면 msgpack 은 건너뛴다.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from utils import formats
+from utils.storage.json_backend import JSONFileBackend
+
+
+def make_posts(count: int):
+    rng = random.Random(0)
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    posts = []
+    for i in range(1, count + 1):
+        created_at = (base + timedelta(minutes=i)).isoformat()
+        posts.append({
+            "postId": i,
+            "userId": f"user-{rng.randrange(1_000)}",
+            "title": f"게시글 제목 {i}",
+            "content": f"클라우드 커뮤니티 본문 {i} " * 5,
+            "viewCount": rng.randrange(10_000),
+            "likeCount": rng.randrange(500),
+            "created_at": created_at,
+            "updated_at": created_at,
+            "is_deleted": False,
+        })
+    return posts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    args = parser.parse_args()
+
+    names = [formats.FORMAT_JSON, formats.FORMAT_JSON_COMPACT, formats.FORMAT_MSGPACK]
+    if formats.msgpack is None:
+        names.remove(formats.FORMAT_MSGPACK)
+    print(f"orjson={'yes' if formats.orjson else 'no'} msgpack={'yes' if formats.msgpack else 'no'}")
+    print(f"{'records':>9} {'format':<13} {'save':>9} {'load':>9} {'size':>14}")
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        posts = make_posts(size)
+        for name in names:
+            with tempfile.TemporaryDirectory(prefix="social-bench-") as data_dir:
+                backend = JSONFileBackend(data_dir, cache_enabled=False, data_format=name, shard_size=0)
+
+                started = time.perf_counter()
+                backend.replace_all("posts", posts)
+                save = time.perf_counter() - started
+
+                started = time.perf_counter()
+                loaded = backend.load_all("posts")
+                load = time.perf_counter() - started
+                assert len(loaded) == size
+
+                file_size = os.path.getsize(backend._path("posts"))
+            print(f"{size:>9} {name:<13} {save * 1000:>6.0f} ms {load * 1000:>6.0f} ms {file_size:>14,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+로그인 폭주 중 조회 지연시간 (비밀번호 해시 작업 프로세스 전/후)
+  python -m benchmarks.bench_login_storm [--logins 64] [--seconds 5] [--backend json|sqlite]
+
+--logins 개의 스레드가 --seconds 초 동안 POST /auth/tokens 를 계속 보내는 동안
+스레드 하나가 GET /posts/{postId} 를 순서대로 보내며 지연시간을 잰다.
+  - idle   : 로그인 없음 (기준)
+  - inline : 요청 스레드에서 바로 argon2 계산, 대기열 제한 없음 (PASSWORD_WORKERS=0 과 같음)
+  - pool   : 작업 프로세스 PASSWORD_WORKERS 개 + 대기열 PASSWORD_QUEUE_SIZE (넘치면 503, 클라이언트는 Retry-After 뒤 재시도)
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+from benchmarks.dataset import make_dataset
+
+
+def percentile(samples, q: float) -> float:
+    return samples[min(int(len(samples) * q), len(samples) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    args = parser.parse_args()
+
+    root = make_dataset(posts=10_000, users=args.logins, comments=0, likes=0)
+    sys.path.insert(0, os.getcwd())
+    os.chdir(root)
+
+    from utils.password_pool import check_password, hash_password
+    # make_dataset 의 비밀번호는 진짜 해시가 아니므로 json 파일에서 모두 같은 비밀번호로 바꾼 뒤 옮긴다
+    from utils import data
+    password_hash = hash_password("Passw0rd!")
+    data.update_records("users", {u["userId"]: {"password": password_hash} for u in data.load_data("users")})
+    if args.backend == "sqlite":
+        from utils.storage.migrate import migrate
+        migrate("data", os.path.join("data", "social.db"))
+        data.DATA_BACKEND = args.backend
+        data.set_backend(None)
+
+    from fastapi.testclient import TestClient
+    from main import app
+    from utils.password_pool import PASSWORD_QUEUE_SIZE, PASSWORD_WORKERS, password_pool
+
+    client = TestClient(app)
+
+    def login_loop(index: int, stop: Event, counts: dict):
+        form = {"username": f"user{index}@example.com", "password": "Passw0rd!"}
+        while not stop.is_set():
+            response = client.post("/auth/tokens", data=form)
+            counts[response.status_code] = counts.get(response.status_code, 0) + 1
+            if response.status_code == 503:
+                stop.wait(float(response.headers["Retry-After"]))  # 클라이언트는 Retry-After 만큼 쉬었다가 다시 보낸다
+
+    modes = [("idle", None), ("inline", (0, 10 ** 9)), ("pool", (PASSWORD_WORKERS, PASSWORD_QUEUE_SIZE))]
+    print(f"backend={args.backend} logins={args.logins} seconds={args.seconds} "
+          f"workers={PASSWORD_WORKERS} queue={PASSWORD_QUEUE_SIZE}")
+    for label, setting in modes:
+        stop, counts = Event(), {}
+        with ThreadPoolExecutor(args.logins) as pool:
+            if setting is not None:
+                password_pool.workers, password_pool.queue_size = setting
+                password_pool.run(check_password, password_hash, "warm-up")  # 작업 프로세스 미리 띄우기
+                loops = [pool.submit(login_loop, i, stop, counts) for i in range(args.logins)]
+                time.sleep(0.5)  # 폭주가 자리 잡을 때까지
+
+            samples = []
+            deadline = time.perf_counter() + args.seconds
+            post_id = 0
+            while time.perf_counter() < deadline:
+                post_id = post_id % 10_000 + 1
+                started = time.perf_counter()
+                status = client.get(f"/posts/{post_id}").status_code
+                samples.append(time.perf_counter() - started)
+                assert status in (200, 404), status
+            stop.set()
+            if setting is not None:
+                for loop in loops:
+                    loop.result()
+
+        samples.sort()
+        logins = " ".join(f"{code}:{n}" for code, n in sorted(counts.items())) or "-"
+        print(f"{label:<7} reads {len(samples):>6}  p50 {statistics.median(samples) * 1e3:8.2f} ms  "
+              f"p99 {percentile(samples, 0.99) * 1e3:8.2f} ms  max {samples[-1] * 1e3:8.2f} ms  logins {logins}")
+    password_pool.close()
+
+
+if __name__ == "__main__":
+    main()
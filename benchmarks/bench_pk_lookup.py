@@ -0,0 +1,39 @@
+"""
+기본키 조회 지연시간 (선형 탐색 vs 기본키 인덱스)
+  python -m benchmarks.bench_pk_lookup
+
+컬렉션 크기가 1k -> 1M 으로 커져도 인덱스 조회 시간은 거의 그대로여야 한다.
+"""
+import random
+import time
+
+from utils.storage.collection import Collection
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def per_call_us(fn, keys) -> float:
+    started = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return (time.perf_counter() - started) / len(keys) * 1_000_000
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'records':>10} {'linear scan':>14} {'pk index':>12}")
+    for size in SIZES:
+        records = [{"postId": i, "title": f"post {i}"} for i in range(1, size + 1)]
+        collection = Collection("posts", records)
+        keys = [rng.randint(1, size) for _ in range(10_000)]
+
+        linear = per_call_us(
+            lambda k: next((p for p in records if p["postId"] == k), None),
+            keys[:max(10, 20_000_000 // size // 100)],
+        )
+        indexed = per_call_us(collection.get, keys)
+        print(f"{size:>10} {linear:>11.1f} us {indexed:>9.3f} us")
+
+
+if __name__ == "__main__":
+    main()
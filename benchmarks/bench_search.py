@@ -0,0 +1,84 @@
+"""
+게시글 검색 지연시간 (전체 훑기 vs 역색인)
+  python -m benchmarks.bench_search [--posts 1000000] [--repeat 5]
+
+단어 묶음으로 제목/본문을 만든 게시글을 메모리 Collection 에 올리고,
+예전 search_posts 처럼 모든 게시글의 제목/본문을 소문자로 바꿔 부분 문자열로 찾는 시간과
+TextIndex(utils.search) 로 찾는 시간을 검색어마다 잰다 (중앙값).
+색인 시간에는 Collection 의 다른 인덱스를 만드는 시간도 들어 있다.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from utils.storage.collection import Collection
+
+WORDS = (
+    "클라우드 커뮤니티 서버 배포 컨테이너 쿠버네티스 네트워크 보안 데이터베이스 캐시 "
+    "로그 모니터링 장애 자동화 파이프라인 비용 최적화 스터디 후기 질문 "
+    "AWS EC2 S3 Lambda Python FastAPI Docker Terraform"
+).split()
+QUERIES = ["쿠버네티스", "네트워크 보안", "스터디 후기", "aws lambda", "Terraform", "없는검색어"]
+
+
+def make_posts(count: int):
+    rng = random.Random(0)
+    # 실제 글처럼 어휘가 넓도록 임의의 한글 단어 2만 개를 섞는다 (WORDS 는 그중 일부로 가끔 나온다)
+    vocabulary = [
+        "".join(chr(rng.randrange(0xAC00, 0xD7A4)) for _ in range(rng.randint(2, 4)))
+        for _ in range(20_000)
+    ] + WORDS * 20
+    posts = []
+    for i in range(1, count + 1):
+        posts.append({
+            "postId": i,
+            "userId": f"user-{rng.randrange(1_000)}",
+            "title": " ".join(rng.choices(vocabulary, k=3)) + f" {i}",
+            "content": " ".join(rng.choices(vocabulary, k=12)),
+            "viewCount": 0,
+            "likeCount": 0,
+            "created_at": f"{i:012d}",
+            "is_deleted": False,
+        })
+    return posts
+
+
+def scan(posts, keyword: str) -> int:
+    keyword = keyword.lower()
+    return sum(
+        1 for post in posts
+        if not post.get("is_deleted")
+        and (keyword in post["title"].lower() or keyword in post["content"].lower())
+    )
+
+
+def timed(fn, repeat: int):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    posts = make_posts(args.posts)
+    started = time.perf_counter()
+    collection = Collection("posts", posts)
+    print(f"{args.posts} posts, index build {time.perf_counter() - started:.1f} s")
+    print(f"{'keyword':<16} {'scan':>10} {'index':>10} {'scan hits':>10} {'index hits':>10}")
+
+    for keyword in QUERIES:
+        scan_ms, scan_hits = timed(lambda: scan(posts, keyword), args.repeat)
+        index_ms, scores = timed(lambda: collection.search("text", keyword), args.repeat)
+        print(f"{keyword:<16} {scan_ms:>7.1f} ms {index_ms:>7.1f} ms {scan_hits:>10} {len(scores):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+같은 요청이 한꺼번에 몰릴 때 single-flight 전/후 비교
+  python -m benchmarks.bench_singleflight [--posts 20000] [--clients 50] [--rounds 5]
+
+저장소 캐시와 응답 캐시를 끈 상태(매 요청마다 파일을 읽고 파싱)에서
+--clients 개의 스레드가 같은 URL 을 동시에 요청하는 것을 --rounds 번 반복하고,
+합치기를 끈 경우와 켠 경우의 걸린 시간, 프로세스 CPU 시간, 실제 계산 횟수/합쳐진 요청 수를 잰다.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+from benchmarks.dataset import make_dataset
+
+
+def burst(client, url: str, clients: int, rounds: int):
+    barrier = Barrier(clients)
+
+    def request(_):
+        barrier.wait()  # 모두 같이 출발
+        response = client.get(url)
+        assert response.status_code == 200, response.text
+
+    started, cpu = time.perf_counter(), time.process_time()
+    with ThreadPoolExecutor(clients) as pool:
+        for _ in range(rounds):
+            list(pool.map(request, range(clients)))
+    return time.perf_counter() - started, time.process_time() - cpu
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=20_000)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    root = make_dataset(posts=args.posts, comments=args.posts * 2, likes=args.posts)
+    sys.path.insert(0, os.getcwd())
+    os.chdir(root)
+    os.environ["RESPONSE_CACHE_MAX_BYTES"] = "0"
+
+    from fastapi.testclient import TestClient
+    from main import app
+    from utils import data
+    from utils.response_cache import response_flight
+
+    client = TestClient(app)
+    backend = data.get_backend()
+    backend.cache_enabled = False
+    flights = [response_flight, data.load_flight]
+
+    print(f"posts={args.posts} clients={args.clients} rounds={args.rounds}")
+    for url in ["/comments/post/1", "/posts?page=1&limit=20"]:
+        for enabled in (False, True):
+            for flight in flights:
+                flight.enabled = enabled
+            before = response_flight.stats()
+            wall, cpu = burst(client, url, args.clients, args.rounds)
+            after = response_flight.stats()
+            executions = after["executions"] - before["executions"]
+            coalesced = after["coalesced"] - before["coalesced"]
+            label = "single-flight" if enabled else "off"
+            print(f"{url:<24} {label:<13} {wall:6.2f} s  cpu {cpu:6.2f} s  "
+                  f"handler runs {executions if enabled else args.clients * args.rounds:>4}  coalesced {coalesced:>4}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+앞쪽 k 개 고르기: 전체 정렬 vs heapq.nlargest (utils.storage.topk 의 경계값 정하기)
+  python -m benchmarks.bench_topk [--sizes 1000,10000,100000] [--limit 20]
+
+조회수(viewCount, 동점이 많음)로 게시글을 고를 때 page 를 늘려 가며 (k = page * limit)
+두 방법의 시간을 재고, 결과가 같은지(동점 순서 포함) 확인한다.
+힙이 정렬보다 느려지기 시작하는 k / n 이 TOPK_MAX_RATIO 의 근거이다.
+"""
+import argparse
+import heapq
+import random
+import time
+
+from utils.storage.topk import TOPK_MAX_RATIO
+
+
+def make_posts(count: int):
+    rng = random.Random(0)
+    return [{"postId": i, "viewCount": rng.randrange(count // 10 + 1)} for i in range(1, count + 1)]
+
+
+def timed(fn, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    def key(post):
+        return post["viewCount"]
+
+    print(f"TOPK_MAX_RATIO = {TOPK_MAX_RATIO}")
+    print(f"{'rows':>8} {'page':>6} {'k/n':>7} {'sort':>10} {'heap':>10}  faster")
+    for size in (int(s) for s in args.sizes.split(",")):
+        posts = make_posts(size)
+        repeat = max(1, 200_000 // size)
+        crossover = None
+        for ratio in (0.001, 0.005, 0.01, 0.02, 0.03, 0.05, 0.1, 0.2, 0.5):
+            page = max(1, int(size * ratio) // args.limit)
+            k = page * args.limit
+            sort_ms, by_sort = timed(lambda: sorted(posts, key=key, reverse=True)[:k], repeat)
+            heap_ms, by_heap = timed(lambda: heapq.nlargest(k, posts, key=key), repeat)
+            assert by_sort == by_heap  # 동점 순서까지 같다
+            if crossover is None and heap_ms > sort_ms:
+                crossover = k / size
+            print(f"{size:>8} {page:>6} {k / size:>7.3f} {sort_ms:>7.2f} ms {heap_ms:>7.2f} ms"
+                  f"  {'heap' if heap_ms < sort_ms else 'sort'}")
+        print(f"{size:>8} heap slower from k/n = {crossover}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+벤치마크용 가짜 데이터 생성기
+- 임시 폴더에 users/posts/comments/likes json 파일을 만든다.
+- 벤치마크 스크립트는 이 폴더로 chdir 한 뒤 앱을 불러온다 (DATA_DIR 이 상대경로이므로).
+"""
+import json
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+
+def make_dataset(posts: int = 100_000, users: int = 1_000,
+                 comments: int = 200_000, likes: int = 100_000,
+                 seed: int = 42) -> str:
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    root = tempfile.mkdtemp(prefix="social-bench-")
+    data_dir = os.path.join(root, "data")
+    os.makedirs(data_dir)
+
+    user_rows = [
+        {
+            "userId": f"user-{i}",
+            "email": f"user{i}@example.com",
+            "name": f"user{i}",
+            "password": "not-a-real-hash",
+            "nickname": f"닉네임{i}",
+            "profile_image": None,
+            "created_at": base.isoformat(),
+            "is_deleted": False,
+            "deleted_at": None,
+        }
+        for i in range(users)
+    ]
+    post_rows = []
+    for i in range(1, posts + 1):
+        created_at = (base + timedelta(minutes=i)).isoformat()
+        post_rows.append({
+            "postId": i,
+            "userId": f"user-{rng.randrange(users)}",
+            "title": f"게시글 제목 {i}",
+            "content": f"클라우드 커뮤니티 본문 {i} " * 5,
+            "viewCount": rng.randrange(10_000),
+            "likeCount": rng.randrange(500),
+            "created_at": created_at,
+            "updated_at": created_at,
+            "is_deleted": rng.random() < 0.02,
+        })
+    comment_rows = []
+    for i in range(1, comments + 1):
+        created_at = (base + timedelta(seconds=30 * i)).isoformat()
+        comment_rows.append({
+            "commentId": i,
+            "postId": rng.randrange(1, posts + 1),
+            "userId": f"user-{rng.randrange(users)}",
+            "content": f"댓글 {i}",
+            "created_at": created_at,
+            "updated_at": created_at,
+            "is_deleted": False,
+        })
+    like_rows = [
+        {
+            "likeId": i,
+            "postId": rng.randrange(1, posts + 1),
+            "userId": f"user-{rng.randrange(users)}",
+            "created_at": (base + timedelta(seconds=45 * i)).isoformat(),
+            "is_deleted": False,
+        }
+        for i in range(1, likes + 1)
+    ]
+
+    for name, rows in (("users", user_rows), ("posts", post_rows),
+                       ("comments", comment_rows), ("likes", like_rows)):
+        with open(os.path.join(data_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=4)
+    return root
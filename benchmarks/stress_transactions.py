@@ -0,0 +1,94 @@
+"""
+동시 쓰기 스트레스 테스트 (업데이트 유실 확인)
+  python -m benchmarks.stress_transactions [--threads 16] [--rounds 50] [--backend json|sqlite]
+
+여러 스레드가 같은 게시글 몇 개에 좋아요/좋아요 취소/댓글 작성을 동시에 보낸 뒤
+- 게시글마다 likeCount == 활성 좋아요 수
+- 좋아요는 (게시글, 사용자)마다 최대 하나
+- 성공 응답을 받은 댓글이 모두 저장되어 있고 commentId 가 겹치지 않음
+을 확인한다. 하나라도 어긋나면 AssertionError 로 끝난다.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.dataset import make_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--posts", type=int, default=5)
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    args = parser.parse_args()
+
+    root = make_dataset(posts=args.posts, users=args.threads, comments=0, likes=0)
+    sys.path.insert(0, os.getcwd())
+    os.chdir(root)
+    os.environ["DATA_BACKEND"] = args.backend
+    if args.backend == "sqlite":
+        from utils.storage.migrate import migrate
+        migrate("data", os.path.join("data", "social.db"))
+
+    from fastapi.testclient import TestClient
+    from main import app
+    from utils import data
+    from utils.auth import create_access_token
+
+    # make_dataset 이 만든 게시글은 모두 좋아요 0 으로 시작한다
+    data.update_records("posts", {p["postId"]: {"likeCount": 0, "is_deleted": False}
+                                  for p in data.load_data("posts")})
+    post_ids = [p["postId"] for p in data.load_data("posts")]
+
+    client = TestClient(app)
+
+    def worker(index: int):
+        rng = random.Random(index)
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': f'user-{index}'})}"}
+        created = []
+        for _ in range(args.rounds):
+            post_id = rng.choice(post_ids)
+            action = rng.random()
+            if action < 0.4:
+                response = client.post(f"/likes/posts/{post_id}", headers=headers)
+                assert response.status_code in (201, 409), response.text
+            elif action < 0.7:
+                response = client.delete(f"/likes/posts/{post_id}", headers=headers)
+                assert response.status_code in (204, 404), response.text
+            else:
+                response = client.post(f"/comments/post/{post_id}", headers=headers,
+                                       json={"content": f"stress {index}"})
+                assert response.status_code == 201, response.text
+                created.append(response.json()["data"]["commentId"])
+        return created
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        created = [cid for ids in pool.map(worker, range(args.threads)) for cid in ids]
+    elapsed = time.perf_counter() - started
+
+    # 캐시가 아닌 저장소에서 다시 읽어서 확인
+    data.clear_cache()
+    likes = [l for l in data.load_data("likes") if not l.get("is_deleted")]
+    active = Counter(l["postId"] for l in likes)
+    pairs = Counter((l["postId"], l["userId"]) for l in likes)
+    for post in data.load_data("posts"):
+        assert post["likeCount"] == active[post["postId"]], (post["postId"], post["likeCount"], active[post["postId"]])
+    assert all(n == 1 for n in pairs.values()), "같은 사용자의 좋아요가 중복 저장됨"
+
+    stored = [c["commentId"] for c in data.load_data("comments")]
+    assert len(created) == len(set(created)), "commentId 중복 발급"
+    assert sorted(stored) == sorted(created), "저장되지 않은 댓글이 있음"
+
+    total = args.threads * args.rounds
+    print(f"backend={args.backend} threads={args.threads} requests={total} "
+          f"{total / elapsed:.1f} req/s  likes={len(likes)} comments={len(stored)}  OK")
+
+
+if __name__ == "__main__":
+    main()
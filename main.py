@@ -1,7 +1,27 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from routers import users, auth, posts, comments, likes
+from utils.auth import revoked_claims, token_cache, user_cache
+from utils.password_pool import password_pool
+from utils.data import close_async, load_flight, set_backend
+from utils.response_cache import response_cache, response_flight
+from utils.view_counter import view_counter
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # 종료 시 메모리에 모아 둔 조회수 저장
+    view_counter.close()
+    password_pool.close()
+    # 쓰기 큐에 남은 작업 마무리
+    close_async()
+    # 저장소 정리 (json 샤드 매니페스트 저장, sqlite 연결 닫기)
+    set_backend(None)
 
-app = FastAPI(title="Social Media API")
+
+app = FastAPI(title="Social Media API", lifespan=lifespan)
 
 app.include_router(users.router)
 app.include_router(posts.router)
@@ -11,4 +31,25 @@ app.include_router(auth.router)
 
 @app.get("/")
 def home():
-    return {"message": "서버 정상 가동 중. /docs로 접속하세요."}
\ No newline at end of file
+    return {"message": "서버 정상 가동 중. /docs로 접속하세요."}
+
+
+@app.get("/metrics")
+def metrics():
+    # 응답/인증 캐시 적중/실패 횟수, 합쳐진 동시 요청 수 등 (운영 확인용)
+    return {
+        "status": "success",
+        "data": {
+            "response_cache": response_cache.stats(),
+            "auth_cache": {
+                "tokens": token_cache.stats(),
+                "users": user_cache.stats(),
+                "revoked_claims": revoked_claims.stats(),
+            },
+            "password_pool": password_pool.stats(),
+            "single_flight": {
+                "responses": response_flight.stats(),
+                "load_data": load_flight.stats(),
+            },
+        },
+    }
\ No newline at end of file
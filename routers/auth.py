@@ -1,15 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
-from utils.auth import verify_password, create_access_token
-from utils.data import load_data
+from schemas.user import TokenRefresh
+from utils.auth import (
+    ACCESS_TOKEN_EXPIRE_MINUTES, averify_password, create_access_token, create_refresh_token,
+    load_active_user, password_needs_rehash, rehash_password, token_claims, token_version,
+)
+from utils.data import find_user_by_id, aread
+from utils.user_directory import user_directory
 
 router = APIRouter(prefix="/auth",tags=["Auth"])
 
-@router.post("/tokens")
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    users = load_data("users")
-    matched_user = None
+# 라우트는 async def. 유저 레코드는 utils.data 의 aread 로 읽고, 비밀번호 확인은 averify_password 로 await 한다
+
 
+@router.post("/tokens")
+async def login(background_tasks: BackgroundTasks, form_data: OAuth2PasswordRequestForm = Depends()):
     username_input = form_data.username.strip()
 
     if not username_input:
@@ -23,23 +28,22 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
             }
         )
 
-    for user in users:
-        email = user.get("email")
-        if (
-            email  # None이거나 ""이면 False
-            and email.lower() == username_input.lower()
-            and not user.get("is_deleted", False)
-        ):
-            matched_user = user
-            break
-
-    if matched_user and verify_password(form_data.password, matched_user["password"]):
+    matched_user = await aread(_find_login_user, username_input)
+
+    if matched_user and await averify_password(form_data.password, matched_user["password"]):
+        # 해시 비용(ARGON2_*)이 바뀌었으면 응답을 보낸 뒤 새 비용으로 다시 저장한다
+        if password_needs_rehash(matched_user["password"]):
+            background_tasks.add_task(
+                rehash_password, matched_user["userId"], matched_user["password"], form_data.password
+            )
         access_token = create_access_token(
-            data={"sub": matched_user["userId"]}
+            data={"sub": matched_user["userId"]}, user=matched_user
         )
         return{
             "access_token": access_token,
             "token_type": "bearer",
+            "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            "refresh_token": create_refresh_token({"sub": matched_user["userId"]}, user=matched_user),
              }
 
 
@@ -51,4 +55,31 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
                 "message": "이메일 또는 비밀번호가 일치하지 않습니다."
             }
         }
-    )
\ No newline at end of file
+    )
+
+
+def _find_login_user(email: str):
+    # 이메일(대소문자 무시) -> userId 는 유저 디렉터리에서 찾는다 (탈퇴한 유저는 없음)
+    user_id = user_directory.user_id_by_email(email)
+    return find_user_by_id(user_id) if user_id is not None else None
+
+
+@router.post("/refresh")
+async def refresh(data: TokenRefresh):
+    # refresh token 으로 새 access token 받기 (유저 레코드를 읽어서 닉네임 클레임도 최신 값으로)
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail={"status": "error", "data": {"message": "유효하지 않은 refresh token 입니다."}}
+    )
+    claims = token_claims(data.refresh_token, token_type="refresh")
+    if claims is None:
+        raise invalid
+    user = await aread(load_active_user, claims["sub"])  # 없으면 401, 탈퇴했으면 403
+    # 발급 뒤에 비밀번호를 바꿨으면 (token_version 이 다르면) 다시 로그인해야 한다
+    if claims.get("ver") != token_version(user):
+        raise invalid
+    return {
+        "access_token": create_access_token(data={"sub": user["userId"]}, user=user),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
@@ -2,63 +2,60 @@ from operator import length_hint
 
 from fastapi import APIRouter, status, Query, Depends, HTTPException
 from schemas.comment import CommentCreate, CommentUpdate
-from utils.auth import get_current_user
-from utils.data import load_data, save_data, get_user_nickname_map
+from utils.auth import get_current_identity
+from utils.data import (
+    get_record, get_records, transaction,
+    insert_record, update_record, soft_delete_record, next_id,
+    aread, awrite,
+)
+from utils.pagination import paginate
+from utils.response_cache import cached
+from utils.user_directory import user_directory
 from datetime import datetime, timezone
+from typing import Optional
 router = APIRouter(prefix="/comments", tags=["Comments"])
 
+# 라우트는 async def 이고, 저장소를 쓰는 부분(잠금 포함)은 동기 함수로 두고 utils.data 의 aread / awrite 로 실행한다 (routers.likes 와 같음)
+
 @router.get("/post/{postId}") # 특정 게시글의 댓글 목록
-def get_comments(
+@cached("posts", "comments", "users")
+async def get_comments(
     postId: int,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),  # 이전 응답의 next_cursor (있으면 page 대신 사용)
 ):
-    #데이터 로드
-    comments = load_data("comments")
-    users = load_data("users")
-    posts = load_data("posts")
+    return await aread(_get_comments, postId, page, limit, cursor)
+
 
+def _get_comments(postId: int, page: int, limit: int, cursor: Optional[str]):
     # 게시글 존재확인
-    post = next(
-        (p for p in posts if p["postId"] == postId),
-        None
-    )
-    if post is None or post.get("is_deleted"):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "status": "error",
-                "data": {"message": "존재하지 않는 게시글입니다."}
-            }
+    with transaction(read=["posts", "comments"]):
+        post = get_record("posts", postId)
+        if post is None or post.get("is_deleted"):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "status": "error",
+                    "data": {"message": "존재하지 않는 게시글입니다."}
+                }
+            )
+        # 해당 게시글의 댓글만 최신순으로 현재 페이지 구간만 (삭제 안된것만)
+        paged_comments, total, next_cursor = paginate(
+            "comments",
+            where={"postId": postId},
+            order_by="created_at",
+            page=page,
+            limit=limit,
+            cursor=cursor,
         )
-    # 해당 게시글의 댓글 필터일(삭제 안된것만)
-    post_comments = [
-        c for c in comments
-        if c.get("postId") == postId
-        and not c.get("is_deleted",False)
-    ]
-
-    #최신순 정렬
-    post_comments.sort(
-        key=lambda c: c.get("created_at", ""),
-        reverse=True
-    )
-
-    # 페이지네이션
-    total = len(post_comments)
-    start = (page - 1) * limit
-    end = start + limit
-    paged_comments = post_comments[start:end]
-
-    # 작성자 닉네임 매핑
-    user_map = get_user_nickname_map(users)
 
-    # 응답
+    # 응답 (작성자 닉네임은 유저 디렉터리에서)
     data = [
         {
             "commentId": c["commentId"],
             "content": c["content"],
-            "nickname": user_map.get(c["userId"], "알 수 없음"),
+            "nickname": user_directory.nickname(c["userId"]),
             "created_at": c["created_at"],
             "updated_at": c.get("updated_at"),
         }
@@ -71,15 +68,20 @@ def get_comments(
             "page": page,
             "limit": limit,
             "total": total,
+            "next_cursor": next_cursor,
         }
     }
 
 @router.post("/post/{postId}", status_code=status.HTTP_201_CREATED)
-def create_comment(
+async def create_comment(
     postId: int,
     data: CommentCreate,
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(get_current_identity),
 ):
+    return await awrite(_create_comment, postId, data, current_user)
+
+
+def _create_comment(postId: int, data: CommentCreate, current_user: dict):
     #내용 검증
     if not data.content.strip():
         raise HTTPException(
@@ -90,36 +92,31 @@ def create_comment(
             }
         )
     # 존재 확인
-    posts = load_data("posts")
-    post = next(
-        (p for p in posts if p.get("postId") == postId),
-        None
-    )
+    with transaction(read=["posts"], write=["comments"]):
+        post = get_record("posts", postId)
 
-    if post is None or post.get("is_deleted"):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "status": "error",
-                "data": {"message": "존재하지 않는 게시글입니다."}
-            }
-        )
-    comments = load_data("comments")
-    new_comment_id = max([c.get("commentId", 0) for c in comments], default=0) + 1
-
-    created_at = datetime.now(timezone.utc).isoformat()
-
-    new_comment = {
-        "commentId": new_comment_id,
-        "postId": postId,  # 어느 게시글의 댓글인지
-        "userId": current_user["userId"],  # 댓글 작성자
-        "content": data.content.strip(),
-        "created_at": created_at,
-        "updated_at": created_at,
-        "is_deleted": False,
-    }
-    comments.append(new_comment)
-    save_data("comments", comments)
+        if post is None or post.get("is_deleted"):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "status": "error",
+                    "data": {"message": "존재하지 않는 게시글입니다."}
+                }
+            )
+        new_comment_id = next_id("comments")
+
+        created_at = datetime.now(timezone.utc).isoformat()
+
+        new_comment = {
+            "commentId": new_comment_id,
+            "postId": postId,  # 어느 게시글의 댓글인지
+            "userId": current_user["userId"],  # 댓글 작성자
+            "content": data.content.strip(),
+            "created_at": created_at,
+            "updated_at": created_at,
+            "is_deleted": False,
+        }
+        insert_record("comments", new_comment)
 
     # ⑧ 응답
     return {
@@ -134,62 +131,62 @@ def create_comment(
     }
 
 @router.patch("/{commentId}")
-def update_comment(
+async def update_comment(
         commentId: int,
         data: CommentUpdate,
-        current_user: dict = Depends(get_current_user),
+        current_user: dict = Depends(get_current_identity),
 ):
     """
     댓글 수정
     - 로그인 필수
     - 본인 댓글만 수정 가능
     """
-    # 댓글 불러오기
-    comments = load_data("comments")
+    return await awrite(_update_comment, commentId, data, current_user)
 
-    # 댓글 찾기
-    comment = next(
-        (c for c in comments if c["commentId"] == commentId),
-        None
-    )
-
-    # 댓글 존재 확인
-    if comment is None or comment.get("is_deleted"):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "status": "error",
-                "data": {"message": "존재하지 않는 댓글입니다."}
-            }
-        )
 
-    # 권한 확인 (본인 댓글인지)
-    if comment["userId"] != current_user["userId"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "status": "error",
-                "data": {"message": "댓글을 수정할 권한이 없습니다."}
-            }
-        )
+def _update_comment(commentId: int, data: CommentUpdate, current_user: dict):
+    # 댓글 찾기
+    with transaction(write=["comments"]):
+        comment = get_record("comments", commentId)
 
-    # 내용 수정
-    if data.content is not None:
-        if not data.content.strip():
+        # 댓글 존재 확인
+        if comment is None or comment.get("is_deleted"):
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
+                status_code=status.HTTP_404_NOT_FOUND,
                 detail={
                     "status": "error",
-                    "data": {"message": "댓글 내용은 비어있을 수 없습니다."}
+                    "data": {"message": "존재하지 않는 댓글입니다."}
                 }
             )
-        comment["content"] = data.content.strip()
 
-    # 수정 시간 업데이트
-    comment["updated_at"] = datetime.now(timezone.utc).isoformat()
+        # 권한 확인 (본인 댓글인지)
+        if comment["userId"] != current_user["userId"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail={
+                    "status": "error",
+                    "data": {"message": "댓글을 수정할 권한이 없습니다."}
+                }
+            )
 
-    # 저장
-    save_data("comments", comments)
+        # 내용 수정
+        changes = {}
+        if data.content is not None:
+            if not data.content.strip():
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail={
+                        "status": "error",
+                        "data": {"message": "댓글 내용은 비어있을 수 없습니다."}
+                    }
+                )
+            changes["content"] = data.content.strip()
+
+        # 수정 시간 업데이트
+        changes["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+        # 저장
+        comment = update_record("comments", commentId, changes)
 
     # 응답
     return {
@@ -202,93 +199,81 @@ def update_comment(
         }
     }
 @router.delete("/{commentId}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_comment(
+async def delete_comment(
         commentId: int,
-        current_user: dict = Depends(get_current_user),
+        current_user: dict = Depends(get_current_identity),
 ):
     """
     댓글 삭제
     - 로그인 필수
     - 본인 댓글만 삭제 가능
     """
-    # 댓글 불러오기
-    comments = load_data("comments")
+    await awrite(_delete_comment, commentId, current_user)
 
-    # 댓글 찾기
-    comment = next(
-        (c for c in comments if c["commentId"] == commentId),
-        None
-    )
 
-    #  댓글 존재 확인
-    if comment is None or comment.get("is_deleted"):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "status": "error",
-                "data": {"message": "존재하지 않는 댓글입니다."}
-            }
-        )
+def _delete_comment(commentId: int, current_user: dict):
+    # 댓글 찾기
+    with transaction(write=["comments"]):
+        comment = get_record("comments", commentId)
 
-    # 권한 확인 (본인 댓글인지)
-    if comment["userId"] != current_user["userId"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "status": "error",
-                "data": {"message": "댓글을 삭제할 권한이 없습니다."}
-            }
-        )
+        #  댓글 존재 확인
+        if comment is None or comment.get("is_deleted"):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "status": "error",
+                    "data": {"message": "존재하지 않는 댓글입니다."}
+                }
+            )
 
-    comment["is_deleted"] = True
-    comment["updated_at"] = datetime.now(timezone.utc).isoformat()
+        # 권한 확인 (본인 댓글인지)
+        if comment["userId"] != current_user["userId"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail={
+                    "status": "error",
+                    "data": {"message": "댓글을 삭제할 권한이 없습니다."}
+                }
+            )
 
-    # 저장
-    save_data("comments", comments)
+        # 저장
+        soft_delete_record("comments", commentId, {"updated_at": datetime.now(timezone.utc).isoformat()})
 
     # 응답
     return
 @router.get("/me")
-def get_my_comments(
+async def get_my_comments(
         page: int = Query(1, ge=1),
         limit: int = Query(20, ge=1, le=100),
-        current_user: dict = Depends(get_current_user),
+        cursor: Optional[str] = Query(None),
+        current_user: dict = Depends(get_current_identity),
 ):
     """
     내가 쓴 댓글 목록
     - 로그인 필수
     """
-    # 데이터 로드
-    comments = load_data("comments")
-    posts = load_data("posts")
-
-    # 내가 쓴 댓글만 필터링 (삭제 안 된 것만)
-    my_comments = [
-        c for c in comments
-        if c["userId"] == current_user["userId"]
-           and not c.get("is_deleted", False)
-    ]
-
-    # 최신순 정렬
-    my_comments.sort(
-        key=lambda c: c.get("created_at", ""),
-        reverse=True
-    )
+    return await aread(_get_my_comments, page, limit, cursor, current_user)
+
+
+def _get_my_comments(page: int, limit: int, cursor: Optional[str], current_user: dict):
+    # 내가 쓴 댓글만 최신순으로 현재 페이지 구간만 (삭제 안 된 것만)
+    with transaction(read=["posts", "comments"]):
+        paged_comments, total, next_cursor = paginate(
+            "comments",
+            where={"userId": current_user["userId"]},
+            order_by="created_at",
+            page=page,
+            limit=limit,
+            cursor=cursor,
+        )
 
-    # 페이지네이션
-    total = len(my_comments)
-    start = (page - 1) * limit
-    end = start + limit
-    paged_comments = my_comments[start:end]
+        # 이번 페이지 댓글이 달린 게시글을 한 번에 찾는다
+        posts = get_records("posts", {c["postId"] for c in paged_comments})
 
     # 게시글 정보 포함해서 응답 데이터 생성
     data = []
     for c in paged_comments:
-        # 댓글이 달린 게시글 찾기
-        post = next(
-            (p for p in posts if p["postId"] == c["postId"]),
-            None
-        )
+        post = posts.get(c["postId"])
 
         data.append({
             "commentId": c["commentId"],
@@ -305,5 +290,6 @@ def get_my_comments(
             "page": page,
             "limit": limit,
             "total": total,
+            "next_cursor": next_cursor,
         }
     }
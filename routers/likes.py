@@ -1,258 +1,230 @@
-from fastapi import APIRouter, status, Depends, HTTPException
-from utils.auth import get_current_user
-from utils.data import load_data, save_data
+from fastapi import APIRouter, status, Query, Depends, HTTPException
+from utils.auth import get_current_identity
+from utils.data import (
+    get_record, get_records, find_by, transaction,
+    insert_record, update_record, soft_delete_record, next_id,
+    aread, awrite,
+)
+from utils.pagination import paginate
+from utils.user_directory import user_directory
 from datetime import datetime, timezone
+from typing import Optional
 
 router = APIRouter(prefix="/likes", tags=["Likes"])
 
+# 라우트는 async def 이고, 저장소를 쓰는 부분(잠금 포함)은 동기 함수로 두고 utils.data 의 aread / awrite 로 실행한다
+# (좋아요 폭주 중에도 요청 스레드를 잡고 기다리지 않는다)
+
 
 @router.post("/posts/{postId}", status_code=status.HTTP_201_CREATED)
-def like_post(
+async def like_post(
         postId: int,
-        current_user: dict = Depends(get_current_user),
+        current_user: dict = Depends(get_current_identity),
 ):
     """
     게시글에 좋아요 누르기
     - 로그인 필수
     - 중복 좋아요 불가 (이미 눌렀으면 에러)
     """
-    # 게시글 존재 확인
-    posts = load_data("posts")
-    post = next(
-        (p for p in posts if p["postId"] == postId),
-        None
-    )
-
-    if post is None or post.get("is_deleted"):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "status": "error",
-                "data": {"message": "존재하지 않는 게시글입니다."}
-            }
-        )
-
-    # 좋아요 데이터 로드
-    likes = load_data("likes")
-
-    # 이미 좋아요 눌렀는지 확인
-    existing_like = next(
-        (l for l in likes
-         if l.get("postId") == postId
-         and l.get("userId") == current_user["userId"]
-         and not l.get("is_deleted", False)),
-        None
-    )
-
-    if existing_like:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail={
-                "status": "error",
-                "data": {"message": "이미 좋아요를 눌렀습니다."}
-            }
-        )
-
-    # 새 좋아요 ID 생성
-    new_like_id = max([l.get("likeId", 0) for l in likes], default=0) + 1
-
-    # 좋아요 생성
-    new_like = {
-        "likeId": new_like_id,
-        "postId": postId,
-        "userId": current_user["userId"],
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "is_deleted": False,
-    }
+    return await awrite(_like_post, postId, current_user)
+
+
+def _like_post(postId: int, current_user: dict):
+    with transaction(write=["posts", "likes"]):
+        # 게시글 존재 확인
+        post = get_record("posts", postId)
+
+        if post is None or post.get("is_deleted"):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "status": "error",
+                    "data": {"message": "존재하지 않는 게시글입니다."}
+                }
+            )
+
+        # 이미 좋아요 눌렀는지 확인
+        existing_like = find_by("likes", "active", (postId, current_user["userId"]))
+
+        if existing_like:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={
+                    "status": "error",
+                    "data": {"message": "이미 좋아요를 눌렀습니다."}
+                }
+            )
+
+        # 새 좋아요 ID 생성
+        new_like_id = next_id("likes")
+
+        # 좋아요 생성
+        new_like = {
+            "likeId": new_like_id,
+            "postId": postId,
+            "userId": current_user["userId"],
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "is_deleted": False,
+        }
 
-    # 저장
-    likes.append(new_like)
-    save_data("likes", likes)
+        # 저장
+        insert_record("likes", new_like)
 
-    # 게시글의 좋아요 수 증가
-    post["likeCount"] = post.get("likeCount", 0) + 1
-    save_data("posts", posts)
+        # 게시글의 좋아요 수 증가
+        post = update_record("posts", postId, {"likeCount": post.get("likeCount", 0) + 1})
 
-    # 응답
-    return {
-        "status": "success",
-        "data": {
-            "postId": postId,
-            "isLiked": True,
-            "likeCount": post["likeCount"],
+        # 응답
+        return {
+            "status": "success",
+            "data": {
+                "postId": postId,
+                "isLiked": True,
+                "likeCount": post["likeCount"],
+            }
         }
-    }
 
 
 
 @router.delete("/posts/{postId}", status_code=status.HTTP_204_NO_CONTENT)
-def unlike_post(
+async def unlike_post(
         postId: int,
-        current_user: dict = Depends(get_current_user),
+        current_user: dict = Depends(get_current_identity),
 ):
     """
     좋아요 취소
     - 로그인 필수
     - 이미 눌렀던 좋아요만 취소 가능
     """
-    # 게시글 존재 확인
-    posts = load_data("posts")
-    post = next(
-        (p for p in posts if p["postId"] == postId),
-        None
-    )
-
-    if post is None or post.get("is_deleted"):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "status": "error",
-                "data": {"message": "존재하지 않는 게시글입니다."}
-            }
-        )
+    await awrite(_unlike_post, postId, current_user)
 
-    # 좋아요 데이터 로드
-    likes = load_data("likes")
-
-    # 내 좋아요 찾기
-    my_like = next(
-        (l for l in likes
-         if l.get("postId") == postId
-         and l.get("userId") == current_user["userId"]
-         and not l.get("is_deleted", False)),
-        None
-    )
-
-    if my_like is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "status": "error",
-                "data": {"message": "좋아요를 누르지 않았습니다."}
-            }
-        )
 
-    my_like["is_deleted"] = True
-    save_data("likes", likes)
+def _unlike_post(postId: int, current_user: dict):
+    with transaction(write=["posts", "likes"]):
+        # 게시글 존재 확인
+        post = get_record("posts", postId)
+
+        if post is None or post.get("is_deleted"):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "status": "error",
+                    "data": {"message": "존재하지 않는 게시글입니다."}
+                }
+            )
+
+        # 내 좋아요 찾기
+        my_like = find_by("likes", "active", (postId, current_user["userId"]))
 
-    #게시글의 좋아요 수 감소
-    post["likeCount"] = max(post.get("likeCount", 1) - 1, 0)
-    save_data("posts", posts)
+        if my_like is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "status": "error",
+                    "data": {"message": "좋아요를 누르지 않았습니다."}
+                }
+            )
 
-    # 응답 (빈 응답)
-    return
+        soft_delete_record("likes", my_like["likeId"])
+
+        #게시글의 좋아요 수 감소
+        update_record("posts", postId, {"likeCount": max(post.get("likeCount", 1) - 1, 0)})
 
 
 
 @router.get("/posts/{postId}")
-def get_like_status(
+async def get_like_status(
         postId: int,
-        current_user: dict = Depends(get_current_user),
+        current_user: dict = Depends(get_current_identity),
 ):
     """
     좋아요 상태 확인
     - 로그인 필수
     - 현재 사용자가 좋아요 눌렀는지 + 총 좋아요 수
     """
-    # 게시글 존재 확인
-    posts = load_data("posts")
-    post = next(
-        (p for p in posts if p["postId"] == postId),
-        None
-    )
-
-    if post is None or post.get("is_deleted"):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "status": "error",
-                "data": {"message": "존재하지 않는 게시글입니다."}
+    return await aread(_get_like_status, postId, current_user)
+
+
+def _get_like_status(postId: int, current_user: dict):
+    with transaction(read=["posts", "likes"]):
+        # 게시글 존재 확인
+        post = get_record("posts", postId)
+
+        if post is None or post.get("is_deleted"):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "status": "error",
+                    "data": {"message": "존재하지 않는 게시글입니다."}
+                }
+            )
+
+        # 내가 좋아요 눌렀는지 확인
+        my_like = find_by("likes", "active", (postId, current_user["userId"]))
+
+        # 응답
+        return {
+            "status": "success",
+            "data": {
+                "postId": postId,
+                "isLiked": my_like is not None,  # True/False
+                "likeCount": post.get("likeCount", 0),
             }
-        )
-
-    # 좋아요 데이터 로드
-    likes = load_data("likes")
-
-    # 내가 좋아요 눌렀는지 확인
-    my_like = next(
-        (l for l in likes
-         if l.get("postId") == postId
-         and l.get("userId") == current_user["userId"]
-         and not l.get("is_deleted", False)),
-        None
-    )
-
-    # 응답
-    return {
-        "status": "success",
-        "data": {
-            "postId": postId,
-            "isLiked": my_like is not None,  # True/False
-            "likeCount": post.get("likeCount", 0),
         }
-    }
 
 
 
 @router.get("/me")
-def get_my_liked_posts(
-        current_user: dict = Depends(get_current_user),
+async def get_my_liked_posts(
+        page: int = Query(1, ge=1),
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None),  # 이전 응답의 next_cursor (있으면 page 대신 사용)
+        current_user: dict = Depends(get_current_identity),
 ):
     """
     내가 좋아요한 게시글 목록
     - 로그인 필수
+    - 좋아요 누른 시간 최신순 + 페이지네이션
     """
-    # 데이터 로드
-    likes = load_data("likes")
-    posts = load_data("posts")
-    users = load_data("users")
-
-    # 내가 누른 좋아요 필터링 (취소 안 한 것만)
-    my_likes = [
-        l for l in likes
-        if l.get("userId") == current_user["userId"]
-           and not l.get("is_deleted", False)
-    ]
-
-    # 좋아요한 게시글 ID 목록
-    liked_post_ids = [l["postId"] for l in my_likes]
-
-    # 해당 게시글들 찾기 (삭제 안 된 것만)
-    liked_posts = [
-        p for p in posts
-        if p["postId"] in liked_post_ids
-           and not p.get("is_deleted", False)
-    ]
-
-    # 최신순 정렬 (좋아요 누른 시간 기준)
-    like_time_map = {
-        l["postId"]: l["created_at"]
-        for l in my_likes
-    }
+    return await aread(_get_my_liked_posts, page, limit, cursor, current_user)
+
+
+def _get_my_liked_posts(page: int, limit: int, cursor: Optional[str], current_user: dict):
+    # 내 좋아요(취소 안 한 것)를 유저별 좋아요 인덱스에서 현재 페이지 구간만 가져온다 (likes 전체를 읽지 않음)
+    with transaction(read=["posts", "likes"]):
+        my_likes, total, next_cursor = paginate(
+            "likes",
+            where={"userId": current_user["userId"]},
+            order_by="created_at",
+            page=page,
+            limit=limit,
+            cursor=cursor,
+        )
 
-    liked_posts.sort(
-        key=lambda p: like_time_map.get(p["postId"], ""),
-        reverse=True
-    )
-
-    # 작성자 닉네임 매핑
-    from utils.data import get_user_nickname_map
-    user_map = get_user_nickname_map(users)
-
-    # 응답 데이터 생성
-    data = [
-        {
-            "postId": p["postId"],
-            "title": p["title"],
-            "nickname": user_map.get(p["userId"], "알 수 없음"),
-            "likeCount": p.get("likeCount", 0),
-            "viewCount": p.get("viewCount", 0),
-            "created_at": p["created_at"],
-        }
-        for p in liked_posts
-    ]
+        # 이번 페이지의 게시글만 한 번에 찾고, 작성자 닉네임도 이번 페이지 것만 붙인다
+        # (게시글을 지울 때 그 좋아요도 지우므로 삭제된 게시글은 보통 나오지 않는다. 그 전에 지운 글의 좋아요만 건너뛴다)
+        posts = get_records("posts", {like["postId"] for like in my_likes})
+    data = []
+    for like in my_likes:
+        post = posts.get(like["postId"])
+        if post is None or post.get("is_deleted", False):
+            continue
+        data.append({
+            "postId": post["postId"],
+            "title": post["title"],
+            "nickname": user_directory.nickname(post["userId"]),
+            "likeCount": post.get("likeCount", 0),
+            "viewCount": post.get("viewCount", 0),
+            "created_at": post["created_at"],
+            "liked_at": like["created_at"],
+        })
 
     return {
         "status": "success",
         "data": data,
-    }
\ No newline at end of file
+        "pagination": {
+            "page": page,
+            "limit": limit,
+            "total": total,
+            "next_cursor": next_cursor,
+        }
+    }
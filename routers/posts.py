@@ -1,23 +1,49 @@
+import heapq
 from enum import Enum
 from fastapi import APIRouter, status, Query, Depends, HTTPException, Response
 from schemas.post import PostCreate, PostUpdate
-from utils.auth import get_current_user
-from utils.data import load_data, save_data, get_user_nickname_map, data_lock
+from utils.auth import get_current_identity
+from utils.data import (
+    get_record, get_records, transaction, list_by, search_records, count_records,
+    insert_record, update_record, update_records, soft_delete_record, next_id,
+    aread, awrite,
+)
+from utils.pagination import paginate
+from utils.response_cache import cached
+from utils.user_directory import user_directory
+from utils.view_counter import view_counter
 from datetime import datetime, timezone
+from typing import Optional
 
 router = APIRouter(prefix="/posts", tags=["Posts"])
 
+# 라우트는 async def 이고, 저장소를 쓰는 부분(잠금 포함)은 동기 함수로 두고 utils.data 의 aread / awrite 로 실행한다
+# (routers.likes 와 같은 방식. 응답 캐시에 있는 목록은 스레드 없이 바로 보낸다)
+
+# 검색에서 작성자 닉네임이 맞았을 때의 관련도 점수 (제목/본문 점수는 utils.storage.base.SEARCH_WEIGHTS)
+NICKNAME_SCORE = 2
+
 #Enum 클래스 추가
 class SortOption(str, Enum):
     LATEST = "latest"
     VIEWS = "views"
     LIKES = "likes"
 
+# 정렬 옵션 -> 정렬 기준 필드
+SORT_FIELDS = {
+    SortOption.LATEST: "created_at",
+    SortOption.VIEWS: "viewCount",
+    SortOption.LIKES: "likeCount",
+}
+
 @router.get("")
-def get_posts(
+@cached("posts", "users", "comments")
+async def get_posts(
         page: int = Query(1, ge=1),  # 기본값 1페이지, 1보다 커야됌
         limit: int = Query(20, ge=1, le=100),  # 한 페이지당 20개, 최대 100개
         sort: SortOption = Query(SortOption.LATEST),
+        cursor: Optional[str] = Query(None),  # 이전 응답의 next_cursor (있으면 page 대신 사용)
+        comment_count: bool = Query(False),  # true 면 항목마다 commentCount (댓글 수) 포함
 ):
     """
         게시글 목록 조회
@@ -25,47 +51,36 @@ def get_posts(
         - 페이지네이션 적용
         - 목록에서는 제목 + 작성자 닉네임만 반환
     """
-    # 데이터 로드
-    posts = load_data("posts")  # 데이터베이스 대신 json 로드
-    users = load_data("users")
+    return await aread(_get_posts, page, limit, sort, cursor, comment_count)
 
-    # 삭제되지 않은 게시글만 필터링
-    active_posts = [
-        p for p in posts if not p.get("is_deleted", False)
-    ]
-    # 정렬 추가
-    if sort == SortOption.LATEST:
-        active_posts.sort(
-            key=lambda p: p.get("created_at", ""),
-            reverse=True
-        )
-    elif sort == SortOption.VIEWS:
-        active_posts.sort(
-            key=lambda p: p.get("viewCount", 0),
-            reverse=True
-        )
 
-    elif sort == SortOption.LIKES:
-        active_posts.sort(
-            key=lambda p: p.get("likeCount", 0),
-            reverse=True
+def _get_posts(page: int, limit: int, sort: SortOption, cursor: Optional[str], comment_count: bool):
+    # 삭제되지 않은 게시글을 정렬 기준별 인덱스에서 현재 페이지 구간만 가져온다 (매번 정렬하지 않음)
+    # (total 은 전체 게시글 수, sqlite 저장소는 정렬/페이지네이션을 SQL 로 처리)
+    # (cursor 를 주면 그 다음 항목부터 -> 뒤 페이지도 같은 비용, 새 글이 올라와도 밀리지 않음)
+    # (인덱스를 읽는 동안 조회수 저장/게시글 작성 등이 같은 인덱스를 바꾸지 않도록 읽기 잠금을 잡는다)
+    with transaction(read=["posts", "comments"] if comment_count else ["posts"]):
+        paged_posts, total, next_cursor = paginate(
+            "posts", order_by=SORT_FIELDS[sort], page=page, limit=limit, cursor=cursor,
         )
-    # 페이지네이션 계산
-    total = len(active_posts)  # 전체 게시글 수
-    start = (page - 1) * limit  # 현재 페이지의 시작 인덱스 계산
-    end = start + limit  # 현재 페이지의 끝 인덱스 계산
-    paged_posts = active_posts[start:end]  # 전체 중 해당 페이지 구간만
 
-    # 게시글이 누가 쓴 게시글인지 닉네임으로 알 수 있도록 userId - nickname 매칭
-    user_map = get_user_nickname_map(users)
+        # 댓글 수는 게시글별 댓글 개수 인덱스에서 (댓글을 훑지 않음)
+        comment_counts = (
+            count_records("comments", "post_count", [post["postId"] for post in paged_posts])
+            if comment_count else None
+        )
 
+    # 게시글이 누가 쓴 게시글인지 닉네임으로 알 수 있도록 유저 디렉터리에서 찾는다 (users 를 읽지 않음)
     data = []
     for post in paged_posts:
-        data.append({
+        item = {
             "postId": post["postId"],
             "title": post["title"],
-            "nickname": user_map.get(post["userId"], "알 수 없음"),  # 여기서 userId는 게시글 작성자
-        })
+            "nickname": user_directory.nickname(post["userId"]),  # 여기서 userId는 게시글 작성자
+        }
+        if comment_counts is not None:
+            item["commentCount"] = comment_counts[post["postId"]]
+        data.append(item)
     return {
         "status": "success",
         "data": data,
@@ -73,16 +88,21 @@ def get_posts(
             "page": page,
             "limit": limit,
             "total": total,
+            "next_cursor": next_cursor,
         }
     }
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
-def create_post(
+async def create_post(
         # 새 게시글 작성 (로그인 필수)
         data: PostCreate,
-        current_user: dict = Depends(get_current_user)
+        current_user: dict = Depends(get_current_identity)
 ):
+    return await awrite(_create_post, data, current_user)
+
+
+def _create_post(data: PostCreate, current_user: dict):
     # 제목 / 본문 검증
     if not data.title.strip() or not data.content.strip():  # strip()으로 양끝 공백 제거
         raise HTTPException(
@@ -94,12 +114,8 @@ def create_post(
                 }
             }
         )
-    # 게시글 데이터 로드
-    posts = load_data("posts")
-    # postId 생성
-    new_post_id = (  # 마지막 게시글 ID에 1 추가해 고우 ID 생성
-            max([p.get("postId", 0)  for p in posts], default=0) + 1
-    )
+    # postId 생성 (시퀀스에서 발급, 전체 게시글을 훑지 않는다)
+    new_post_id = next_id("posts")
     # 현재 시간
     created_at = datetime.now(timezone.utc).isoformat()
 
@@ -115,8 +131,8 @@ def create_post(
         "updated_at": created_at,
         "is_deleted": False,
     }
-    posts.append(new_post)  # 게시글 목록에 추가
-    save_data("posts", posts)  # 파일에 저장
+    with transaction(write=["posts"]):
+        insert_record("posts", new_post)  # 게시글 목록에 추가 + 파일에 저장
 
     # 작성자 닉네임(current_user에 이미 있음)
     nickname = current_user.get("nickname", "알 수 없음")
@@ -134,77 +150,81 @@ def create_post(
 
 
 @router.get("/search")
-def search_posts(
+@cached("posts", "users")
+async def search_posts(
         keyword: str = Query(..., min_length=1),
+        page: int = Query(1, ge=1),
+        limit: int = Query(20, ge=1, le=100),
 ):
     """
     게시글 검색
     - 제목 / 내용 / 닉네임 기준 검색
     - 로그인 필요없음
-    - 검색 결과 전체 반환
+    - 관련도순 (제목 > 닉네임 > 내용, 같으면 최신 게시글 먼저) + 페이지네이션
     """
-    posts = load_data("posts")
-    users = load_data("users")
+    return await aread(_search_posts, keyword, page, limit)
+
 
-    user_map = get_user_nickname_map(users)
+def _search_posts(keyword: str, page: int, limit: int):
+    # 검색 인덱스(utils.search)로 찾는다. 한글은 두 글자씩, 영문/숫자는 단어 단위로 맞춘다
+    # (게시글 작성/수정/삭제, 닉네임 변경 때 인덱스도 같이 바뀌어서 검색할 때 전체를 훑지 않는다)
+    with transaction(read=["users", "posts"]):
+        scores = search_records("posts", "text", keyword)
 
-    keyword_lower = keyword.lower()
-    result = []
+        # 닉네임이 맞은 작성자의 게시글
+        for user_id in search_records("users", "nickname_text", keyword):
+            for post in list_by("posts", "userId", user_id):
+                if not post.get("is_deleted"):
+                    scores[post["postId"]] = scores.get(post["postId"], 0) + NICKNAME_SCORE
 
-    for post in posts:
-        # 삭제된 게시글 제외
-        if post.get("is_deleted") is True:
+        # 전체를 정렬하지 않고 이번 페이지까지만 뽑는다
+        offset = (page - 1) * limit
+        ranked = heapq.nlargest(offset + limit, scores.items(), key=lambda item: (item[1], item[0]))
+
+        posts = get_records("posts", [post_id for post_id, _ in ranked[offset:]])
+    data = []
+    for post_id, _ in ranked[offset:]:
+        post = posts.get(post_id)
+        if post is None:
             continue
-        title = post.get("title", "")
-        content = post.get("content", "")
-        nickname = user_map.get(post.get("userId"), "알 수 없음")
-
-        # 제목 / 내용 / 닉네임 중 하나라도 키워드 포함되면 확인
-        if (
-                keyword_lower in title.lower()
-                or keyword_lower in content.lower()
-                or keyword_lower in nickname.lower()
-        ):
-            result.append({
-                "postId": post["postId"],
-                "title": title,
-                "nickname": nickname,
-            })
+        data.append({
+            "postId": post["postId"],
+            "title": post.get("title", ""),
+            "nickname": user_directory.nickname(post["userId"]),
+        })
     return {
         "status": "success",
-        "data": result,
+        "data": data,
+        "pagination": {
+            "page": page,
+            "limit": limit,
+            "total": len(scores),
+        }
     }
 
 
 @router.get("/me")
-def get_my_posts(
+async def get_my_posts(
         page: int = Query(1, ge=1),
         limit: int = Query(20, ge=1, le=100),
         sort: SortOption = Query(SortOption.LATEST),
-        current_user: dict = Depends(get_current_user),
+        cursor: Optional[str] = Query(None),
+        current_user: dict = Depends(get_current_identity),
 ):
-    posts = load_data("posts")
-
-    # 내가 쓴 게시글  + 삭제 안된 게시글만
-    my_posts = [
-        p for p in posts
-        if p.get("userId") == current_user["userId"]
-           and not p.get("is_deleted", False)
-    ]
-
-    # 정렬
-    if sort == SortOption.LATEST:
-        my_posts.sort(key=lambda p: p.get("created_at", ""), reverse=True)
-    elif sort == SortOption.VIEWS:
-        my_posts.sort(key=lambda p: p.get("viewCount", 0), reverse=True)
-    elif sort == SortOption.LIKES:
-        my_posts.sort(key=lambda p: p.get("likeCount", 0), reverse=True)
-
-    # 페이지네이션
-    total = len(my_posts)
-    start = (page - 1) * limit
-    end = start + limit
-    paged_posts = my_posts[start:end]
+    return await aread(_get_my_posts, page, limit, sort, cursor, current_user)
+
+
+def _get_my_posts(page: int, limit: int, sort: SortOption, cursor: Optional[str], current_user: dict):
+    # 내가 쓴 게시글  + 삭제 안된 게시글만 정렬 + 페이지네이션 (작성자별 정렬 인덱스로 내 글만 본다)
+    with transaction(read=["posts"]):
+        paged_posts, total, next_cursor = paginate(
+            "posts",
+            where={"userId": current_user["userId"]},
+            order_by=SORT_FIELDS[sort],
+            page=page,
+            limit=limit,
+            cursor=cursor,
+        )
 
     data = [
         {
@@ -223,48 +243,43 @@ def get_my_posts(
             "page": page,
             "limit": limit,
             "total": total,
+            "next_cursor": next_cursor,
         }
     }
 
 
 @router.get("/{postId}")
-def get_post(postId: int):
+async def get_post(postId: int):
     """
     게시글 상세 조회
     - 조회 시마다 조회수 1 증가
     - 삭제된 게시글은 조회 불가
     """
-    # 데이터 로드
-    users = load_data("users")
+    return await aread(_get_post, postId)
 
-    with data_lock:
-        posts = load_data("posts")
 
-        # 해당 postId를 가진 게시글 찾기
-        post = next(
-            (p for p in posts if p["postId"] == postId),
-            None
-        )
+def _get_post(postId: int):
+    # 해당 postId를 가진 게시글 찾기
+    with transaction(read=["posts"]):
+        post = get_record("posts", postId)
 
-        # 게시글이 없거나 삭제된 경우 체크
-        if post is None or post.get("is_deleted") is True:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail={
-                    "status": "error",
-                    "data": {
-                        "message": "존재하지 않는 게시글입니다."
-                    }
+    # 게시글이 없거나 삭제된 경우 체크
+    if post is None or post.get("is_deleted") is True:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "status": "error",
+                "data": {
+                    "message": "존재하지 않는 게시글입니다."
                 }
-            )
-        # 조회수 증가 및 저장
-        post["viewCount"] = post.get("viewCount", 0) + 1
-        save_data("posts", posts)
+            }
+        )
+    # 조회수 증가 (메모리에 모았다가 한 번에 저장) -> 저장된 값 + 아직 저장 안 된 값
+    view_count = post.get("viewCount", 0) + view_counter.increment(postId)
 
 
     # 작성자 닉네임 찾기
-    user_map = get_user_nickname_map(users)
-    nickname = user_map.get(post["userId"], "알 수 없음")
+    nickname = user_directory.nickname(post["userId"])
 
     # 응답
     return {
@@ -276,54 +291,54 @@ def get_post(postId: int):
             "nickname": nickname,
             "created_at": post.get("created_at"),
             "updated_at": post.get("updated_at"),
-            "viewCount": post["viewCount"],
+            "viewCount": view_count,
             "likeCount": post.get("likeCount", 0)
         }
     }
 
 
 @router.patch("/{postId}")
-def update_post(
+async def update_post(
         postId: int,
         data: PostUpdate,
-        current_user: dict = Depends(get_current_user),
+        current_user: dict = Depends(get_current_identity),
 ):
     """
     게시글 수정
     -로그인 필요
     -본인이 작성한 게시글만 수정 가능
     """
-    posts = load_data("posts")
+    return await awrite(_update_post, postId, data, current_user)
 
-    post = next(
-        (p for p in posts if p["postId"] == postId),
-        None
-    )
 
-    # 게시글이 없거나 삭제된 경우
-    if post is None or post.get("is_deleted") is True:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "status": "error",
-                "data": {
-                    "message": "존재하지않는 게시글입니다."
+def _update_post(postId: int, data: PostUpdate, current_user: dict):
+    with transaction(write=["posts"]):
+        post = get_record("posts", postId)
+
+        # 게시글이 없거나 삭제된 경우
+        if post is None or post.get("is_deleted") is True:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "status": "error",
+                    "data": {
+                        "message": "존재하지않는 게시글입니다."
+                    }
                 }
-            }
-        )
-    # 본인이 작성한게 아닌 경우
-    if post["userId"] != current_user["userId"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "status": "error",
-                "data": {
-                    "message": "게시글을 수정할 권한이 없습니다."
+            )
+        # 본인이 작성한게 아닌 경우
+        if post["userId"] != current_user["userId"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail={
+                    "status": "error",
+                    "data": {
+                        "message": "게시글을 수정할 권한이 없습니다."
+                    }
                 }
-            }
-        )
-    if data.title is not None:
-        if not data.title.strip():
+            )
+        # 검증을 모두 끝낸 뒤에 바뀐 필드만 저장한다
+        if data.title is not None and not data.title.strip():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail={
@@ -333,10 +348,8 @@ def update_post(
                     }
                 }
             )
-        post["title"] = data.title.strip()
 
-    if data.content is not None:
-        if not data.content.strip():
+        if data.content is not None and not data.content.strip():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail={
@@ -346,11 +359,16 @@ def update_post(
                     }
                 }
             )
-        post["content"] = data.content.strip()
 
-    #  업데이트 갱신
-    post["updated_at"] = datetime.now(timezone.utc).isoformat()
-    save_data("posts", posts)
+        changes = {}
+        if data.title is not None:
+            changes["title"] = data.title.strip()
+        if data.content is not None:
+            changes["content"] = data.content.strip()
+
+        #  업데이트 갱신
+        changes["updated_at"] = datetime.now(timezone.utc).isoformat()
+        post = update_record("posts", postId, changes)
 
     # 작성자 닉네임 찾기
     nickname = current_user.get("nickname", "알 수 없음")
@@ -371,36 +389,40 @@ def update_post(
 
 
 @router.delete("/{postId}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_post(
+async def delete_post(
         postId: int,
-        current_user: dict = Depends(get_current_user),
+        current_user: dict = Depends(get_current_identity),
 ):
-    posts = load_data("posts")
-    post = next(
-        (p for p in posts if p["postId"] == postId),
-        None
-    )
-
-    # 게시글이 없거나 이미 삭제된 경우
-    if post is None or post.get("is_deleted", False):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "status": "error",
-                "data": {"message": "존재하지 않는 게시글입니다."}
-            }
-        )
-    # 게시글이 본인 글인지
-    if post["userId"] != current_user["userId"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "status": "error",
-                "data": {"message": "게시글을 삭제할 권한이 없습니다."}
-            }
-        )
-    post["is_deleted"] = True
-    post["updated_at"] = datetime.now(timezone.utc).isoformat()
+    return await awrite(_delete_post, postId, current_user)
+
+
+def _delete_post(postId: int, current_user: dict):
+    with transaction(write=["posts", "likes"]):
+        post = get_record("posts", postId)
 
-    save_data("posts", posts)
+        # 게시글이 없거나 이미 삭제된 경우
+        if post is None or post.get("is_deleted", False):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "status": "error",
+                    "data": {"message": "존재하지 않는 게시글입니다."}
+                }
+            )
+        # 게시글이 본인 글인지
+        if post["userId"] != current_user["userId"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail={
+                    "status": "error",
+                    "data": {"message": "게시글을 삭제할 권한이 없습니다."}
+                }
+            )
+        now = datetime.now(timezone.utc).isoformat()
+        soft_delete_record("posts", postId, {"updated_at": now})
+        # 게시글의 좋아요도 같이 지운다 (내가 좋아요한 목록의 인덱스/개수에 삭제된 글이 남지 않도록)
+        update_records("likes", {
+            like["likeId"]: {"is_deleted": True}
+            for like in list_by("likes", "postId", postId) if not like.get("is_deleted", False)
+        })
     return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -1,44 +1,53 @@
 from fastapi import APIRouter, status, HTTPException, Depends, Response
 from schemas.user import UserCreate, UserUpdate
 from datetime import datetime, timezone
-from utils.auth import get_password_hash, get_current_user
-from utils.data import load_data, save_data, find_user_by_id, soft_delete_user
+from utils.auth import aget_password_hash, get_current_user, forget_user, revoke_claims, token_version
+from utils.data import find_user_by_id, soft_delete_user, insert_record, update_record, transaction, aread, awrite
+from utils.response_cache import cached
+from utils.user_directory import user_directory
 import uuid
 
 router = APIRouter(prefix="/users",tags=["Users"])
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
-def signup(data: UserCreate):
-    users = load_data("users")
-
-    for u in users:
-        u.setdefault("is_deleted", False)
-    active_users = [u for u in users if u.get("is_deleted") is False]
+# 라우트는 async def 이고, 저장소를 쓰는 부분(잠금 포함)은 동기 함수로 두고 utils.data 의 aread / awrite 로 실행한다.
+# 비밀번호 해시는 utils.auth 의 aget_password_hash 로 await 한다 (계산하는 동안 요청 스레드를 잡지 않는다)
 
-    if any(u.get('email', '').lower() == data.email.lower() for u in active_users):
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail={"status": "error", "data": {"message": "이미 존재하는 이메일입니다."}}
-        )
-    if data.nickname:
-        if any(u.get('nickname', '').lower() == data.nickname.lower() for u in active_users):
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def signup(data: UserCreate):
+    # 해시 계산은 느리므로 잠금 밖에서 미리 한다
+    password_hash = await aget_password_hash(data.password)
+    return await awrite(_signup, data, password_hash)
+
+
+def _signup(data: UserCreate, password_hash: str):
+    with transaction(write=["users"]):
+        # 중복 확인은 유저 디렉터리(소문자 이메일/닉네임 -> userId, 탈퇴한 유저 제외)에서 바로 찾는다
+        # (다른 워커의 가입/수정이 있었으면 refresh 가 다시 읽는다)
+        user_directory.refresh()
+        if user_directory.user_id_by_email(data.email) is not None:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
-                detail={"status": "error","data":{"message":"닉네임이 중복되었습니다."}}
+                detail={"status": "error", "data": {"message": "이미 존재하는 이메일입니다."}}
             )
-    new_user = {
-        "userId": str(uuid.uuid4()),
-        "email": data.email,
-        "name": data.name,
-        "password": get_password_hash(data.password),
-        "nickname": data.nickname,
-        "profile_image": data.profile_image,
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "is_deleted": False,
-        "deleted_at": None
-    }
-    users.append(new_user)
-    save_data("users", users)
+        if data.nickname:
+            if user_directory.user_id_by_nickname(data.nickname) is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail={"status": "error","data":{"message":"닉네임이 중복되었습니다."}}
+                )
+        new_user = {
+            "userId": str(uuid.uuid4()),
+            "email": data.email,
+            "name": data.name,
+            "password": password_hash,
+            "nickname": data.nickname,
+            "profile_image": data.profile_image,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "is_deleted": False,
+            "deleted_at": None
+        }
+        insert_record("users", new_user)
+        user_directory.put(new_user)
     return {"status": "success",
             "data":{
                 "userId":new_user["userId"],
@@ -50,7 +59,7 @@ def signup(data: UserCreate):
             }
 
 @router.get("/me")
-def get_me(current_user: dict = Depends(get_current_user)):
+async def get_me(current_user: dict = Depends(get_current_user)):
     return {
         "status": "success",
         "data": {
@@ -62,19 +71,36 @@ def get_me(current_user: dict = Depends(get_current_user)):
     }
 
 @router.patch("/me")
-def update_me(
+async def update_me(
         data: UserUpdate,
         current_user: dict = Depends(get_current_user)
 ):
-        users = load_data("users")
+        #내 계정 수정 (해시 계산은 느리므로 잠금 밖에서 미리 한다)
+        changes = {}
+        if data.nickname is not None:
+            changes["nickname"] = data.nickname
 
-        #닉네임 중복 체크(본인은 제외)
-        if data.nickname:
-            for user in users:
-                if(
-                    user.get("nickname", "").lower() == data.nickname.lower()
-                    and user["userId"] != current_user["userId"]
-                ):
+        if data.profile_image is not None:
+            changes["profile_image"] = data.profile_image
+
+        if data.password is not None:
+            changes["password"] = await aget_password_hash(data.password)
+
+        return await awrite(_update_me, data, changes, current_user)
+
+
+def _update_me(data: UserUpdate, changes: dict, current_user: dict):
+        with transaction(write=["users"]):
+            user_directory.refresh()
+            if "password" in changes:
+                # 비밀번호를 바꾸면 그 전에 발급된 refresh token 을 모두 무효로 한다
+                stored = find_user_by_id(current_user["userId"]) or current_user
+                changes["token_version"] = token_version(stored) + 1
+
+            #닉네임 중복 체크(본인은 제외)
+            if data.nickname:
+                owner = user_directory.user_id_by_nickname(data.nickname)
+                if owner is not None and owner != current_user["userId"]:
                     raise HTTPException(
                         status_code=status.HTTP_409_CONFLICT,
                         detail={
@@ -82,54 +108,59 @@ def update_me(
                             "data": {"message": "닉네임이 중복되었습니다."}
                         }
                     )
-        #내 계정 수정
-        for user in users:
-            if user["userId"] == current_user["userId"]:
-                if data.nickname is not None:
-                    user["nickname"] = data.nickname
-
-                if data.profile_image is not None:
-                    user["profile_image"] = data.profile_image
 
-                if data.password is not None:
-                    user["password"] = get_password_hash(data.password)
+            user = update_record("users", current_user["userId"], changes)
+            user_directory.put(user)
+        forget_user(current_user["userId"])
+        if "nickname" in changes:
+            # 예전 닉네임이 들어 있는 access token 은 클레임 대신 레코드를 읽게 한다
+            revoke_claims(current_user["userId"])
+
+        return {
+            "status": "success",
+            "data": {
+                "nickname": user["nickname"],
+                "profile_image": user["profile_image"],
+            }
+        }
 
-                save_data("users", users)
 
-                return {
-                    "status": "success",
-                    "data": {
-                        "nickname": user["nickname"],
-                        "profile_image": user["profile_image"],
-                    }
-                }
 
+@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_me(current_user: dict = Depends(get_current_user)):
+    await awrite(_delete_me, current_user)
 
 
-@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
-def delete_me(current_user: dict = Depends(get_current_user)):
-    users = load_data("users")
-    target_user = find_user_by_id(users, current_user["userId"])
+def _delete_me(current_user: dict):
+    with transaction(write=["users"]):
+        target_user = find_user_by_id(current_user["userId"])
 
-    if not target_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"status": "error","data": {"message": "사용자를 찾을 수 없습니다."}}
-        )
-    if target_user.get("is_deleted") is True:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-                detail={"status": "error", "data": {"message": "이미 탈퇴한 계정입니다."}}
-        )
-    soft_delete_user(target_user)
-    save_data("users", users)
+        if not target_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={"status": "error","data": {"message": "사용자를 찾을 수 없습니다."}}
+            )
+        if target_user.get("is_deleted") is True:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                    detail={"status": "error", "data": {"message": "이미 탈퇴한 계정입니다."}}
+            )
+        soft_delete_user(target_user)
+    # 탈퇴한 유저의 토큰은 다음 요청부터 바로 거부된다 (클레임만 보는 API 포함)
+    forget_user(current_user["userId"])
+    revoke_claims(current_user["userId"])
     return
 
 @router.get("/{userId}")
-def get_user(userId: str):
+@cached("users")
+async def get_user(userId: str):
+    return await aread(_get_user, userId)
+
+
+def _get_user(userId: str):
     #로그인 필요없고 공개 정보만 반환
-    users = load_data("users")
-    target_user = find_user_by_id(users, userId)
+    with transaction(read=["users"]):
+        target_user = find_user_by_id(userId)
 
     #유저가 없거나 탈퇴한 유저면
     if not target_user or target_user.get("is_deleted") is True:
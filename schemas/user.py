@@ -30,6 +30,9 @@ class UserLogin(BaseModel):
     email: str
     password: str
 
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
 class UserUpdate(BaseModel):
     nickname: str | None = None
     profile_image: str | None = None
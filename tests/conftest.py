@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+# 앱을 불러오기 전에 설정 (비밀번호 해시는 요청 스레드에서 바로, 조회수는 바로 저장하지 않음)
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("PASSWORD_WORKERS", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = "Passw0rd!"
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def backend(request, tmp_path, monkeypatch):
+    # 임시 폴더의 빈 저장소 (DATA_DIR 이 상대경로라서 chdir 한다)
+    from utils import auth, data
+    from utils.response_cache import response_cache
+    from utils.view_counter import view_counter
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(data, "DATA_BACKEND", request.param)
+    monkeypatch.setenv("DATA_SQLITE_PATH", str(tmp_path / "social.db"))
+    data.set_backend(None)
+    for cache in (auth.token_cache, auth.user_cache, auth.revoked_claims, response_cache):
+        cache.clear()
+    yield request.param
+    view_counter.flush()
+    data.set_backend(None)
+
+
+@pytest.fixture
+def client(backend):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    return TestClient(app)
+
+
+def signup_and_login(client, email="a@example.com", nickname="nick"):
+    # 가입 후 로그인 응답 (access_token, refresh_token)
+    response = client.post("/users/", json={"email": email, "name": "a", "password": PASSWORD, "nickname": nickname})
+    assert response.status_code == 201, response.text
+    response = client.post("/auth/tokens", data={"username": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def bearer(token: str):
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,65 @@
+import asyncio
+import inspect
+import time
+
+import pytest
+
+from routers import auth, comments, likes, posts, users
+from utils.password_pool import PasswordPool, PasswordPoolBusy
+from utils.singleflight import SingleFlight
+
+from tests.conftest import bearer, signup_and_login
+
+
+@pytest.mark.parametrize("router", [auth.router, comments.router, likes.router, posts.router, users.router])
+def test_routes_are_async(router):
+    # 요청 스레드 풀에서 도는 동기 라우트가 남아 있지 않다
+    assert all(inspect.iscoroutinefunction(route.endpoint) for route in router.routes)
+
+
+def test_singleflight_ado_runs_once_for_concurrent_callers():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "body"
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise ValueError("boom")
+
+    async def main():
+        results = await asyncio.gather(*(flight.ado("key", compute) for _ in range(5)))
+        errors = await asyncio.gather(*(flight.ado("bad", failing) for _ in range(3)), return_exceptions=True)
+        return results, errors
+
+    results, errors = asyncio.run(main())
+    assert results == ["body"] * 5 and len(calls) == 1
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert flight.stats() == {"executions": 2, "coalesced": 6, "in_flight": 0}
+
+
+def test_password_pool_arun_rejects_when_queue_is_full():
+    pool = PasswordPool(workers=0, queue_size=0)
+
+    async def main():
+        slow = asyncio.ensure_future(pool.arun(time.sleep, 0.2))
+        await asyncio.sleep(0.05)
+        with pytest.raises(PasswordPoolBusy):
+            await pool.arun(time.sleep, 0)
+        await slow
+
+    asyncio.run(main())
+    assert pool.stats()["in_flight"] == 0 and pool.stats()["rejected"] == 1
+
+
+def test_cached_async_route_answers_not_modified(client):
+    headers = bearer(signup_and_login(client)["access_token"])
+    assert client.post("/posts", json={"title": "t", "content": "c"}, headers=headers).status_code == 201
+
+    first = client.get("/posts")
+    assert first.status_code == 200 and first.json()["data"][0]["title"] == "t"
+    again = client.get("/posts", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304 and again.headers["ETag"] == first.headers["ETag"]
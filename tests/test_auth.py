@@ -0,0 +1,64 @@
+from tests.conftest import PASSWORD, bearer, signup_and_login
+
+
+def refresh(client, token):
+    return client.post("/auth/refresh", json={"refresh_token": token})
+
+
+def test_refresh_issues_access_token_with_fresh_nickname(client):
+    tokens = signup_and_login(client)
+    assert client.patch("/users/me", json={"nickname": "new"}, headers=bearer(tokens["access_token"])).status_code == 200
+
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    created = client.post("/posts", json={"title": "t", "content": "c"}, headers=bearer(response.json()["access_token"]))
+    assert created.json()["data"]["nickname"] == "new"
+
+
+def test_token_types_are_not_interchangeable(client):
+    tokens = signup_and_login(client)
+    assert client.get("/users/me", headers=bearer(tokens["refresh_token"])).status_code == 401
+    assert refresh(client, tokens["access_token"]).status_code == 401
+
+
+def test_password_change_invalidates_refresh_tokens(client):
+    tokens = signup_and_login(client)
+    changed = client.patch("/users/me", json={"password": "N3wPassw0rd!"}, headers=bearer(tokens["access_token"]))
+    assert changed.status_code == 200
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+    # 새 비밀번호로 다시 로그인하면 새 refresh token 은 쓸 수 있다
+    login = client.post("/auth/tokens", data={"username": "a@example.com", "password": "N3wPassw0rd!"})
+    assert refresh(client, login.json()["refresh_token"]).status_code == 200
+    assert client.post("/auth/tokens", data={"username": "a@example.com", "password": PASSWORD}).status_code == 401
+
+
+def test_deleted_user_is_rejected_everywhere(client):
+    tokens = signup_and_login(client)
+    headers = bearer(tokens["access_token"])
+    assert client.post("/posts", json={"title": "t", "content": "c"}, headers=headers).status_code == 201
+    assert client.delete("/users/me", headers=headers).status_code == 204
+
+    assert client.post("/posts", json={"title": "t", "content": "c"}, headers=headers).status_code == 403
+    assert client.post("/likes/posts/1", headers=headers).status_code == 403
+    assert refresh(client, tokens["refresh_token"]).status_code == 403
+
+
+def test_revocation_survives_restart(client):
+    # 재시작하면 메모리의 인증 캐시 / 폐기 목록 / 유저 디렉터리가 모두 비지만 탈퇴와 닉네임 변경은 그대로 지켜진다
+    from utils import auth, data
+
+    deleted = signup_and_login(client, "d@example.com", "gone")
+    renamed = signup_and_login(client, "r@example.com", "old")
+    assert client.delete("/users/me", headers=bearer(deleted["access_token"])).status_code == 204
+    assert client.patch("/users/me", json={"nickname": "renamed"},
+                        headers=bearer(renamed["access_token"])).status_code == 200
+
+    data.set_backend(None)
+    for cache in (auth.token_cache, auth.user_cache, auth.revoked_claims):
+        cache.clear()
+
+    assert client.post("/posts", json={"title": "t", "content": "c"},
+                       headers=bearer(deleted["access_token"])).status_code == 403
+    created = client.post("/posts", json={"title": "t", "content": "c"}, headers=bearer(renamed["access_token"]))
+    assert created.json()["data"]["nickname"] == "renamed"
@@ -0,0 +1,71 @@
+import time
+
+from utils import auth, data
+from utils.ttl_cache import TTLCache
+
+from tests.conftest import bearer, signup_and_login
+
+
+def count_user_reads(monkeypatch) -> list:
+    backend = data.get_backend()
+    reads = []
+    real_get = backend.get
+    monkeypatch.setattr(backend, "get", lambda name, key: (reads.append(key) if name == "users" else None)
+                        or real_get(name, key))
+    return reads
+
+
+def test_current_user_is_read_once_until_users_change(client, monkeypatch):
+    headers = bearer(signup_and_login(client)["access_token"])
+    reads = count_user_reads(monkeypatch)
+    for _ in range(3):
+        assert client.get("/users/me", headers=headers).status_code == 200
+    assert len(reads) == 1
+
+    # users 에 쓰기가 있었으면 다시 읽는다 (바뀐 닉네임이 바로 보인다)
+    signup_and_login(client, email="b@example.com", nickname="other")
+    assert client.patch("/users/me", json={"nickname": "renamed"}, headers=headers).status_code == 200
+    reads.clear()
+    assert client.get("/users/me", headers=headers).json()["data"]["nickname"] == "renamed"
+    assert len(reads) == 1
+
+
+def test_forget_user_drops_cached_record(client, monkeypatch):
+    headers = bearer(signup_and_login(client)["access_token"])
+    user_id = auth.token_claims(headers["Authorization"].split()[1])["sub"]
+    auth.load_active_user(user_id)
+    reads = count_user_reads(monkeypatch)
+    auth.load_active_user(user_id)
+    assert reads == []
+    auth.forget_user(user_id)
+    auth.load_active_user(user_id)
+    assert reads == [user_id]
+
+    # 탈퇴하면 다음 요청부터 바로 거부
+    assert client.delete("/users/me", headers=headers).status_code == 204
+    assert client.get("/users/me", headers=headers).status_code == 403
+
+
+def test_token_is_decoded_once(client, monkeypatch):
+    token = signup_and_login(client)["access_token"]
+    decodes = []
+    real_decode = auth.jwt.decode
+    monkeypatch.setattr(auth.jwt, "decode", lambda *a, **kw: decodes.append(a[0]) or real_decode(*a, **kw))
+    for _ in range(2):
+        assert client.get("/users/me", headers=bearer(token)).status_code == 200
+        assert client.get("/users/me", headers=bearer("not-a-token")).status_code == 401
+    assert decodes == [token, "not-a-token"]
+
+
+def test_ttl_cache_expires_and_evicts():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2, ttl=0.01)
+    cache.put("c", 3)
+    assert cache.get("a") is None  # 가장 오래 안 쓴 것부터 버린다
+    time.sleep(0.02)
+    assert cache.get("b") is None and cache.get("c") == 3
+
+    disabled = TTLCache(max_size=0, ttl=60)
+    disabled.put("a", 1)
+    assert disabled.get("a", "off") == "off"
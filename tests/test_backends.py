@@ -0,0 +1,48 @@
+from utils.storage.json_backend import JSONFileBackend
+from utils.storage.sqlite_backend import SQLiteBackend
+
+
+def post(post_id: int, user_id: str, title: str, views: int) -> dict:
+    return {"postId": post_id, "userId": user_id, "title": title, "content": "본문",
+            "created_at": f"2024-01-01T00:00:{post_id % 3:02d}+00:00", "viewCount": views, "is_deleted": False}
+
+
+def fill(backend):
+    # 같은 변경을 차례로 적용한다 (정렬 값이 같은 글, 수정, 삭제, 일괄 수정 포함)
+    titles = ["클라우드 입문", "파이썬", "클라우드 비용", "FastAPI 배포", "파이썬 클라우드"]
+    for post_id, title in enumerate(titles, start=1):
+        backend.insert("posts", post(post_id, "a" if post_id % 2 else "b", title, post_id * 10 % 30))
+    backend.update("posts", 2, {"title": "클라우드 보안"})
+    backend.soft_delete("posts", 3, {"deleted_at": "2024-01-02T00:00:00+00:00"})
+    backend.update_many("posts", {4: {"viewCount": 100}, 5: {"viewCount": 7}})
+    return backend
+
+
+def snapshot(backend) -> dict:
+    pages = {}
+    for order_by in ["created_at", "viewCount"]:
+        for where in [None, {"userId": "a"}]:
+            rows, total = backend.list_page("posts", order_by=order_by, limit=2, offset=1, where=where)
+            pages[(order_by, str(where))] = ([r["postId"] for r in rows], total)
+    return {
+        "pages": pages,
+        "after": [r["postId"] for r in backend.list_page("posts", order_by="viewCount", limit=10, after=(20, 2))[0]],
+        "count": backend.count("posts", "user_count", ["a", "b", "c"]),
+        "search": sorted(backend.search("posts", "text", "클라우드").items()),
+        "get_many": sorted(backend.get_many("posts", [1, 3, 99])),
+        "by_author": [r["postId"] for r in backend.list_by("posts", "userId", "a")],
+        "records": sorted(backend.load_all("posts"), key=lambda r: r["postId"]),
+        "next_id": backend.next_id("posts"),
+    }
+
+
+def test_sqlite_backend_answers_like_json_backend(tmp_path):
+    json_backend = fill(JSONFileBackend(str(tmp_path / "json")))
+    sqlite_backend = fill(SQLiteBackend(str(tmp_path / "social.db")))
+    try:
+        expected = snapshot(json_backend)
+        assert expected["pages"][("viewCount", "None")] == ([2, 1], 4)
+        assert snapshot(sqlite_backend) == expected
+    finally:
+        json_backend.close()
+        sqlite_backend.close()
@@ -0,0 +1,27 @@
+from utils import data
+
+from tests.conftest import bearer, signup_and_login
+
+
+def test_my_comments_look_up_posts_in_one_batch(client, monkeypatch):
+    headers = bearer(signup_and_login(client)["access_token"])
+    for title in ["첫 글", "둘째 글"]:
+        assert client.post("/posts", json={"title": title, "content": "c"}, headers=headers).status_code == 201
+    for post_id in [1, 2, 1]:
+        response = client.post(f"/comments/post/{post_id}", json={"content": f"on {post_id}"}, headers=headers)
+        assert response.status_code == 201
+
+    backend = data.get_backend()
+    calls = []
+    real_get, real_get_many = backend.get, backend.get_many
+    monkeypatch.setattr(backend, "get", lambda *a: calls.append(("get", a[0])) or real_get(*a))
+    monkeypatch.setattr(backend, "get_many", lambda name, keys: calls.append(("get_many", name, sorted(keys)))
+                        or real_get_many(name, keys))
+
+    response = client.get("/comments/me", headers=headers)
+    assert response.status_code == 200
+    assert [(c["postId"], c["postTitle"]) for c in response.json()["data"]] == [
+        (1, "첫 글"), (2, "둘째 글"), (1, "첫 글"),
+    ]
+    # 댓글마다 게시글을 찾지 않고 한 번에 찾는다
+    assert calls == [("get_many", "posts", [1, 2])]
@@ -0,0 +1,36 @@
+from utils import data
+
+from tests.conftest import bearer, signup_and_login
+
+
+def comment(comment_id: int, post_id: int, user_id: str) -> dict:
+    return {"commentId": comment_id, "postId": post_id, "userId": user_id, "content": "c",
+            "created_at": f"2024-01-01T00:00:{comment_id:02d}+00:00", "is_deleted": False}
+
+
+def test_counters_follow_inserts_moves_and_deletes(backend):
+    for comment_id, post_id, user_id in [(1, 1, "a"), (2, 1, "b"), (3, 2, "a")]:
+        data.insert_record("comments", comment(comment_id, post_id, user_id))
+    assert data.count_records("comments", "post_count", [1, 2, 3]) == {1: 2, 2: 1, 3: 0}
+
+    data.update_record("comments", 2, {"postId": 2})
+    data.soft_delete_record("comments", 3)
+    data.update_record("comments", 1, {"content": "changed"})
+    assert data.count_records("comments", "post_count", [1, 2]) == {1: 1, 2: 1}
+    assert data.count_records("comments", "user_count", ["a", "b"]) == {"a": 1, "b": 1}
+
+
+def test_listing_totals_and_comment_count(client):
+    headers = bearer(signup_and_login(client)["access_token"])
+    for _ in range(3):
+        assert client.post("/posts", json={"title": "t", "content": "c"}, headers=headers).status_code == 201
+    for post_id in [1, 1, 2]:
+        assert client.post(f"/comments/post/{post_id}", json={"content": "c"}, headers=headers).status_code == 201
+    assert client.delete("/posts/3", headers=headers).status_code == 204
+    assert client.delete("/comments/2", headers=headers).status_code == 204
+
+    body = client.get("/posts?comment_count=true&limit=1").json()
+    assert body["pagination"]["total"] == 2
+    assert body["data"] == [{"postId": 2, "title": "t", "nickname": "nick", "commentCount": 1}]
+    assert client.get("/comments/post/1").json()["pagination"]["total"] == 1
+    assert client.get("/comments/me", headers=headers).json()["pagination"]["total"] == 2
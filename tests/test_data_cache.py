@@ -0,0 +1,36 @@
+import json
+import os
+
+from utils.storage.json_backend import JSONFileBackend
+
+
+def post(post_id: int, title: str = "t") -> dict:
+    return {"postId": post_id, "userId": "u", "title": title, "content": "c",
+            "created_at": "2024-01-01T00:00:00+00:00", "is_deleted": False}
+
+
+def write_externally(path: str, records):
+    # 다른 프로세스나 사람이 파일을 직접 고친 경우 (mtime 이 같은 값으로 남지 않도록 한 번 더 바꾼다)
+    before = os.stat(path).st_mtime_ns
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f)
+    os.utime(path, ns=(before + 1_000_000, before + 1_000_000))
+
+
+def test_parsed_collection_is_reused_until_file_changes(tmp_path):
+    backend = JSONFileBackend(str(tmp_path), storage_mode="snapshot", data_format="json", cache_enabled=True)
+    backend.replace_all("posts", [post(1)])
+
+    first = backend.load_all("posts")
+    assert backend.load_all("posts") is first  # 파일이 그대로면 다시 파싱하지 않는다
+
+    write_externally(str(tmp_path / "posts.json"), [post(1, "changed"), post(2)])
+    reloaded = backend.load_all("posts")
+    assert [r["title"] for r in reloaded] == ["changed", "t"]
+    assert backend.get("posts", 2) == post(2)
+
+
+def test_disabled_cache_reads_file_every_time(tmp_path):
+    backend = JSONFileBackend(str(tmp_path), storage_mode="snapshot", data_format="json", cache_enabled=False)
+    backend.replace_all("posts", [post(1)])
+    assert backend.load_all("posts") is not backend.load_all("posts")
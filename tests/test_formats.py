@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from utils import formats
+from utils.storage.convert import convert
+from utils.storage.json_backend import JSONFileBackend
+
+RECORDS = [{"postId": 1, "title": "한글 제목", "viewCount": 3, "deleted_at": None, "is_deleted": False}]
+
+
+@pytest.mark.parametrize("fmt", [formats.FORMAT_JSON, formats.FORMAT_JSON_COMPACT, formats.FORMAT_MSGPACK])
+def test_dumps_loads_round_trip(fmt):
+    if fmt == formats.FORMAT_MSGPACK:
+        pytest.importorskip("msgpack")
+    raw = formats.dumps(RECORDS, fmt)
+    assert formats.detect(raw) == (formats.FORMAT_MSGPACK if fmt == formats.FORMAT_MSGPACK else formats.FORMAT_JSON)
+    assert formats.loads(raw) == RECORDS
+
+
+def test_json_with_bom_and_broken_files():
+    assert formats.loads(b"\xef\xbb\xbf" + formats.dumps(RECORDS, formats.FORMAT_JSON)) == RECORDS
+    # 깨진 파일은 빈 데이터가 아니라 ValueError
+    with pytest.raises(ValueError):
+        formats.loads(b'[{"postId": 1')
+
+
+def test_existing_files_are_read_after_format_change(tmp_path):
+    pytest.importorskip("msgpack")
+    data_dir = str(tmp_path)
+    JSONFileBackend(data_dir, data_format=formats.FORMAT_JSON).replace_all("posts", RECORDS)
+
+    # 형식을 바꿔 띄워도 기존 json 파일을 읽고, 다음 저장부터 새 형식으로 쓴다
+    backend = JSONFileBackend(data_dir, data_format=formats.FORMAT_MSGPACK, storage_mode="snapshot")
+    assert backend.get("posts", 1) == RECORDS[0]
+    backend.update("posts", 1, {"viewCount": 4})
+    assert os.path.exists(os.path.join(data_dir, "posts.msgpack"))
+    assert not os.path.exists(os.path.join(data_dir, "posts.json"))
+    assert JSONFileBackend(data_dir, cache_enabled=False).get("posts", 1)["viewCount"] == 4
+
+
+def test_convert_applies_journal_and_removes_old_files(tmp_path):
+    data_dir = str(tmp_path)
+    backend = JSONFileBackend(data_dir, data_format=formats.FORMAT_JSON, storage_mode="journal")
+    backend.replace_all("posts", RECORDS)
+    backend.update("posts", 1, {"title": "바뀐 제목"})
+    assert os.path.exists(os.path.join(data_dir, "posts.journal.jsonl"))
+
+    convert(data_dir, formats.FORMAT_JSON_COMPACT)
+    assert sorted(f for f in os.listdir(data_dir) if f.startswith("posts")) == ["posts.json", "posts.seq"]
+    with open(os.path.join(data_dir, "posts.json"), "rb") as f:
+        raw = f.read()
+    assert b"\n" not in raw and formats.loads(raw)[0]["title"] == "바뀐 제목"
@@ -0,0 +1,49 @@
+from utils import data
+
+
+def comment(comment_id: int, post_id: int, user_id: str = "u") -> dict:
+    return {"commentId": comment_id, "postId": post_id, "userId": user_id, "content": "c",
+            "created_at": f"2024-01-01T00:00:{comment_id:02d}+00:00", "is_deleted": False}
+
+
+def like(like_id: int, post_id: int, user_id: str) -> dict:
+    return {"likeId": like_id, "postId": post_id, "userId": user_id,
+            "created_at": f"2024-01-01T00:00:{like_id:02d}+00:00", "is_deleted": False}
+
+
+def test_group_index_follows_inserts_and_updates(backend):
+    for comment_id, post_id in [(1, 1), (2, 2), (3, 1), (4, 1)]:
+        data.insert_record("comments", comment(comment_id, post_id))
+
+    # 게시글별 댓글은 최신순, 삭제된 댓글도 목록에는 남는다
+    data.soft_delete_record("comments", 3, {"deleted_at": "2024-01-02T00:00:00+00:00"})
+    rows = data.list_by("comments", "postId", 1)
+    assert [r["commentId"] for r in rows] == [4, 3, 1]
+    assert [r["is_deleted"] for r in rows] == [False, True, False]
+
+    data.update_record("comments", 4, {"postId": 2})
+    assert [r["commentId"] for r in data.list_by("comments", "postId", 1)] == [3, 1]
+    assert [r["commentId"] for r in data.list_by("comments", "postId", 2)] == [4, 2]
+    assert data.list_by("comments", "postId", 99) == []
+
+
+def test_unique_index_only_sees_active_likes(backend):
+    data.insert_record("likes", like(1, 1, "a"))
+    data.insert_record("likes", like(2, 1, "b"))
+    assert data.find_by("likes", "active", (1, "a"))["likeId"] == 1
+
+    # 취소한 좋아요는 찾지 않고, 다시 누른 좋아요가 그 자리를 차지한다
+    data.soft_delete_record("likes", 1)
+    assert data.find_by("likes", "active", (1, "a")) is None
+    data.insert_record("likes", like(3, 1, "a"))
+    assert data.find_by("likes", "active", (1, "a"))["likeId"] == 3
+    assert data.find_by("likes", "active", (2, "a")) is None
+    assert [r["likeId"] for r in data.list_by("likes", "postId", 1)] == [1, 2, 3]
+
+
+def test_posts_by_author(backend):
+    for post_id, user_id in [(1, "a"), (2, "b"), (3, "a")]:
+        data.insert_record("posts", {"postId": post_id, "userId": user_id, "title": "t", "content": "c",
+                                     "created_at": f"2024-01-01T00:00:{post_id:02d}+00:00", "is_deleted": False})
+    assert [r["postId"] for r in data.list_by("posts", "userId", "a")] == [1, 3]
+    assert [r["postId"] for r in data.list_by("posts", "userId", "b")] == [2]
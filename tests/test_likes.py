@@ -0,0 +1,21 @@
+from tests.conftest import bearer, signup_and_login
+
+
+def test_deleted_post_drops_out_of_my_likes(client):
+    author = bearer(signup_and_login(client)["access_token"])
+    reader = bearer(signup_and_login(client, email="b@example.com", nickname="reader")["access_token"])
+    for i in range(3):
+        assert client.post("/posts", json={"title": f"t{i}", "content": "c"}, headers=author).status_code == 201
+        assert client.post(f"/likes/posts/{i + 1}", headers=reader).status_code == 201
+
+    assert client.delete("/posts/3", headers=author).status_code == 204
+
+    # 지운 글의 좋아요가 목록 개수에도, 페이지에도 남지 않는다
+    first = client.get("/likes/me?limit=1", headers=reader).json()
+    assert first["pagination"]["total"] == 2
+    assert [p["postId"] for p in first["data"]] == [2]
+    second = client.get(f"/likes/me?limit=1&cursor={first['pagination']['next_cursor']}", headers=reader).json()
+    assert [p["postId"] for p in second["data"]] == [1]
+    assert second["pagination"]["next_cursor"] is None
+
+    assert client.get("/likes/posts/3", headers=reader).status_code == 404
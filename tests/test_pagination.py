@@ -0,0 +1,53 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from tests.conftest import bearer, signup_and_login
+from utils.pagination import decode_cursor, encode_cursor
+
+
+def raw_cursor(*parts) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(parts)).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("created_at", "2024-01-01T00:00:00+00:00", 7)
+    assert decode_cursor(cursor, "created_at", "posts") == ("2024-01-01T00:00:00+00:00", 7)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-base64!",
+    raw_cursor("viewCount", 1, 1),             # 다른 정렬 기준
+    raw_cursor("created_at", 1, 1),            # 정렬 값 타입이 다름
+    raw_cursor("created_at", "2024-01-01", [1]),  # 기본키가 리스트
+    raw_cursor("created_at", "2024-01-01", {"a": 1}),
+    raw_cursor("created_at", "2024-01-01", "1"),  # posts 의 기본키는 정수
+    raw_cursor("created_at", "2024-01-01", True),
+    raw_cursor("created_at", "2024-01-01", None),
+])
+def test_bad_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, "created_at", "posts")
+    assert error.value.status_code == 400
+
+
+def test_user_key_must_be_string():
+    with pytest.raises(HTTPException):
+        decode_cursor(raw_cursor("created_at", "2024-01-01", 1), "created_at", "users")
+
+
+def test_unhashable_cursor_key_over_http(client):
+    tokens = signup_and_login(client)
+    headers = bearer(tokens["access_token"])
+    for i in range(3):
+        assert client.post("/posts", json={"title": f"t{i}", "content": "c"}, headers=headers).status_code == 201
+
+    first = client.get("/posts/me?limit=2", headers=headers).json()
+    second = client.get(f"/posts/me?limit=2&cursor={first['pagination']['next_cursor']}", headers=headers).json()
+    assert [p["postId"] for p in first["data"] + second["data"]] == [3, 2, 1]
+
+    bad = raw_cursor("created_at", "2024-01-01", [1])
+    assert client.get(f"/posts/me?cursor={bad}", headers=headers).status_code == 400
+    assert client.get(f"/posts?cursor={bad}").status_code == 400
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from utils import auth
+from utils.password_pool import PasswordPool, PasswordPoolBusy, check_password, hash_password
+
+from tests.conftest import PASSWORD
+
+
+def hold_slot(pool: PasswordPool):
+    # 대기열 자리를 하나 차지하는 작업 (돌려받은 함수를 부르면 끝날 때까지 기다린다)
+    started, done = threading.Event(), threading.Event()
+
+    def task():
+        started.set()
+        done.wait(5)
+
+    thread = threading.Thread(target=pool.run, args=(task,), daemon=True)
+    thread.start()
+    assert started.wait(5)
+
+    def release():
+        done.set()
+        thread.join(5)
+    return release
+
+
+def test_run_rejects_when_queue_is_full():
+    pool = PasswordPool(workers=0, queue_size=0)
+    release = hold_slot(pool)
+    with pytest.raises(PasswordPoolBusy):
+        pool.run(hash_password, PASSWORD)
+    release()
+    assert check_password(pool.run(hash_password, PASSWORD), PASSWORD)
+    assert pool.stats()["rejected"] == 1 and pool.stats()["completed"] == 2
+
+
+def test_busy_pool_answers_503_with_retry_after(client, monkeypatch):
+    pool = PasswordPool(workers=0, queue_size=0)
+    monkeypatch.setattr(auth, "password_pool", pool)
+    release = hold_slot(pool)
+    try:
+        response = client.post("/users/", json={"email": "a@example.com", "name": "a",
+                                                "password": PASSWORD, "nickname": "nick"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(auth.PASSWORD_RETRY_AFTER)
+    finally:
+        release()
+
+
+def test_worker_process_hashes_with_configured_cost():
+    pool = PasswordPool(workers=1, queue_size=0)
+    pool.configure(time_cost=1, memory_cost=8, parallelism=1)
+    try:
+        hashed = pool.run(hash_password, PASSWORD)
+        assert "m=8,t=1,p=1" in hashed
+        assert pool.run(check_password, hashed, PASSWORD) is True
+        assert pool.run(check_password, hashed, "wrong") is False
+    finally:
+        pool.close()
+        # 이 프로세스의 해시 비용을 앱 설정으로 되돌린다
+        auth.password_pool.configure(auth.ARGON2_TIME_COST, auth.ARGON2_MEMORY_COST, auth.ARGON2_PARALLELISM)
@@ -0,0 +1,52 @@
+import pytest
+
+from utils import auth, calibrate_password, data
+
+from tests.conftest import PASSWORD, signup_and_login
+
+CHEAPER = {"time_cost": 1, "memory_cost": 8, "parallelism": 1}
+
+
+@pytest.fixture
+def change_cost():
+    # 서버를 다른 ARGON2_* 로 다시 띄운 것처럼 해시 비용을 바꾼다 (끝나면 앱 설정으로 되돌린다)
+    yield lambda: auth.password_pool.configure(**CHEAPER)
+    auth.password_pool.configure(auth.ARGON2_TIME_COST, auth.ARGON2_MEMORY_COST, auth.ARGON2_PARALLELISM)
+
+
+def test_login_rehashes_password_after_cost_change(client, change_cost):
+    user_id = auth.token_claims(signup_and_login(client)["access_token"])["sub"]
+    old_hash = data.get_record("users", user_id)["password"]
+    assert not auth.password_needs_rehash(old_hash)
+
+    change_cost()
+    assert auth.password_needs_rehash(old_hash)
+    response = client.post("/auth/tokens", data={"username": "a@example.com", "password": PASSWORD})
+    assert response.status_code == 200
+
+    # 응답 뒤 백그라운드 작업이 새 비용으로 다시 저장하고, 새 해시로도 로그인된다
+    new_hash = data.get_record("users", user_id)["password"]
+    assert "m=8,t=1,p=1" in new_hash and not auth.password_needs_rehash(new_hash)
+    response = client.post("/auth/tokens", data={"username": "a@example.com", "password": PASSWORD})
+    assert response.status_code == 200
+    assert data.get_record("users", user_id)["password"] == new_hash
+
+
+def test_rehash_skips_password_changed_meanwhile(client, change_cost):
+    user_id = auth.token_claims(signup_and_login(client)["access_token"])["sub"]
+    current = data.get_record("users", user_id)["password"]
+    change_cost()
+    auth.rehash_password(user_id, "older-hash", PASSWORD)
+    assert data.get_record("users", user_id)["password"] == current
+
+
+def test_calibrate_picks_largest_cost_within_target(monkeypatch):
+    # 시간이 time_cost x 메모리에 비례하는 가짜 측정 (64 MiB, time_cost=1 에서 100 ms)
+    monkeypatch.setattr(calibrate_password, "measure",
+                        lambda time_cost, memory_cost, parallelism, rounds: time_cost * memory_cost / 65536 * 0.1)
+
+    assert calibrate_password.calibrate(0.25, 65536, 1) == (2, 65536, pytest.approx(0.2))
+    # time_cost=1 로도 넘으면 메모리를 절반씩 줄인다
+    assert calibrate_password.calibrate(0.04, 65536, 1) == (1, 16384, pytest.approx(0.025))
+    # 최소 메모리로도 넘으면 가장 작은 비용
+    assert calibrate_password.calibrate(0.001, 65536, 1)[:2] == (1, calibrate_password.MIN_MEMORY_KIB)
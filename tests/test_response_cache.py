@@ -0,0 +1,52 @@
+from utils.response_cache import ResponseCache, etag_matches, response_cache
+
+from tests.conftest import bearer, signup_and_login
+
+
+def test_etag_changes_after_writes_to_read_collections(client):
+    headers = bearer(signup_and_login(client)["access_token"])
+    assert client.post("/posts", json={"title": "t", "content": "c"}, headers=headers).status_code == 201
+
+    first = client.get("/posts?comment_count=true")
+    hits = response_cache.stats()["hits"]
+    assert client.get("/posts?comment_count=true").headers["ETag"] == first.headers["ETag"]
+    assert response_cache.stats()["hits"] == hits + 1
+
+    # 목록이 읽는 다른 컬렉션(댓글 수)이 바뀌어도 다시 계산한다
+    assert client.post("/comments/post/1", json={"content": "c"}, headers=headers).status_code == 201
+    second = client.get("/posts?comment_count=true", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200 and second.headers["ETag"] != first.headers["ETag"]
+    assert second.json()["data"][0]["commentCount"] == 1
+
+    # 다시 계산해도 본문이 같으면 ETag 도 같다 (댓글 수를 싣지 않는 목록)
+    plain = client.get("/posts")
+    assert client.post("/comments/post/1", json={"content": "c"}, headers=headers).status_code == 201
+    assert client.get("/posts", headers={"If-None-Match": plain.headers["ETag"]}).status_code == 304
+
+
+def test_errors_are_not_cached(client):
+    assert client.get("/posts/1").status_code == 404
+    headers = bearer(signup_and_login(client)["access_token"])
+    assert client.post("/posts", json={"title": "t", "content": "c"}, headers=headers).status_code == 201
+    assert client.get("/posts/1").status_code == 200
+
+
+def test_etag_matching():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag) and etag_matches('W/"abc"', etag)
+    assert etag_matches('"x", "abc"', etag) and etag_matches("*", etag)
+    assert not etag_matches('"x"', etag) and not etag_matches(None, etag)
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResponseCache(max_bytes=10)
+    cache.put(("a",), (1,), "ea", b"aaaa")
+    cache.put(("b",), (1,), "eb", b"bbbb")
+    assert cache.get(("a",), (1,)) == ("ea", b"aaaa")
+    cache.put(("c",), (1,), "ec", b"cccc")
+    assert cache.get(("b",), (1,)) is None
+    assert cache.get(("a",), (1,)) is not None and cache.get(("c",), (1,)) is not None
+    # 버전이 바뀐 항목은 쓰지 않고, 한도보다 큰 본문은 담지 않는다
+    assert cache.get(("a",), (2,)) is None
+    cache.put(("d",), (1,), "ed", b"d" * 11)
+    assert cache.stats()["entries"] == 2 and cache.stats()["evictions"] == 1
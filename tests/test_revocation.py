@@ -0,0 +1,40 @@
+import time
+
+from utils.revocation import RevocationList
+
+from tests.conftest import bearer, signup_and_login
+
+
+def test_revocation_list_blocks_tokens_issued_before_revoke(monkeypatch):
+    revoked = RevocationList(ttl=60)
+    monkeypatch.setattr(time, "time", lambda: 1000.0)
+    revoked.revoke("u1")
+    assert revoked.is_revoked("u1", 999) and revoked.is_revoked("u1", 1000)
+    assert not revoked.is_revoked("u1", 1001)
+    assert revoked.is_revoked("u1", None)  # iat 가 없는 토큰은 믿지 않는다
+    assert not revoked.is_revoked("u2", 999)
+
+    # access token 수명이 지난 항목은 다음 revoke 때 정리된다
+    monkeypatch.setattr(time, "time", lambda: 1100.0)
+    revoked.revoke("u2")
+    assert revoked.stats() == {"entries": 1}
+    assert not revoked.is_revoked("u1", 999)
+
+
+def test_claims_are_trusted_until_revoked(client, monkeypatch):
+    # 클레임을 믿는 동안은 유저 레코드를 읽지 않고, 폐기 목록에 오르면 그 전에 발급된 토큰은 레코드를 읽는다
+    from utils import auth
+
+    tokens = signup_and_login(client)
+    headers = bearer(tokens["access_token"])
+    loads = []
+    real_load_active_user = auth.load_active_user
+    monkeypatch.setattr(auth, "load_active_user", lambda user_id: loads.append(user_id) or real_load_active_user(user_id))
+
+    assert client.post("/posts", json={"title": "t", "content": "c"}, headers=headers).status_code == 201
+    assert loads == []
+
+    user_id = auth.token_claims(tokens["access_token"])["sub"]
+    auth.revoked_claims.revoke(user_id)
+    created = client.post("/posts", json={"title": "t", "content": "c"}, headers=headers)
+    assert created.status_code == 201 and loads == [user_id]
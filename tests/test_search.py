@@ -0,0 +1,39 @@
+from utils import data
+from utils.search import TextIndex
+
+
+def post(post_id: int, title: str, content: str = "c") -> dict:
+    return {"postId": post_id, "userId": "u", "title": title, "content": content,
+            "created_at": f"2024-01-01T00:00:{post_id:02d}+00:00", "is_deleted": False}
+
+
+def test_single_hangul_char_search_follows_changes(backend):
+    data.insert_record("posts", post(1, "커뮤니티"))
+    data.insert_record("posts", post(2, "티셔츠"))
+    data.insert_record("posts", post(3, "클라우드"))
+    data.insert_record("posts", post(4, "티"))
+
+    # 글자가 bigram 앞에 있든 뒤에 있든, 한 글자 단어여도 찾는다
+    assert set(data.search_records("posts", "text", "티")) == {1, 2, 4}
+    assert set(data.search_records("posts", "text", "뮤")) == {1}
+
+    data.update_record("posts", 2, {"title": "셔츠"})
+    data.update_record("posts", 4, {"is_deleted": True})
+    assert set(data.search_records("posts", "text", "티")) == {1}
+    assert set(data.search_records("posts", "text", "셔")) == {2}
+
+
+def test_text_index_forgets_chars_of_removed_tokens():
+    index = TextIndex({"title": 1})
+    first, second = post(1, "커뮤니티"), post(2, "니티")
+    index.add(first, 0, 1)
+    index.add(second, 1, 2)
+    assert index.search("니") == {1: 1, 2: 1}
+
+    index.discard(1, first)
+    assert index.search("니") == {2: 1}
+    assert "커" not in index._by_char["title"]
+    assert index._by_char["title"]["니"] == {"니티"}
+
+    index.discard(2, second)
+    assert index._by_char["title"] == {} and index._postings["title"] == {}
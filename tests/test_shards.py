@@ -0,0 +1,50 @@
+import pytest
+
+from utils.storage.json_backend import JSONFileBackend
+from utils.storage.shards import ShardSet, shard_stats
+
+
+def post(post_id: int) -> dict:
+    return {"postId": post_id, "userId": "u", "title": "t", "content": "c",
+            "created_at": f"2024-01-01T00:{post_id // 60:02d}:{post_id % 60:02d}+00:00", "is_deleted": False}
+
+
+@pytest.fixture
+def sharded(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_SHARD_MANIFEST_SAVE_EVERY", "100")
+    return lambda: JSONFileBackend(str(tmp_path), storage_mode="journal", shard_size=10)
+
+
+def test_manifest_is_saved_per_new_shard_not_per_insert(sharded, monkeypatch):
+    saves = []
+    real_save = ShardSet._save
+    monkeypatch.setattr(ShardSet, "_save", lambda self, manifest: saves.append(1) or real_save(self, manifest))
+
+    backend = sharded()
+    for i in range(1, 26):
+        backend.insert("posts", post(i))
+    backend.soft_delete("posts", 3, {})
+    backend.update_many("posts", {12: {"viewCount": 5}})
+    assert len(saves) == 3  # 샤드 0, 1, 2 가 생길 때만
+
+    # 메모리에서 고친 통계가 샤드를 다시 읽어 계산한 통계와 같다
+    shards = backend._shards("posts")
+    for shard, stats in shards.manifest()["shards"].items():
+        records = shards._collection(shard).records
+        assert {k: v for k, v in stats.items() if k != "stamp"} == shard_stats(records, shards.range_fields)
+
+    backend.close()
+    assert len(saves) == 4
+
+
+def test_unsaved_manifest_changes_are_recovered_from_shard_files(sharded):
+    backend = sharded()
+    for i in range(1, 8):
+        backend.insert("posts", post(i))
+    backend.soft_delete("posts", 2, {})
+    # close() 없이 끝난 워커: 매니페스트 파일에는 첫 글만 적혀 있다
+
+    restarted = sharded()
+    rows, total = restarted.list_page("posts", order_by="created_at", limit=10)
+    assert [r["postId"] for r in rows] == [7, 6, 5, 4, 3, 1] and total == 6
+    assert restarted.count("posts", "count", [None]) == {None: 6}
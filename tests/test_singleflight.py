@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+CALLERS = 5
+
+
+def wait_for_followers(flight: SingleFlight, followers: int):
+    # 나머지 요청이 모두 진행 중인 계산에 붙을 때까지 계산을 끝내지 않는다
+    deadline = time.monotonic() + 5
+    while flight.stats()["coalesced"] < followers:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_do_runs_once_for_concurrent_callers():
+    flight = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        wait_for_followers(flight, CALLERS - 1)
+        return ["rows"]
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        results = list(pool.map(lambda _: flight.do("posts", compute), range(CALLERS)))
+    assert results == [["rows"]] * CALLERS and len(calls) == 1
+    assert flight.stats() == {"executions": 1, "coalesced": CALLERS - 1, "in_flight": 0}
+
+    # 끝난 결과는 들고 있지 않는다
+    assert flight.do("posts", lambda: ["again"]) == ["again"]
+
+
+def test_do_shares_errors_and_separates_keys():
+    flight = SingleFlight()
+
+    def failing():
+        wait_for_followers(flight, CALLERS - 1)
+        raise ValueError("boom")
+
+    def attempt(_):
+        with pytest.raises(ValueError):
+            flight.do("bad", failing)
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        list(pool.map(attempt, range(CALLERS)))
+    assert flight.stats()["executions"] == 1
+
+    assert [flight.do(("posts", version), lambda: version) for version in (1, 2)] == [1, 2]
+    assert flight.stats() == {"executions": 3, "coalesced": CALLERS - 1, "in_flight": 0}
+
+
+def test_disabled_flight_always_computes():
+    flight = SingleFlight(enabled=False)
+    assert [flight.do("key", lambda: 1) for _ in range(3)] == [1, 1, 1]
+    assert flight.stats()["executions"] == 0
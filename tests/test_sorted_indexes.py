@@ -0,0 +1,41 @@
+import pytest
+
+from utils import data
+
+
+def post(post_id: int, user_id: str, views: int) -> dict:
+    return {"postId": post_id, "userId": user_id, "title": "t", "content": "c", "viewCount": views, "likeCount": 0,
+            "created_at": f"2024-01-01T00:00:{post_id:02d}+00:00", "is_deleted": False}
+
+
+def page(order_by: str, where=None, limit: int = 10, offset: int = 0):
+    rows, total = data.list_page("posts", order_by=order_by, limit=limit, offset=offset, where=where)
+    return [r["postId"] for r in rows], total
+
+
+@pytest.fixture
+def posts(backend):
+    for post_id, user_id, views in [(1, "a", 5), (2, "b", 5), (3, "a", 1), (4, "b", 9), (5, "a", 5)]:
+        data.insert_record("posts", post(post_id, user_id, views))
+
+
+def test_sorted_order_follows_updates(posts):
+    # 같은 조회수면 먼저 저장된 글이 앞
+    assert page("viewCount") == ([4, 1, 2, 5, 3], 5)
+    assert page("created_at") == ([5, 4, 3, 2, 1], 5)
+
+    data.update_record("posts", 3, {"viewCount": 7})
+    data.update_records("posts", {4: {"viewCount": 0}, 2: {"likeCount": 2}})
+    assert page("viewCount") == ([3, 1, 2, 5, 4], 5)
+    assert page("likeCount") == ([2, 1, 3, 4, 5], 5)
+    assert page("viewCount", limit=2, offset=1) == ([1, 2], 5)
+
+
+def test_deleted_posts_leave_sorted_order(posts):
+    data.soft_delete_record("posts", 1)
+    assert page("viewCount") == ([4, 2, 5, 3], 4)
+    assert page("viewCount", where={"userId": "a"}) == ([5, 3], 2)
+
+    data.update_record("posts", 5, {"userId": "b"})
+    assert page("created_at", where={"userId": "b"}) == ([5, 4, 2], 3)
+    assert page("created_at", where={"userId": "a"}) == ([3], 1)
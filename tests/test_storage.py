@@ -0,0 +1,75 @@
+import pytest
+
+from utils import data, journal
+from utils.storage.json_backend import JSONFileBackend
+from utils.storage.migrate import migrate
+from utils.storage.sqlite_backend import SQLiteBackend
+
+
+def post(post_id: int) -> dict:
+    return {"postId": post_id, "userId": "u", "title": "t", "content": "c",
+            "created_at": f"2024-01-01T00:00:{post_id % 60:02d}+00:00", "is_deleted": False}
+
+
+def test_save_data_reseeds_sequence(backend):
+    data.save_data("posts", [post(1)])
+    assert data.next_id("posts") == 2
+
+    # 시퀀스가 이미 있어도 통째로 바꾼 데이터의 최대 id 뒤에서 이어서 발급한다
+    data.save_data("posts", [post(1), post(50)])
+    assert data.next_id("posts") == 51
+
+    # 더 작은 데이터로 바꿔도 이미 발급한 id 는 다시 주지 않는다
+    data.save_data("posts", [post(1)])
+    assert data.next_id("posts") > 51
+
+
+def test_migrate_reseeds_existing_sqlite_sequence(tmp_path):
+    data_dir, sqlite_path = str(tmp_path / "data"), str(tmp_path / "social.db")
+    JSONFileBackend(data_dir, cache_enabled=False).replace_all("posts", [post(1)])
+    migrate(data_dir, sqlite_path)
+    target = SQLiteBackend(sqlite_path)
+    assert target.next_id("posts") == 2
+    target.close()
+
+    JSONFileBackend(data_dir, cache_enabled=False).replace_all("posts", [post(1), post(2), post(30)])
+    migrate(data_dir, sqlite_path)
+    target = SQLiteBackend(sqlite_path)
+    assert target.next_id("posts") == 31
+    target.close()
+
+
+def test_find_user_by_id_returns_copy(backend):
+    data.insert_record("users", {"userId": "u1", "email": "a@example.com", "nickname": "nick"})
+    user = data.find_user_by_id("u1")
+    assert user["is_deleted"] is False and user["deleted_at"] is None
+
+    # 돌려받은 dict 를 바꿔도 저장소(캐시)의 레코드는 그대로다
+    user["nickname"] = "changed"
+    stored = data.get_record("users", "u1")
+    assert stored["nickname"] == "nick"
+    assert "is_deleted" not in stored
+
+
+@pytest.mark.parametrize("storage_mode", ["snapshot", "journal"])
+def test_failed_write_does_not_leave_change_in_cache(tmp_path, monkeypatch, storage_mode):
+    backend = JSONFileBackend(str(tmp_path), storage_mode=storage_mode, cache_enabled=True)
+    backend.insert("posts", post(1))
+
+    def disk_full(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(journal, "append_entries", disk_full)
+    monkeypatch.setattr(backend, "_write_snapshot", disk_full)
+    with pytest.raises(OSError):
+        backend.insert("posts", post(2))
+    with pytest.raises(OSError):
+        backend.update("posts", 1, {"title": "changed"})
+    with pytest.raises(OSError):
+        backend.update_many("posts", {1: {"viewCount": 5}})
+
+    # 디스크에 없는 변경은 다음 읽기에도 보이지 않는다
+    assert backend.get("posts", 2) is None
+    assert backend.get("posts", 1) == post(1)
+    rows, total = backend.list_page("posts", order_by="created_at", limit=10)
+    assert [r["postId"] for r in rows] == [1] and total == 1
@@ -0,0 +1,25 @@
+import random
+
+import pytest
+
+from utils.storage import topk
+
+
+@pytest.mark.parametrize("k", [0, 1, 3, 10, 60, 500])
+def test_top_matches_full_sort_including_ties(k):
+    rng = random.Random(k)
+    rows = [(rng.randint(0, 20), i) for i in range(400)]  # 값이 자주 겹친다
+    key = lambda row: row[0]
+    # 힙 경로(얕은 k)든 정렬 경로(깊은 k)든 sorted 와 같고, 동점이면 원래 순서
+    assert topk.top(rows, key, k) == sorted(rows, key=key, reverse=True)[:k]
+
+
+def test_heap_is_used_only_for_shallow_pages(monkeypatch):
+    calls = []
+    real_nlargest = topk.heapq.nlargest
+    monkeypatch.setattr(topk.heapq, "nlargest", lambda *a, **kw: calls.append(a[0]) or real_nlargest(*a, **kw))
+
+    rows = list(range(1000))
+    topk.top(rows, lambda x: x, 10)
+    topk.top(rows, lambda x: x, 200)
+    assert calls == [10]
@@ -0,0 +1,93 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+
+import pytest
+from fastapi import HTTPException
+
+from routers import likes
+from tests.conftest import bearer, signup_and_login
+from utils import data
+from utils.data import transaction
+
+
+def like(post_id: int, user_id: str) -> int:
+    # 라우트가 돌려줄 상태 코드 (성공 201, 실패는 HTTPException 의 코드)
+    try:
+        likes._like_post(post_id, {"userId": user_id})
+        return 201
+    except HTTPException as error:
+        return error.status_code
+
+
+def add_post():
+    data.insert_record("posts", {"postId": 1, "userId": "u", "title": "t", "content": "c",
+                                 "created_at": "2024-01-01T00:00:00+00:00", "likeCount": 0})
+
+
+def test_concurrent_likes_are_not_lost(backend):
+    add_post()
+    with ThreadPoolExecutor(16) as pool:
+        results = list(pool.map(lambda i: like(1, f"user-{i}"), range(64)))
+
+    assert results == [201] * 64
+    assert data.get_record("posts", 1)["likeCount"] == 64
+
+
+def like_in_worker(sqlite_path: str, user_ids) -> list:
+    # 다른 워커 프로세스에서 같은 SQLite 파일에 좋아요 (spawn 으로 새로 띄운 프로세스에서 실행된다)
+    import os
+
+    os.environ["DATA_SQLITE_PATH"] = sqlite_path
+    data.DATA_BACKEND = "sqlite"
+    data.set_backend(None)
+    return [like(1, user_id) for user_id in user_ids]
+
+
+def test_likes_from_several_processes_are_not_lost(backend, tmp_path):
+    # 프로세스 안의 잠금은 다른 워커를 막지 못하므로 읽기-수정-쓰기 전체가 SQLite 트랜잭션 하나여야 한다
+    if backend != "sqlite":
+        pytest.skip("json 저장소는 프로세스 하나에서만 쓴다")
+    add_post()
+    workers, per_worker = 4, 25
+    with ProcessPoolExecutor(workers, mp_context=get_context("spawn")) as pool:
+        batches = [[f"w{w}-{i}" for i in range(per_worker)] + ["same-user"] for w in range(workers)]
+        results = [r for rs in pool.map(like_in_worker, [str(tmp_path / "social.db")] * workers, batches) for r in rs]
+
+    assert results.count(201) == workers * per_worker + 1
+    assert data.get_record("posts", 1)["likeCount"] == workers * per_worker + 1
+    assert len(data.list_by("likes", "postId", 1)) == workers * per_worker + 1
+
+
+def test_concurrent_double_like_counts_once(backend):
+    add_post()
+    with ThreadPoolExecutor(16) as pool:
+        results = list(pool.map(lambda _: like(1, "same-user"), range(32)))
+
+    assert sorted(results) == [201] + [409] * 31
+    assert data.get_record("posts", 1)["likeCount"] == 1
+
+
+@pytest.mark.parametrize("path, locked", [
+    ("/posts?sort=views", "posts"),
+    ("/posts?comment_count=true", "comments"),
+    ("/posts/search?keyword=t", "posts"),
+    ("/posts/search?keyword=t", "users"),
+    ("/posts/me", "posts"),
+    ("/posts/1", "posts"),
+    ("/comments/me", "comments"),
+    ("/likes/me", "likes"),
+    ("/users/{userId}", "users"),
+])
+def test_reads_wait_for_writer(client, path, locked):
+    # 조회 API 는 읽기 잠금을 잡으므로, 쓰기 중인 인덱스를 읽지 않고 쓰기가 끝날 때까지 기다린다
+    tokens = signup_and_login(client)
+    headers = bearer(tokens["access_token"])
+    assert client.post("/posts", json={"title": "t", "content": "c"}, headers=headers).status_code == 201
+    user_id = data.get_record("posts", 1)["userId"]
+
+    with ThreadPoolExecutor(1) as pool:
+        with transaction(write=[locked]):
+            pending = pool.submit(client.get, path.format(userId=user_id), headers=headers)
+            with pytest.raises(TimeoutError):
+                pending.result(timeout=0.3)
+        assert pending.result(timeout=5).status_code == 200
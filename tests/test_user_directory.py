@@ -0,0 +1,56 @@
+from utils import data, user_directory as user_directory_module
+from utils.auth import get_password_hash
+from utils.storage import create_backend
+
+from tests.conftest import PASSWORD, bearer, signup_and_login
+
+
+def other_worker(backend):
+    # 같은 저장소를 쓰는 다른 워커 프로세스 (이 프로세스의 캐시/유저 디렉터리와 따로 논다)
+    return create_backend(backend, data.DATA_DIR)
+
+
+def test_login_and_signup_see_users_from_other_workers(client, backend):
+    signup_and_login(client)  # 이 워커의 디렉터리를 읽어 둔다
+
+    other = other_worker(backend)
+    other.insert("users", {"userId": "other", "email": "b@example.com", "name": "b",
+                           "password": get_password_hash(PASSWORD), "nickname": "taken",
+                           "created_at": "2024-01-01T00:00:00+00:00", "is_deleted": False, "deleted_at": None})
+    other.close()
+
+    response = client.post("/auth/tokens", data={"username": "B@example.com", "password": PASSWORD})
+    assert response.status_code == 200
+    for email, nickname in [("b@example.com", "fresh"), ("c@example.com", "TAKEN")]:
+        response = client.post("/users/", json={"email": email, "name": "c", "password": PASSWORD, "nickname": nickname})
+        assert response.status_code == 409
+
+
+def test_nickname_change_from_other_worker_is_shown(client, backend, monkeypatch):
+    monkeypatch.setattr(user_directory_module, "USER_DIRECTORY_RECHECK_SECONDS", 0)
+    headers = bearer(signup_and_login(client)["access_token"])
+    assert client.post("/posts", json={"title": "t", "content": "c"}, headers=headers).status_code == 201
+    assert client.get("/posts/1").json()["data"]["nickname"] == "nick"
+
+    user_id = next(iter(user_directory_module.user_directory.profiles))
+    other = other_worker(backend)
+    other.update("users", user_id, {"nickname": "renamed"})
+    other.close()
+
+    assert client.get("/posts/1").json()["data"]["nickname"] == "renamed"
+
+
+def test_own_writes_do_not_reload_directory(client, monkeypatch):
+    headers = bearer(signup_and_login(client)["access_token"])  # 여기서 디렉터리를 읽는다
+    loads = []
+    real_load_data = data.load_data
+
+    def counting_load_data(filename):
+        loads.append(filename)
+        return real_load_data(filename)
+
+    monkeypatch.setattr(data, "load_data", counting_load_data)
+    signup_and_login(client, email="b@example.com", nickname="other")
+    assert client.patch("/users/me", json={"nickname": "renamed"}, headers=headers).status_code == 200
+    assert client.delete("/users/me", headers=headers).status_code == 204
+    assert loads == []
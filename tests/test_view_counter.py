@@ -0,0 +1,66 @@
+from contextlib import contextmanager
+
+import pytest
+
+from utils import data, view_counter as view_counter_module
+from utils.view_counter import ViewCounter
+
+
+@pytest.fixture
+def counter(backend):
+    data.insert_record("posts", {"postId": 1, "userId": "u", "title": "t", "content": "c",
+                                 "created_at": "2024-01-01T00:00:00+00:00", "viewCount": 10})
+    counter = ViewCounter(flush_interval=3600, flush_threshold=1000)
+    yield counter
+    counter.close()
+
+
+def shown(counter) -> int:
+    # 상세 조회가 보여주는 조회수 (저장된 값 + 아직 저장 안 된 값)
+    return data.get_record("posts", 1)["viewCount"] + counter.pending(1)
+
+
+def test_flush_saves_pending_views(counter):
+    for _ in range(3):
+        counter.increment(1)
+    assert shown(counter) == 13
+    assert counter.flush() == 1
+    assert data.get_record("posts", 1)["viewCount"] == 13
+    assert counter.pending(1) == 0
+
+
+def test_no_double_count_after_posts_lock_released(counter, monkeypatch):
+    real_transaction = view_counter_module.transaction
+    seen = []
+
+    @contextmanager
+    def watching_transaction(**kwargs):
+        with real_transaction(**kwargs):
+            yield
+        # posts 잠금이 풀리자마자 다른 요청이 읽는 값
+        seen.append(shown(counter))
+
+    monkeypatch.setattr(view_counter_module, "transaction", watching_transaction)
+    counter.increment(1)
+    counter.increment(1)
+    counter.flush()
+    assert seen == [12]
+
+
+def test_failed_flush_keeps_views_for_next_flush(counter, monkeypatch):
+    real_update = view_counter_module.update_records
+    failures = [OSError("disk full")]
+
+    def flaky_update(filename, changes):
+        if failures:
+            raise failures.pop()
+        return real_update(filename, changes)
+
+    monkeypatch.setattr(view_counter_module, "update_records", flaky_update)
+    counter.increment(1)
+    assert counter.flush() == 0
+    assert shown(counter) == 11
+
+    assert counter.flush() == 1
+    assert data.get_record("posts", 1)["viewCount"] == 11
+    assert counter.pending(1) == 0
@@ -1,6 +1,3 @@
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
-
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 
@@ -9,8 +6,18 @@ from fastapi.security import OAuth2PasswordBearer
 
 from dotenv import load_dotenv
 import os
+import time
+from typing import Any, Dict, Optional
+
+from argon2.profiles import RFC_9106_LOW_MEMORY
 
-from utils.data import load_data   # users.json 읽기
+from utils.data import get_record, collection_version, transaction, update_record   # users.json 읽기
+from utils.password_pool import (
+    PASSWORD_RETRY_AFTER, PasswordPoolBusy, check_password, hash_password, needs_rehash, password_pool,
+)
+from utils.revocation import RevocationList
+from utils.ttl_cache import TTLCache
+from utils.user_directory import UNKNOWN_NICKNAME, user_directory
 
 # =====================
 # 환경 변수 로드
@@ -23,71 +30,210 @@ if not SECRET_KEY:
 
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(
-    os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60)
+    os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 15)
 )
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 14))
+# access token 에 닉네임을 넣어서 게시글/댓글/좋아요 API 가 유저 레코드를 읽지 않게 한다
+ACCESS_TOKEN_CLAIMS = os.getenv("ACCESS_TOKEN_CLAIMS", "true").lower() in ("1", "true", "yes")
+
+# argon2 해시 비용 (이 서버에 맞는 값은 python -m utils.calibrate_password 로 구한다)
+# 값을 바꾸면 기존 비밀번호 해시는 각 유저가 다음에 로그인할 때 새 값으로 다시 저장된다
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", RFC_9106_LOW_MEMORY.time_cost))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", RFC_9106_LOW_MEMORY.memory_cost))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", RFC_9106_LOW_MEMORY.parallelism))
 
 # =====================
 # Password Hasher
 # =====================
-ph = PasswordHasher()
+# 계산은 전용 작업 프로세스에서 한다 (utils.password_pool). 대기열이 가득 차면 503 + Retry-After
+password_pool.configure(ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM)
+
+def _pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={"status": "error", "data": {"message": "요청이 많습니다. 잠시 후 다시 시도해주세요."}},
+        headers={"Retry-After": str(PASSWORD_RETRY_AFTER)},
+    )
+
+def _run_password_task(fn, *args):
+    try:
+        return password_pool.run(fn, *args)
+    except PasswordPoolBusy:
+        raise _pool_busy()
+
+async def _arun_password_task(fn, *args):
+    try:
+        return await password_pool.arun(fn, *args)
+    except PasswordPoolBusy:
+        raise _pool_busy()
 
 def get_password_hash(password: str) -> str:
-    return ph.hash(password)
+    return _run_password_task(hash_password, password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _run_password_task(check_password, hashed_password, plain_password)
+
+# async 라우트용 (결과를 await 하는 동안 요청 스레드를 잡지 않는다)
+async def aget_password_hash(password: str) -> str:
+    return await _arun_password_task(hash_password, password)
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _arun_password_task(check_password, hashed_password, plain_password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    # 저장된 해시가 지금 ARGON2_* 와 다른 비용으로 만들어졌는지
+    return needs_rehash(hashed_password)
+
+def rehash_password(user_id: str, old_hash: str, plain_password: str):
+    # 로그인 성공 후 백그라운드에서 지금 비용으로 다시 해시해서 저장한다 (대량 마이그레이션 없이 비용 조정)
     try:
-        return ph.verify(hashed_password, plain_password)
-    except VerifyMismatchError:
-        return False
+        new_hash = password_pool.run(hash_password, plain_password)
+    except PasswordPoolBusy:
+        return  # 바쁘면 다음 로그인 때 다시 한다
+    with transaction(write=["users"]):
+        user = get_record("users", user_id)
+        # 그 사이 비밀번호를 바꿨으면 건드리지 않는다
+        if user is None or user.get("password") != old_hash:
+            return
+        user_directory.refresh()
+        user_directory.put(update_record("users", user_id, {"password": new_hash}))
 
 # =====================
 # JWT
 # =====================
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/tokens")
 
-def create_access_token(data: dict):
+# - access token : {"sub", "type": "access", "iat", "exp"} + user 를 넘기면 클레임 {"nickname"}
+# - refresh token: {"sub", "type": "refresh", "iat", "exp", "ver"}. POST /auth/refresh 로 새 access token 을 받는다
+#   (그때 유저 레코드를 읽으므로 클레임이 최신 값으로 바뀐다)
+#   ver 는 발급할 때 유저의 token_version. 비밀번호를 바꾸면 올라가서 그 전에 발급된 refresh token 은 쓸 수 없다
+# type 이 없는 예전 토큰은 클레임 없는 access token 으로 본다
+def _encode_token(data: dict, token_type: str, expires: timedelta) -> str:
+    now = datetime.now(timezone.utc)
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(
-        minutes=ACCESS_TOKEN_EXPIRE_MINUTES
-    )
-    to_encode.update({"exp": expire})
+    to_encode.update({"type": token_type, "iat": now, "exp": now + expires})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def create_access_token(data: dict, user: Optional[Dict[str, Any]] = None):
+    to_encode = data.copy()
+    if user is not None and ACCESS_TOKEN_CLAIMS:
+        to_encode["nickname"] = user.get("nickname")
+    return _encode_token(to_encode, "access", timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+
+def token_version(user: Dict[str, Any]) -> int:
+    # 비밀번호를 바꿀 때마다 1 씩 올라간다 (routers.users.update_me)
+    return user.get("token_version", 0)
+
+def create_refresh_token(data: dict, user: Dict[str, Any]):
+    to_encode = data.copy()
+    to_encode["ver"] = token_version(user)
+    return _encode_token(to_encode, "refresh", timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
+
+# =====================
+# 인증 캐시
+# =====================
+# 인증이 필요한 요청마다 토큰 검증(jwt.decode)과 유저 조회를 다시 하지 않도록 결과를 잠깐 들고 있는다.
+# - token_cache: 토큰 -> payload (검증에 실패한 토큰은 None). 토큰 만료 시각이 지나면 쓰지 않는다
+# - user_cache: sub -> (users 버전, 유저 레코드). 그 사이 users 에 쓰기가 있었으면 다시 읽는다
+#   update_me / delete_me 는 forget_user 로 바로 지운다 (탈퇴하면 다음 요청부터 바로 거부)
+# - 다른 워커 프로세스의 변경은 AUTH_CACHE_TTL 초 안에 반영된다 (AUTH_CACHE_SIZE=0 이면 끔)
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", 60))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", 10000))
+
+token_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+user_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+# 닉네임을 바꾸거나 탈퇴한 유저 (그 전에 발급된 access token 의 클레임은 믿지 않는다, utils.revocation)
+revoked_claims = RevocationList(ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+_MISSING = object()
+
+
+def token_claims(token: str, token_type: str = "access") -> Optional[Dict[str, Any]]:
+    # 토큰이 유효하고 종류가 맞으면 payload, 아니면 None
+    payload = token_cache.get(token, _MISSING)
+    if payload is _MISSING:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            payload = None
+        if payload is not None and payload.get("sub") is None:
+            payload = None
+        exp = payload.get("exp") if payload is not None else None
+        token_cache.put(token, payload, ttl=exp - time.time() if isinstance(exp, (int, float)) else None)
+    if payload is None or payload.get("type", "access") != token_type:
+        return None
+    return payload
+
+
+def forget_user(user_id: str):
+    # 유저 정보가 바뀌었을 때 인증 캐시에서 지운다
+    user_cache.pop(user_id)
+
+
+def revoke_claims(user_id: str):
+    # 닉네임 변경 / 탈퇴 후: 이미 발급된 access token 의 클레임을 더 이상 믿지 않는다
+    revoked_claims.revoke(user_id)
+
+
 # =====================
 # 현재 로그인한 유저 가져오기
 # =====================
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
+def _invalid_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid token"
+    )
 
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
 
-        users = load_data("users")
-        user = next(
-            (u for u in users if u["userId"] == user_id),
-            None
-        )
+def load_active_user(user_id: str) -> Dict[str, Any]:
+    # 유저 레코드 (없으면 401, 탈퇴했으면 403)
+    # 읽기 전에 버전을 본다 (읽는 중에 바뀌면 다음 요청이 다시 읽는다)
+    version = collection_version("users")
+    cached = user_cache.get(user_id)
+    if cached is not None and cached[0] == version:
+        user = cached[1]
+    else:
+        with transaction(read=["users"]):
+            user = get_record("users", user_id)
 
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found"
             )
-        if user.get("is_deleted"):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Deleted_user"
-            )
-
-        return user
+        user_cache.put(user_id, (version, user))
 
-    except JWTError:
+    if user.get("is_deleted"):
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Deleted_user"
         )
+
+    return user
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)):
+    claims = token_claims(token)
+    if claims is None:
+        raise _invalid_token()
+    return load_active_user(claims["sub"])
+
+
+# =====================
+# 현재 로그인한 유저의 id / 닉네임만 가져오기
+# =====================
+# 게시글/댓글/좋아요 API 는 userId 와 닉네임만 쓰므로 토큰 클레임을 그대로 믿는다 (유저 레코드를 읽지 않음).
+# 클레임이 없는 토큰이거나 그 뒤에 닉네임 변경/탈퇴가 있었으면(revoked_claims) 레코드를 읽는다
+# 탈퇴 여부와 닉네임은 유저 디렉터리(메모리)와도 맞춰 본다. revoked_claims 는 메모리에만 있어서 재시작하면 비지만,
+# 디렉터리는 저장된 users 에서 다시 읽으므로 재시작 뒤에도 탈퇴한 유저나 예전 닉네임의 토큰이 그대로 통과하지 않는다
+def get_current_identity(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
+    claims = token_claims(token)
+    if claims is None:
+        raise _invalid_token()
+    user_id = claims["sub"]
+    profile = user_directory.profile(user_id)
+    if (profile is not None and not profile["is_deleted"] and claims.get("nickname", _MISSING) == profile["nickname"]
+            and not revoked_claims.is_revoked(user_id, claims.get("iat"))):
+        return {"userId": user_id, "nickname": claims["nickname"]}
+    # 디렉터리에 없거나(다른 워커에서 가입) 탈퇴했거나 클레임을 믿을 수 없으면 레코드로 확인 (없으면 401, 탈퇴했으면 403)
+    user = load_active_user(user_id)
+    return {"userId": user["userId"], "nickname": user.get("nickname", UNKNOWN_NICKNAME)}
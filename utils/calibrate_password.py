@@ -0,0 +1,77 @@
+"""
+이 서버에 맞는 argon2 해시 비용 구하기
+  python -m utils.calibrate_password [--target-ms 250] [--max-memory-mib 64] [--parallelism 1] [--workers N]
+
+로그인 한 번의 해시 시간이 --target-ms 안에 들어오도록 고른다 (RFC 9106 권장 순서).
+  1) 메모리는 --max-memory-mib 부터 시작해서, time_cost=1 로도 목표 시간을 넘으면 절반씩 줄인다
+  2) 그 메모리로 목표 시간을 넘지 않는 가장 큰 time_cost 를 찾는다
+결과는 .env 에 넣을 ARGON2_TIME_COST / ARGON2_MEMORY_COST / ARGON2_PARALLELISM 으로 출력한다.
+로그인은 작업 프로세스 PASSWORD_WORKERS 개에서 동시에 계산되므로 최대 메모리는 workers x memory_cost 이다.
+값을 바꾸고 서버를 다시 띄우면 기존 해시는 각 유저가 다음에 로그인할 때 새 값으로 바뀐다.
+"""
+import argparse
+import statistics
+import time
+
+from argon2 import PasswordHasher
+
+from utils.password_pool import PASSWORD_WORKERS
+
+MIN_MEMORY_KIB = 8 * 1024
+MAX_TIME_COST = 32
+
+
+def measure(time_cost: int, memory_cost: int, parallelism: int, rounds: int) -> float:
+    # 해시 한 번 시간의 중앙값 (초)
+    hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.hash("calibration-password")
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def calibrate(target: float, max_memory_kib: int, parallelism: int, rounds: int = 5):
+    memory_cost = max(max_memory_kib, 8 * parallelism)
+    elapsed = measure(1, memory_cost, parallelism, rounds)
+    print(f"time_cost= 1 memory={memory_cost // 1024:>5} MiB  {elapsed * 1e3:8.1f} ms")
+    while elapsed > target and memory_cost // 2 >= MIN_MEMORY_KIB:
+        memory_cost //= 2
+        elapsed = measure(1, memory_cost, parallelism, rounds)
+        print(f"time_cost= 1 memory={memory_cost // 1024:>5} MiB  {elapsed * 1e3:8.1f} ms")
+
+    time_cost, best = 1, elapsed
+    while time_cost < MAX_TIME_COST:
+        elapsed = measure(time_cost + 1, memory_cost, parallelism, rounds)
+        print(f"time_cost={time_cost + 1:>2} memory={memory_cost // 1024:>5} MiB  {elapsed * 1e3:8.1f} ms")
+        if elapsed > target:
+            break
+        time_cost, best = time_cost + 1, elapsed
+    return time_cost, memory_cost, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이 서버에 맞는 argon2 해시 비용을 구한다")
+    parser.add_argument("--target-ms", type=float, default=250, help="로그인 한 번의 목표 해시 시간")
+    parser.add_argument("--max-memory-mib", type=int, default=64, help="해시 한 번에 쓸 수 있는 최대 메모리")
+    # 로그인은 이미 작업 프로세스 여러 개에서 동시에 처리되므로 해시 하나는 스레드 1개로 계산하는 것이 기본
+    parser.add_argument("--parallelism", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=PASSWORD_WORKERS, help="PASSWORD_WORKERS (메모리 합계 계산용)")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    time_cost, memory_cost, elapsed = calibrate(
+        args.target_ms / 1e3, args.max_memory_mib * 1024, args.parallelism, args.rounds
+    )
+    if elapsed > args.target_ms / 1e3:
+        print(f"# 가장 작은 비용으로도 목표 시간({args.target_ms:.0f} ms)을 넘습니다")
+    print(f"# 해시 한 번 {elapsed * 1e3:.1f} ms, 동시 로그인 {args.workers}개면 최대 "
+          f"{args.workers * memory_cost // 1024} MiB")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_PARALLELISM={args.parallelism}")
+
+
+if __name__ == "__main__":
+    main()
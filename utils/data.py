@@ -1,51 +1,319 @@
-import json
 import os
+import asyncio
+import functools
 import logging   #로그 남기기
-import shutil
-import tempfile   #임시파일 만들기(저장 안정성을 위해)
-from typing import Optional, Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Any, Callable, Dict, List, Tuple, Iterable
 from datetime import datetime, timezone
-from threading import Lock
+from itertools import count
+from threading import Lock, local
+
+from utils.locks import RWLock
+from utils.singleflight import SingleFlight
+from utils.storage import PRIMARY_KEYS, StorageBackend, create_backend
+from utils.user_directory import user_directory
 
 logger = logging.getLogger(__name__)
 DATA_DIR = "data"
 
-data_lock = Lock()
+# =====================
+# 저장소 선택
+# =====================
+# json  : data/*.json 파일 (DATA_STORAGE_MODE=snapshot|journal, DATA_FORMAT=json|json-compact|msgpack)
+# sqlite: DATA_SQLITE_PATH (기본 data/social.db). 기존 데이터는 python -m utils.storage.migrate 로 옮긴다
+DATA_BACKEND = os.getenv("DATA_BACKEND", "json")
+
+_backend: Optional[StorageBackend] = None
+_backend_lock = Lock()
+
+
+def get_backend() -> StorageBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(DATA_BACKEND, DATA_DIR)
+    return _backend
+
+
+# =====================
+# 컬렉션 버전
+# =====================
+# 이 모듈의 쓰기 함수가 끝날 때마다 그 컬렉션의 버전을 새 값으로 바꾼다 (응답 캐시 무효화용, utils.response_cache).
+# 값은 프로세스 안에서 다시 나오지 않는 번호이다 (저장소를 바꾸거나 캐시를 비우면 모든 컬렉션이 바뀐다)
+_version_clock = count(1)
+_versions: Dict[str, int] = {name: 0 for name in PRIMARY_KEYS}
+
+
+# 동시에 들어온 같은 load_data 를 한 번으로 합친다 (utils.singleflight)
+load_flight = SingleFlight()
+
+
+def collection_version(filename: str) -> int:
+    return _versions.get(filename, 0)
+
+
+def storage_stamp(filename: str):
+    # 저장소 기준의 변경 표시 (다른 워커 프로세스의 쓰기도 반영된다. StorageBackend.stamp)
+    return get_backend().stamp(filename)
+
+
+def mark_changed(filename: Optional[str] = None):
+    for name in ([filename] if filename is not None else list(_versions)):
+        _versions[name] = next(_version_clock)
+
+
+def set_backend(backend: Optional[StorageBackend]):
+    # 저장소 교체 (None 이면 다음 호출 때 환경 변수대로 다시 만든다)
+    global _backend
+    with _backend_lock:
+        if _backend is not None and _backend is not backend:
+            _backend.close()
+        _backend = backend
+    user_directory.reset()
+    mark_changed()
+
+
+def clear_cache(filename: Optional[str] = None):
+    get_backend().clear_cache(filename)
+    if filename in (None, "users"):
+        user_directory.reset()
+    mark_changed(filename)
 
-def load_data(filename: str):
 
-    file_path = os.path.join(DATA_DIR, f"{filename}.json")
+# =====================
+# 트랜잭션 (컬렉션별 읽기/쓰기 잠금)
+# =====================
+# 읽기-수정-쓰기(중복 확인 후 추가, likeCount + 1 등)는 transaction 안에서 해야 동시 요청에 값이 유실되지 않는다.
+#   with transaction(read=["posts"], write=["likes", "posts"]):
+#       ...
+# - 읽기 잠금은 여러 요청이 동시에, 쓰기 잠금은 컬렉션마다 한 요청만 잡는다
+# - 목록/검색/상세 조회도 저장소를 읽는 동안 읽기 잠금을 잡는다
+#   (json 저장소는 쓰기가 메모리의 인덱스를 그 자리에서 바꾸므로, 잠금 없이 읽으면 바뀌는 중인 인덱스를 훑을 수 있다)
+# - 여러 컬렉션을 잡을 때는 항상 LOCK_ORDER 순서로 잡아서 교착 상태를 막는다
+# - 같은 스레드에서 중첩하면 이미 잡은 잠금은 건너뛴다 (읽기 -> 쓰기 승격은 안 됨)
+# - 잠금은 프로세스 안에서만 유효하다. 그래서 쓰기 잠금을 잡은 구간 전체를 저장소 트랜잭션 하나로도 묶는다
+#   (StorageBackend.transaction, sqlite 는 BEGIN IMMEDIATE 라서 다른 워커 프로세스의 쓰기와도 섞이지 않는다)
+#   저장소 트랜잭션이 열린 뒤에는 새 잠금을 잡지 않는다 (잠금을 기다리는 동안 다른 스레드가 저장소 트랜잭션을 기다리면 서로 막힌다)
+LOCK_ORDER = tuple(PRIMARY_KEYS)  # users -> posts -> comments -> likes
 
-    # data 폴더가 없으면 생성
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
+_collection_locks = {name: RWLock() for name in LOCK_ORDER}
+_held = local()
 
-    # 파일이 없으면 빈 리스트 저장 후 반환
-    if not os.path.exists(file_path):
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump([], f)
-        return []
 
-    # 파일 읽기
-    with open(file_path, 'r', encoding='utf-8') as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            logger.warning(f"JSON 파싱 실패: {file_path}. 빈 리스트 반환")
-            return []
+@contextmanager
+def transaction(read: Iterable[str] = (), write: Iterable[str] = ()):
+    held: Dict[str, str] = getattr(_held, "locks", None)
+    if held is None:
+        held = _held.locks = {}
+
+    wanted = {name: "write" for name in write}
+    for name in read:
+        wanted.setdefault(name, "read")
+
+    acquired = []
+    try:
+        for name in sorted(wanted, key=LOCK_ORDER.index):
+            mode = wanted[name]
+            current = held.get(name)
+            if current == "write" or current == mode:
+                continue
+            if current == "read":
+                raise RuntimeError(f"{name} 읽기 잠금을 쓰기 잠금으로 바꿀 수 없습니다")
+            if any(LOCK_ORDER.index(h) > LOCK_ORDER.index(name) for h in held):
+                raise RuntimeError(f"{name} 잠금 순서가 LOCK_ORDER 와 다릅니다: {list(held)}")
+            if getattr(_held, "storage", False):
+                raise RuntimeError(f"저장소 트랜잭션 안에서 {name} 잠금을 새로 잡을 수 없습니다: {list(held)}")
+
+            lock = _collection_locks[name]
+            if mode == "write":
+                lock.acquire_write()
+            else:
+                lock.acquire_read()
+            held[name] = mode
+            acquired.append((name, mode))
+
+        if any(mode == "write" for _, mode in acquired) and not getattr(_held, "storage", False):
+            # 잠금을 다 잡은 뒤에 저장소 트랜잭션을 열고, 잠금을 풀기 전에 반영한다
+            _held.storage = True
+            try:
+                with get_backend().transaction():
+                    yield
+            finally:
+                _held.storage = False
+        else:
+            yield
+    finally:
+        for name, mode in reversed(acquired):
+            lock = _collection_locks[name]
+            if mode == "write":
+                lock.release_write()
+            else:
+                lock.release_read()
+            del held[name]
+
+
+# =====================
+# 읽기
+# =====================
+def load_data(filename: str):
+    """
+    컬렉션 전체를 불러온다.
+    - json 저장소는 캐시가 켜져 있으면 파일이 바뀌었을 때만 다시 파싱한다.
+    - 반환된 리스트/레코드는 캐시와 공유될 수 있으므로 직접 수정하지 말고
+      insert_record / update_record / soft_delete_record 를 사용한다.
+    - 같은 컬렉션을 동시에 여러 스레드가 읽으면 한 번만 읽고 결과를 같이 쓴다 (load_flight)
+    """
+    backend = get_backend()
+    return load_flight.do((filename, collection_version(filename)), lambda: backend.load_all(filename))
 
 
 def save_data(filename: str, data):
-    file_path = os.path.join(DATA_DIR, f"{filename}.json")
+    # 컬렉션 전체 저장 (레코드 하나만 바꿀 때는 insert_record / update_record 를 쓴다)
+    get_backend().replace_all(filename, data)
+    mark_changed(filename)
+
+
+def get_record(filename: str, key) -> Optional[Dict[str, Any]]:
+    # 기본키로 레코드 하나 찾기. 삭제 여부는 호출하는 쪽에서 확인한다
+    return get_backend().get(filename, key)
+
+
+def get_records(filename: str, keys: Iterable[Any]) -> Dict[Any, Dict[str, Any]]:
+    # 기본키 여러 개를 한 번에 찾는다 (기본키 -> 레코드, 없는 기본키는 빠진다).
+    # 한 페이지의 게시글 제목처럼 관련 레코드를 붙일 때는 get_record 를 반복하지 말고 이것을 쓴다
+    return get_backend().get_many(filename, keys)
+
+
+def list_by(filename: str, index_name: str, value) -> List[Dict[str, Any]]:
+    # 보조 인덱스로 해당하는 레코드만 가져온다 (삭제된 레코드 포함, 인덱스 순서)
+    return get_backend().list_by(filename, index_name, value)
+
+
+def find_by(filename: str, index_name: str, value) -> Optional[Dict[str, Any]]:
+    # 유일 인덱스로 레코드 하나 찾기 (예: find_by("likes", "active", (postId, userId)))
+    return get_backend().find_by(filename, index_name, value)
+
+
+def count_records(filename: str, index_name: str, groups: Iterable[Any] = (None,)) -> Dict[Any, int]:
+    # 개수 인덱스로 그룹별 삭제 안 된 레코드 수 (예: count_records("comments", "post_count", postIds))
+    return get_backend().count(filename, index_name, groups)
 
-    # 임시 파일에 먼저 쓰기
-    with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8',
-                                     delete=False, suffix='.json') as tmp:
-        json.dump(data, tmp, ensure_ascii=False, indent=4)
-        tmp_path = tmp.name
 
-    # 성공 시 원본 교체 (atomic operation)
-    shutil.move(tmp_path, file_path)
+def search_records(filename: str, index_name: str, text: str) -> Dict[Any, float]:
+    # 검색 인덱스로 찾기: 삭제 안 된 레코드의 기본키 -> 관련도 점수 (예: search_records("posts", "text", "클라우드"))
+    return get_backend().search(filename, index_name, text)
+
+
+def list_page(filename: str, *, order_by: str, limit: int, offset: int = 0,
+              where: Optional[Dict[str, Any]] = None,
+              after: Optional[Tuple[Any, Any]] = None) -> Tuple[List[Dict[str, Any]], int]:
+    # 삭제 안 된 레코드를 order_by 내림차순으로 한 페이지 + 전체 개수
+    # (같은 값이면 먼저 저장된 레코드가 앞. sqlite 저장소는 정렬/limit 을 SQL 로 처리한다)
+    # after=(정렬 값, 기본키) 면 그 레코드 다음부터 (cursor 페이지네이션, utils.pagination)
+    return get_backend().list_page(filename, order_by=order_by, limit=limit, offset=offset,
+                                   where=where, after=after)
+
+
+# =====================
+# 쓰기
+# =====================
+def insert_record(filename: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return get_backend().insert(filename, record)
+    finally:
+        mark_changed(filename)
+
+
+def update_record(filename: str, key, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # 바뀐 필드만 넘긴다. 대상이 없으면 None
+    try:
+        return get_backend().update(filename, key, changes)
+    finally:
+        mark_changed(filename)
+
+
+def update_records(filename: str, changes_by_key: Dict[Any, Dict[str, Any]]) -> int:
+    # 여러 레코드를 한 번의 쓰기로 수정 (예: 모아 둔 조회수 반영)
+    try:
+        return get_backend().update_many(filename, changes_by_key)
+    finally:
+        mark_changed(filename)
+
+
+def soft_delete_record(filename: str, key, changes: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    try:
+        return get_backend().soft_delete(filename, key, dict(changes or {}))
+    finally:
+        mark_changed(filename)
+
+
+def next_id(filename: str) -> int:
+    # 새 레코드의 정수 id (postId, commentId, likeId). 동시에 요청이 와도 겹치지 않는다
+    return get_backend().next_id(filename)
+
+
+# =====================
+# 비동기 API
+# =====================
+# async def 라우트용. 저장소 호출(파일/SQLite I/O, 잠금 대기)은 전용 스레드에서 하고 라우트는 결과만 await 한다.
+# 그래서 처리 중인 요청이 요청 스레드(기본 40개)를 잡고 있지 않고, 동시에 열린 연결 수가 스레드 수에 묶이지 않는다.
+# - aread(fn, ...): 읽기 스레드 DATA_READ_THREADS 개에서 실행 (json 저장소는 캐시된 메모리에서 찾고 파일이 바뀌었을 때만 읽는다)
+# - awrite(fn, ...): 쓰기 큐에 넣고 쓰기 스레드 하나가 넣은 순서대로 실행한다.
+#   fn 은 동기 함수이고 그 안에서 transaction 을 잡는다 (동기 라우트의 쓰기와도 같은 잠금으로 섞이지 않는다)
+# - fn 이 던진 예외(HTTPException 등)는 await 한 쪽에서 그대로 받는다
+#   post = await awrite(like_post_sync, postId, userId)
+DATA_READ_THREADS = int(os.getenv("DATA_READ_THREADS", 8))
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = Lock()
+
+
+def _executor(kind: str) -> ThreadPoolExecutor:
+    executor = _executors.get(kind)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(kind)
+            if executor is None:
+                workers = DATA_READ_THREADS if kind == "read" else 1
+                executor = _executors[kind] = ThreadPoolExecutor(workers, thread_name_prefix=f"data-{kind}")
+    return executor
+
+
+async def _run(kind: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor(kind), functools.partial(fn, *args, **kwargs))
+
+
+async def aread(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    return await _run("read", fn, *args, **kwargs)
+
+
+async def awrite(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    return await _run("write", fn, *args, **kwargs)
+
+
+async def aget_record(filename: str, key) -> Optional[Dict[str, Any]]:
+    return await aread(get_record, filename, key)
+
+
+async def aget_records(filename: str, keys: Iterable[Any]) -> Dict[Any, Dict[str, Any]]:
+    return await aread(get_records, filename, list(keys))
+
+
+async def afind_by(filename: str, index_name: str, value) -> Optional[Dict[str, Any]]:
+    return await aread(find_by, filename, index_name, value)
+
+
+def close_async():
+    # 쓰기 큐에 남은 작업까지 끝낸 뒤 스레드 정리 (서버 종료 시. 다음에 쓰면 다시 만든다)
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True)
+
 
 def ensure_user_fields(user: Dict[str, Any]) -> Dict[str, Any]:
     if "is_deleted" not in user:
@@ -55,40 +323,24 @@ def ensure_user_fields(user: Dict[str, Any]) -> Dict[str, Any]:
     return user
 
 
-   #users: 유저 전체 목록(list)
    #userId: 찾고 싶은 유저 id
    #반환: 찾으면 user(dict), 못 찾으면 None
 
-def find_user_by_id(users: List[Dict[str, Any]], userId: str) -> Optional[Dict[str, Any]]:
-    for u in users:
-        if str(u.get("userId")) == str(userId):
-            return ensure_user_fields(u)
-    return None
+def find_user_by_id(userId: str) -> Optional[Dict[str, Any]]:
+    user = get_record("users", str(userId))
+    # json 저장소는 캐시에 든 레코드를 그대로 돌려주므로 복사본에 기본값을 채운다
+    return ensure_user_fields(dict(user)) if user is not None else None
 
 def soft_delete_user(user: Dict[str, Any]) -> Dict[str, Any]:
     # 유저 한명을 완전히 삭제하는게 아니라 탈퇴 처리 상태로만 바꿔준다
-    ensure_user_fields(user)
-    user["is_deleted"] = True
-    user["deleted_at"] = datetime.now(timezone.utc).isoformat()
+    changes = {"deleted_at": datetime.now(timezone.utc).isoformat()}
+    user_directory.refresh()
 
     if "nickname" in user:
-        user["nickname"] = "탈퇴한 사용자"
+        changes["nickname"] = "탈퇴한 사용자"
     if "profile_image" in user:
-        user["profile_image"] = None
-
-    return user
-
-# utils/data.py
-def get_user_nickname_map(users: list) -> dict:
-    result = {}
-    for u in users:
-        user_id = u.get("userId")
-        if user_id is None:
-            continue
-
-        if u.get("is_deleted"):
-            result[user_id] = "탈퇴한 사용자"
-        else:
-            result[user_id] = u.get("nickname", "알 수 없음")
+        changes["profile_image"] = None
 
-    return result
\ No newline at end of file
+    deleted = soft_delete_record("users", user["userId"], changes)
+    user_directory.put(deleted)
+    return deleted
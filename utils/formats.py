@@ -0,0 +1,85 @@
+import json
+from typing import Any, List, Tuple
+
+try:
+    import orjson  # 있으면 JSON 읽기/쓰기를 orjson 으로 (stdlib json 보다 수 배 빠르다)
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack  # msgpack 형식을 쓸 때만 필요
+except ImportError:
+    msgpack = None
+
+# =====================
+# 데이터 파일 형식
+# =====================
+# DATA_FORMAT 으로 스냅샷 파일 형식을 고른다.
+#   json        : 들여쓰기 4칸 JSON (기존 형식, 사람이 읽고 고치기 쉬움)  -> {filename}.json
+#   json-compact: 공백 없는 JSON, orjson 이 있으면 orjson 으로 쓴다        -> {filename}.json
+#   msgpack     : 바이너리 (msgpack 패키지 필요)                          -> {filename}.msgpack
+# 읽을 때는 파일 내용의 첫 바이트로 형식을 알아내므로, 형식을 바꿔도 기존 파일을 그대로 읽는다.
+# (다음에 저장할 때 새 형식으로 바뀐다. 한 번에 바꾸려면 python -m utils.storage.convert)
+FORMAT_JSON = "json"
+FORMAT_JSON_COMPACT = "json-compact"
+FORMAT_MSGPACK = "msgpack"
+
+EXTENSIONS = {
+    FORMAT_JSON: ".json",
+    FORMAT_JSON_COMPACT: ".json",
+    FORMAT_MSGPACK: ".msgpack",
+}
+
+
+def check_format(fmt: str) -> str:
+    fmt = fmt.lower()
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"알 수 없는 DATA_FORMAT: {fmt} (json | json-compact | msgpack)")
+    if fmt == FORMAT_MSGPACK and msgpack is None:
+        raise RuntimeError("DATA_FORMAT=msgpack 을 쓰려면 msgpack 패키지를 설치하세요 (pip install msgpack)")
+    return fmt
+
+
+def extension(fmt: str) -> str:
+    return EXTENSIONS[fmt]
+
+
+def extensions(preferred: str) -> Tuple[str, ...]:
+    # 파일을 찾을 순서: 설정한 형식의 확장자 먼저
+    first = EXTENSIONS[preferred]
+    return (first,) + tuple(sorted({ext for ext in EXTENSIONS.values() if ext != first}))
+
+
+def detect(raw: bytes) -> str:
+    # JSON 스냅샷은 항상 리스트라 '[' (앞에 공백/BOM 가능)로 시작하고,
+    # msgpack 배열은 0x90~0x9f, 0xdc, 0xdd 로 시작한다
+    head = raw.lstrip(b" \t\r\n\xef\xbb\xbf")[:1]
+    if not head or head in b"[{":
+        return FORMAT_JSON
+    return FORMAT_MSGPACK
+
+
+def dumps(data: List[Any], fmt: str) -> bytes:
+    if fmt == FORMAT_MSGPACK:
+        return msgpack.packb(data, use_bin_type=True)
+    if fmt == FORMAT_JSON_COMPACT:
+        if orjson is not None:
+            return orjson.dumps(data)
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, indent=4).encode("utf-8")
+
+
+def loads(raw: bytes) -> List[Any]:
+    # 깨진 파일이면 ValueError, msgpack 파일인데 패키지가 없으면 RuntimeError (빈 데이터로 덮어쓰지 않도록)
+    if detect(raw) == FORMAT_MSGPACK:
+        if msgpack is None:
+            raise RuntimeError("msgpack 파일을 읽으려면 msgpack 패키지가 필요합니다")
+        try:
+            return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+        except (ValueError, msgpack.UnpackException) as e:
+            raise ValueError(f"msgpack 파싱 실패: {e}") from e
+    if raw.startswith(b"\xef\xbb\xbf"):
+        raw = raw[3:]
+    if orjson is not None:
+        return orjson.loads(raw)  # orjson.JSONDecodeError 는 json.JSONDecodeError 의 하위 클래스
+    return json.loads(raw.decode("utf-8"))
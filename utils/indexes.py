@@ -0,0 +1,215 @@
+from bisect import bisect_left, insort
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from sortedcontainers import SortedList  # 있으면 삽입/삭제 O(log n)
+except ImportError:
+    SortedList = None
+
+# =====================
+# 보조 인덱스
+# =====================
+# Collection 이 레코드를 추가/수정할 때마다 함께 갱신된다.
+# 인덱스는 레코드 대신 기본키만 들고 있고, 실제 레코드는 Collection.by_id 에서 꺼낸다.
+# discard 에는 색인할 때의 레코드도 넘어온다 (기본키만으로 지울 수 없는 인덱스용, 예: utils.search.TextIndex)
+
+
+class GroupIndex:
+    """
+    그룹 값 -> 기본키 목록 (예: postId -> 그 게시글의 commentId 들)
+    - order_field 가 있으면 그 값 기준 내림차순(최신순)으로 유지한다.
+      같은 값끼리는 먼저 들어온 레코드가 앞에 온다 (list.sort(reverse=True) 와 같은 순서).
+    - order_field 가 없으면 들어온 순서(파일 순서) 그대로 유지한다.
+    - 삭제(is_deleted)된 레코드도 들고 있으므로 읽는 쪽에서 걸러낸다.
+    """
+
+    def __init__(self, group_field: str, order_field: Optional[str] = None):
+        self.group_field = group_field
+        self.order_field = order_field
+        self.fields = {group_field} | ({order_field} if order_field else set())
+        self._groups: Dict[Any, List[Tuple]] = {}
+        self._entries: Dict[Any, Tuple[Any, Tuple]] = {}  # 기본키 -> (그룹 값, 정렬 키)
+
+    def _sort_key(self, record: Dict[str, Any], seq: int, key) -> Tuple:
+        if self.order_field is None:
+            return seq, key
+        # 오름차순으로 저장하고 뒤에서부터 읽는다. seq 를 음수로 둬야 동점일 때 먼저 들어온 것이 앞에 온다
+        return record.get(self.order_field, ""), -seq, key
+
+    def add(self, record: Dict[str, Any], seq: int, key):
+        group = record.get(self.group_field)
+        sort_key = self._sort_key(record, seq, key)
+        entries = self._groups.setdefault(group, [])
+        if not entries or entries[-1] < sort_key:
+            entries.append(sort_key)
+        else:
+            insort(entries, sort_key)
+        self._entries[key] = (group, sort_key)
+
+    def discard(self, key, record: Optional[Dict[str, Any]] = None):
+        found = self._entries.pop(key, None)
+        if found is None:
+            return
+        group, sort_key = found
+        entries = self._groups.get(group, [])
+        i = bisect_left(entries, sort_key)
+        if i < len(entries) and entries[i] == sort_key:
+            del entries[i]
+        if not entries:
+            self._groups.pop(group, None)
+
+    def keys(self, group) -> List[Any]:
+        entries = self._groups.get(group, [])
+        if self.order_field is None:
+            return [e[-1] for e in entries]
+        return [e[-1] for e in reversed(entries)]
+
+
+class UniqueIndex:
+    """
+    조건을 만족하는 레코드 하나만 가리키는 인덱스
+    (예: (postId, userId) -> 아직 취소하지 않은 좋아요)
+    """
+
+    def __init__(self, key_fields: Tuple[str, ...], when: Callable[[Dict[str, Any]], bool] = lambda r: True):
+        self.key_fields = key_fields
+        self.when = when
+        self.fields = set(key_fields) | {"is_deleted"}
+        self._map: Dict[Tuple, Any] = {}
+        self._entries: Dict[Any, Tuple] = {}
+
+    def add(self, record: Dict[str, Any], seq: int, key):
+        if not self.when(record):
+            return
+        value = tuple(record.get(f) for f in self.key_fields)
+        self._map[value] = key
+        self._entries[key] = value
+
+    def discard(self, key, record: Optional[Dict[str, Any]] = None):
+        value = self._entries.pop(key, None)
+        if value is not None and self._map.get(value) == key:
+            del self._map[value]
+
+    def get(self, value: Tuple) -> Optional[Any]:
+        return self._map.get(tuple(value))
+
+
+class CountIndex:
+    """
+    그룹 값 -> 삭제되지 않은 레코드 수 (group_field 가 없으면 전체 수 하나, 그룹 값 None)
+    (예: 게시글별 댓글 수, 작성자별 게시글 수)
+    - 기본키를 따로 들고 있지 않고, 넣고 뺄 때 넘어오는 레코드로 센다
+    """
+
+    def __init__(self, group_field: Optional[str] = None):
+        self.group_field = group_field
+        self.fields = {"is_deleted"} | ({group_field} if group_field else set())
+        self._counts: Dict[Any, int] = {}
+
+    def _group(self, record: Dict[str, Any]):
+        return record.get(self.group_field) if self.group_field else None
+
+    def add(self, record: Dict[str, Any], seq: int, key):
+        if is_active(record):
+            group = self._group(record)
+            self._counts[group] = self._counts.get(group, 0) + 1
+
+    def discard(self, key, record: Optional[Dict[str, Any]] = None):
+        if record is None or not is_active(record):
+            return
+        group = self._group(record)
+        count = self._counts.get(group, 0) - 1
+        if count > 0:
+            self._counts[group] = count
+        else:
+            self._counts.pop(group, None)
+
+    def count(self, group=None) -> int:
+        return self._counts.get(group, 0)
+
+
+class _BisectList:
+    """sortedcontainers 가 없을 때 쓰는 SortedList 대용 (삽입/삭제는 O(n) 이지만 memmove 라 충분히 빠르다)"""
+
+    def __init__(self):
+        self._items: List[Tuple] = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, item: Tuple):
+        if not self._items or self._items[-1] < item:
+            self._items.append(item)
+        else:
+            insort(self._items, item)
+
+    def discard(self, item: Tuple):
+        i = bisect_left(self._items, item)
+        if i < len(self._items) and self._items[i] == item:
+            del self._items[i]
+
+    def bisect_left(self, item: Tuple) -> int:
+        return bisect_left(self._items, item)
+
+    def islice(self, start: int, stop: int, reverse: bool = False):
+        items = self._items[start:stop]
+        return reversed(items) if reverse else items
+
+
+class SortedIndex:
+    """
+    정렬 기준 값 내림차순으로 유지되는 인덱스 (삭제되지 않은 레코드만)
+    (예: 최신순/조회수순/좋아요순 게시글, group_field="userId" 면 작성자별로 따로)
+    - 목록 한 페이지 = O(log n + limit), 전체 개수 = O(1). 매 요청마다 정렬하지 않는다.
+    - 정렬 기준 값이나 is_deleted 가 바뀌면 Collection.change 가 빼고 다시 넣는다 (O(log n))
+    - 같은 값끼리는 먼저 들어온 레코드가 앞에 온다 (GroupIndex 와 같은 순서)
+    """
+
+    def __init__(self, order_field: str, group_field: Optional[str] = None, default: Any = None):
+        self.order_field = order_field
+        self.group_field = group_field
+        self.default = default  # 정렬 기준 필드가 없는 레코드의 값
+        self.fields = {order_field, "is_deleted"} | ({group_field} if group_field else set())
+        self._groups: Dict[Any, Any] = {}
+        self._entries: Dict[Any, Tuple[Any, Tuple]] = {}  # 기본키 -> (그룹 값, 정렬 키)
+
+    def add(self, record: Dict[str, Any], seq: int, key):
+        if not is_active(record):
+            return
+        group = record.get(self.group_field) if self.group_field else None
+        # 오름차순으로 저장하고 뒤에서부터 읽는다 (GroupIndex 와 같은 정렬 키)
+        sort_key = (record.get(self.order_field, self.default), -seq, key)
+        entries = self._groups.get(group)
+        if entries is None:
+            entries = self._groups[group] = SortedList() if SortedList is not None else _BisectList()
+        entries.add(sort_key)
+        self._entries[key] = (group, sort_key)
+
+    def discard(self, key, record: Optional[Dict[str, Any]] = None):
+        found = self._entries.pop(key, None)
+        if found is None:
+            return
+        group, sort_key = found
+        entries = self._groups[group]
+        entries.discard(sort_key)
+        if not entries:
+            del self._groups[group]
+
+    def count(self, group=None) -> int:
+        entries = self._groups.get(group)
+        return len(entries) if entries is not None else 0
+
+    def page(self, group=None, offset: int = 0, limit: int = 20,
+             after: Optional[Tuple] = None) -> List[Any]:
+        # 내림차순으로 offset 번째부터 limit 개의 기본키
+        # after(Collection.position) 가 있으면 그 자리 다음부터 센다 (bisect 로 바로 찾아간다)
+        entries = self._groups.get(group)
+        if not entries:
+            return []
+        size = len(entries) if after is None else entries.bisect_left(after)
+        start, stop = max(size - offset - limit, 0), max(size - offset, 0)
+        return [entry[-1] for entry in entries.islice(start, stop, reverse=True)]
+
+
+def is_active(record: Dict[str, Any]) -> bool:
+    return not record.get("is_deleted", False)
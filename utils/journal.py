@@ -0,0 +1,73 @@
+import json
+import os
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# =====================
+# 변경 기록(journal) 파일
+# =====================
+# {filename}.json 이 기준 스냅샷이고, 그 이후의 변경은 {filename}.journal.jsonl 에 한 줄씩 쌓인다.
+#   {"op": "insert", "record": {...}}
+#   {"op": "update", "id": 3, "changes": {...}}
+#   {"op": "delete", "id": 3, "changes": {...}}   # soft delete (is_deleted = True)
+# 쓰기 비용이 컬렉션 크기가 아니라 변경 크기에 비례한다.
+
+OP_INSERT = "insert"
+OP_UPDATE = "update"
+OP_DELETE = "delete"
+
+
+def journal_path(data_dir: str, filename: str) -> str:
+    return os.path.join(data_dir, f"{filename}.journal.jsonl")
+
+
+def append_entries(path: str, entries):
+    lines = "".join(
+        json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for entry in entries
+    )
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(lines)
+
+
+def replay(records: List[Dict[str, Any]], path: str, primary_key: str) -> List[Dict[str, Any]]:
+    # 스냅샷 위에 journal 을 순서대로 적용해서 현재 상태를 만든다
+    if not os.path.exists(path):
+        return records
+
+    by_id = {r.get(primary_key): r for r in records}
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # 쓰는 도중 프로세스가 죽으면 마지막 줄이 잘려 있을 수 있다
+                logger.warning(f"journal 파싱 실패: {path}:{line_no}. 해당 줄 무시")
+                continue
+
+            op = entry.get("op")
+            if op == OP_INSERT:
+                record = entry["record"]
+                existing = by_id.get(record.get(primary_key))
+                if existing is not None:
+                    # 스냅샷 교체 직후 journal 삭제 전에 죽은 경우: 이미 반영된 insert 이다
+                    existing.update(record)
+                    continue
+                records.append(record)
+                by_id[record.get(primary_key)] = record
+            elif op in (OP_UPDATE, OP_DELETE):
+                record = by_id.get(entry.get("id"))
+                if record is None:
+                    logger.warning(f"journal 대상 없음: {path}:{line_no} id={entry.get('id')}")
+                    continue
+                record.update(entry.get("changes", {}))
+                if op == OP_DELETE:
+                    record["is_deleted"] = True
+            else:
+                logger.warning(f"알 수 없는 journal op: {path}:{line_no} op={op}")
+    return records
@@ -0,0 +1,43 @@
+from threading import Condition, Lock
+
+
+class RWLock:
+    """
+    읽기/쓰기 잠금
+    - 읽기는 여러 스레드가 동시에, 쓰기는 한 스레드만
+    - 쓰기를 기다리는 스레드가 있으면 새 읽기는 기다린다 (쓰기가 굶지 않도록)
+    - 재진입은 지원하지 않는다 (utils.data.transaction 이 스레드별로 이미 잡은 잠금을 건너뛴다)
+    """
+
+    def __init__(self):
+        self._cond = Condition(Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
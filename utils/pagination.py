@@ -0,0 +1,67 @@
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from utils.data import list_page
+from utils.storage.base import PRIMARY_KEY_TYPES, PRIMARY_KEYS, SORT_DEFAULTS
+
+# =====================
+# cursor 페이지네이션
+# =====================
+# cursor 는 "마지막으로 받은 항목의 (정렬 기준, 정렬 값, 기본키)" 를 base64 로 감싼 문자열이다.
+# 클라이언트는 내용을 해석하지 않고 응답의 pagination.next_cursor 를 다음 요청에 그대로 넘긴다.
+# - 저장소가 그 자리로 바로 찾아가므로 뒤 페이지로 갈수록 느려지지 않는다 (offset 은 앞을 다 건너뛴다)
+# - 그 사이 새 글이 올라와도 다음 페이지가 밀리지 않아서 겹치거나 빠지는 항목이 없다
+# cursor 가 없으면 기존처럼 page/limit 으로 조회한다.
+
+
+def encode_cursor(order_by: str, value: Any, key: Any) -> str:
+    raw = json.dumps([order_by, value, key], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _is_type(value: Any, expected: type) -> bool:
+    # bool 은 int 의 하위 타입이지만 정렬 값/기본키로는 받지 않는다
+    return isinstance(value, expected) and not isinstance(value, bool)
+
+
+def decode_cursor(cursor: str, order_by: str, filename: str) -> Tuple[Any, Any]:
+    # (정렬 값, 기본키). 형식이 틀렸거나 다른 정렬 기준으로 만든 cursor, 기본키 타입이 다른 cursor 면 400
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_order_by, value, key = json.loads(raw)
+    except (ValueError, TypeError):
+        cursor_order_by = value = key = None
+    if (cursor_order_by != order_by
+            or order_by not in SORT_DEFAULTS
+            or not _is_type(value, type(SORT_DEFAULTS[order_by]))
+            or not _is_type(key, PRIMARY_KEY_TYPES[filename])):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"status": "error", "data": {"message": "잘못된 cursor 입니다."}}
+        )
+    return value, key
+
+
+def paginate(filename: str, *, order_by: str, page: int, limit: int,
+             cursor: Optional[str] = None,
+             where: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], int, Optional[str]]:
+    """
+    한 페이지 + 전체 개수 + 다음 페이지 cursor (마지막 페이지면 None)
+    - cursor 가 있으면 page 는 무시하고 cursor 다음 항목부터
+    """
+    after = decode_cursor(cursor, order_by, filename) if cursor else None
+    offset = 0 if after else (page - 1) * limit
+
+    # 한 개 더 읽어서 다음 페이지가 있는지 본다
+    rows, total = list_page(filename, order_by=order_by, limit=limit + 1, offset=offset,
+                            where=where, after=after)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(order_by, last.get(order_by, SORT_DEFAULTS.get(order_by)),
+                                    last[PRIMARY_KEYS[filename]])
+    return rows, total, next_cursor
@@ -0,0 +1,153 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from argon2 import PasswordHasher
+from argon2.exceptions import VerifyMismatchError
+
+# =====================
+# 비밀번호 해시 작업 프로세스
+# =====================
+# argon2 는 일부러 CPU/메모리를 많이 쓰므로 로그인이 몰리면 요청 스레드를 다 차지해서 다른 조회까지 멈춘다.
+# 해시 계산/확인은 전용 프로세스 PASSWORD_WORKERS 개에서 하고, 요청 스레드는 결과만 기다린다.
+# - 계산 중 + 기다리는 작업이 PASSWORD_WORKERS + PASSWORD_QUEUE_SIZE 개를 넘으면 바로 PasswordPoolBusy
+#   (라우터에서는 utils.auth 가 503 + Retry-After 로 바꾼다). 그래서 로그인 폭주 중에도 묶이는 요청 스레드 수가 정해져 있다
+#   (이 합은 요청 스레드 수(기본 40)보다 충분히 작게 둔다)
+# - PASSWORD_WORKERS=0 이면 요청 스레드에서 바로 계산한다 (대기열 제한은 그대로)
+# - async 라우트는 arun() 으로 결과를 await 한다 (기다리는 동안 스레드도 잡지 않는다.
+#   PASSWORD_WORKERS=0 이면 이벤트 루프 대신 기본 스레드 풀에서 계산한다)
+# - 작업 프로세스는 처음 쓸 때 spawn 으로 띄운다 (스레드가 많은 서버 프로세스를 fork 하지 않도록)
+# - 해시 비용(time_cost/memory_cost/parallelism)은 configure() 로 정하고 작업 프로세스도 같은 값을 쓴다 (utils.auth 의 ARGON2_*)
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_QUEUE_SIZE = int(os.getenv("PASSWORD_QUEUE_SIZE", 8))
+PASSWORD_RETRY_AFTER = int(os.getenv("PASSWORD_RETRY_AFTER", 1))
+
+ph = PasswordHasher()
+
+
+def configure_hasher(time_cost: int, memory_cost: int, parallelism: int):
+    # 이 프로세스의 해시 비용 바꾸기 (작업 프로세스에서는 initializer 로 불린다)
+    global ph
+    ph = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    # 저장된 해시가 지금 비용과 다른 값으로 만들어졌는지 (해시 문자열만 보므로 가볍다)
+    return ph.check_needs_rehash(hashed_password)
+
+
+# 작업 프로세스에서 실행되는 함수 (pickle 로 넘어가므로 모듈 최상위에 둔다)
+def hash_password(password: str) -> str:
+    return ph.hash(password)
+
+
+def check_password(hashed_password: str, plain_password: str) -> bool:
+    try:
+        return ph.verify(hashed_password, plain_password)
+    except VerifyMismatchError:
+        return False
+
+
+class PasswordPoolBusy(Exception):
+    # 대기열이 가득 참 (잠시 후 다시 시도)
+    pass
+
+
+class PasswordPool:
+    def __init__(self, workers: int = PASSWORD_WORKERS, queue_size: int = PASSWORD_QUEUE_SIZE):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._lock = Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._params: Optional[Tuple[int, int, int]] = None  # configure() 로 정한 (time_cost, memory_cost, parallelism)
+        self.in_flight = 0   # 계산 중 + 기다리는 작업 수
+        self.completed = 0
+        self.rejected = 0    # 대기열이 가득 차서 거절한 횟수
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # _lock 안에서 부른다
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self.workers, mp_context=get_context("spawn"),
+                initializer=configure_hasher if self._params else None, initargs=self._params or (),
+            )
+        return self._executor
+
+    def configure(self, time_cost: int, memory_cost: int, parallelism: int):
+        # 해시 비용 정하기. 이미 떠 있는 작업 프로세스는 내리고 다음 작업 때 새 값으로 다시 띄운다
+        configure_hasher(time_cost, memory_cost, parallelism)
+        with self._lock:
+            self._params = (time_cost, memory_cost, parallelism)
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _admit(self) -> Optional[ProcessPoolExecutor]:
+        # 대기열에 자리가 있으면 작업 하나를 세고 실행할 executor (PASSWORD_WORKERS=0 이면 None)
+        with self._lock:
+            if self.in_flight >= max(self.workers, 1) + self.queue_size:
+                self.rejected += 1
+                raise PasswordPoolBusy()
+            self.in_flight += 1
+            return self._get_executor() if self.workers > 0 else None
+
+    def _broken(self, executor: ProcessPoolExecutor):
+        # 작업 프로세스가 죽었으면 다음 요청 때 새로 띄운다
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def _done(self):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def run(self, fn: Callable[..., Any], *args) -> Any:
+        executor = self._admit()
+        try:
+            if executor is None:
+                return fn(*args)
+            try:
+                return executor.submit(fn, *args).result()
+            except BrokenProcessPool:
+                self._broken(executor)
+                raise
+        finally:
+            self._done()
+
+    async def arun(self, fn: Callable[..., Any], *args) -> Any:
+        executor = self._admit()
+        try:
+            if executor is None:
+                return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+            try:
+                return await asyncio.wrap_future(executor.submit(fn, *args))
+            except BrokenProcessPool:
+                self._broken(executor)
+                raise
+        finally:
+            self._done()
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+password_pool = PasswordPool()
@@ -0,0 +1,172 @@
+import functools
+import hashlib
+import inspect
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from utils.data import collection_version
+from utils.singleflight import SingleFlight
+
+# =====================
+# 응답 캐시 (ETag / If-None-Match)
+# =====================
+# 로그인 없이 보는 목록/조회 API 의 응답 본문을 (경로 + 쿼리) 별로 메모리에 들고 있는다.
+# - 응답이 읽는 컬렉션들의 버전(utils.data.collection_version)을 같이 저장해 두고,
+#   그 사이 쓰기가 있어서 버전이 바뀌었으면 다시 계산한다 (시간으로 만료시키지 않는다)
+# - 응답에는 본문 해시로 만든 강한 ETag 를 붙이고, 같은 ETag 로 다시 물어보면(If-None-Match) 304 만 보낸다
+# - 전체 본문 크기가 RESPONSE_CACHE_MAX_BYTES 를 넘으면 가장 오래 안 쓴 것부터 버린다 (LRU)
+# - 버전은 프로세스 안에서만 바뀌므로 워커 여러 개면 다른 워커의 쓰기는 반영되지 않는다 (RESPONSE_CACHE_MAX_BYTES=0 으로 끈다)
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        # 키 -> (컬렉션 버전들, ETag, 본문)
+        self._entries: "OrderedDict[Tuple, Tuple[Tuple[int, ...], str, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple, versions: Tuple[int, ...]) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != versions:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key: Tuple, versions: Tuple[int, ...], etag: str, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[2])
+            self._entries[key] = (versions, etag, body)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def count_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+            }
+
+
+response_cache = ResponseCache()
+# 캐시에 없는 같은 응답을 동시에 계산하지 않도록 한 번으로 합친다 (utils.singleflight)
+response_flight = SingleFlight()
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match 는 약한 비교 (W/ 접두어 무시), "*" 는 무엇이든 맞는다
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _store(key: Tuple, versions: Tuple[int, ...], result: Any) -> Tuple[str, bytes]:
+    body = JSONResponse(jsonable_encoder(result)).body
+    etag = make_etag(body)
+    response_cache.put(key, versions, etag, body)
+    return etag, body
+
+
+def _respond(request: Request, etag: str, body: bytes) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        response_cache.count_not_modified()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def cached(*collections: str) -> Callable:
+    """
+    라우트 함수에 붙이는 응답 캐시
+      @router.get("")
+      @cached("posts", "users")
+      async def get_posts(...): ...
+    - collections: 응답이 읽는 컬렉션 (이 중 하나라도 바뀌면 다시 계산)
+    - 에러(HTTPException)는 캐시하지 않는다
+    - async def 라우트에 붙이면 캐시에 있는 응답은 스레드 없이 바로 보내고,
+      같은 요청을 계산 중이면 스레드를 잡지 않고 await 로 기다린다 (SingleFlight.ado)
+    """
+    def decorate(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        def lookup(request: Request):
+            key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+            # 계산하기 전에 버전을 읽는다 (계산 중에 쓰기가 끝나면 다음 요청이 다시 계산한다)
+            versions = tuple(collection_version(name) for name in collections)
+            return key, versions
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, request: Request, **kwargs):
+                key, versions = lookup(request)
+                if response_cache.max_bytes <= 0:
+                    return await response_flight.ado((key, versions), lambda: func(*args, **kwargs))
+                found = response_cache.get(key, versions)
+                if found is None:
+                    async def compute() -> Tuple[str, bytes]:
+                        return _store(key, versions, await func(*args, **kwargs))
+                    found = await response_flight.ado((key, versions), compute)
+                return _respond(request, *found)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, request: Request, **kwargs):
+                key, versions = lookup(request)
+                if response_cache.max_bytes <= 0:
+                    # 캐시를 꺼도 동시에 들어온 같은 요청은 한 번만 계산한다
+                    return response_flight.do((key, versions), lambda: func(*args, **kwargs))
+                found = response_cache.get(key, versions)
+                if found is None:
+                    # 같은 (경로 + 쿼리, 버전) 을 계산 중인 요청이 있으면 그 결과를 같이 받는다
+                    found = response_flight.do((key, versions), lambda: _store(key, versions, func(*args, **kwargs)))
+                return _respond(request, *found)
+
+        # FastAPI 가 Request 를 넘겨주도록 시그니처에 request 를 추가한다
+        wrapper.__signature__ = signature.replace(parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        ])
+        return wrapper
+    return decorate
@@ -0,0 +1,48 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional
+
+# =====================
+# 토큰 클레임 폐기 목록
+# =====================
+# access token 에 넣은 클레임(닉네임 등)은 유저 레코드를 읽지 않고 믿는다 (utils.auth.get_current_identity).
+# 탈퇴하거나 닉네임을 바꾸면 revoke() 로 그 유저를 올려 두고, 그 시각 이전에 발급된 토큰은 클레임을 믿지 않고 레코드를 읽는다.
+# - 폐기 시각은 초 단위이고 같은 초에 발급된 토큰도 폐기로 본다 (토큰 iat 가 초 단위라서)
+# - access token 수명(ttl)이 지난 항목은 더 막을 토큰이 없으므로 지운다. 그래서 항목 수는 최근 수명 동안 바뀐 유저 수 정도로 작다
+# - 프로세스 안에서만 유지된다 (워커 여러 개면 다른 워커는 access token 이 만료될 때까지 예전 클레임을 믿는다.
+#   그래서 클레임 토큰은 수명을 짧게 두고 refresh token 으로 다시 받는다)
+
+
+class RevocationList:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = Lock()
+        self._revoked: "OrderedDict[str, int]" = OrderedDict()  # userId -> 폐기 시각 (오래된 것부터)
+
+    def revoke(self, user_id: str):
+        now = int(time.time())
+        with self._lock:
+            self._revoked.pop(user_id, None)
+            self._revoked[user_id] = now
+            # 수명이 지난 항목 정리 (앞쪽이 가장 오래된 것)
+            while self._revoked:
+                oldest_id, revoked_at = next(iter(self._revoked.items()))
+                if revoked_at + self.ttl >= now:
+                    break
+                del self._revoked[oldest_id]
+
+    def is_revoked(self, user_id: str, issued_at: Optional[Any]) -> bool:
+        # issued_at(토큰 iat)에 발급된 토큰의 클레임이 그 뒤에 바뀌었는지
+        revoked_at = self._revoked.get(user_id)
+        if revoked_at is None:
+            return False
+        return not isinstance(issued_at, (int, float)) or issued_at <= revoked_at
+
+    def clear(self):
+        with self._lock:
+            self._revoked.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._revoked)}
@@ -0,0 +1,133 @@
+import re
+from functools import lru_cache
+from operator import add
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from utils.indexes import is_active
+
+# =====================
+# 검색용 토큰
+# =====================
+# 한글은 띄어쓰기/조사 때문에 단어 단위로 자르면 "커뮤니티" 로 "커뮤니티에" 를 못 찾는다.
+# 그래서 한글 덩어리는 두 글자씩(bigram) 겹쳐 자르고, 영문/숫자는 단어 단위로 자른다.
+#   "클라우드 커뮤니티에 OK" -> {"클라", "라우", "우드", "커뮤", "뮤니", "니티", "티에", "ok"}
+# 검색어도 똑같이 잘라서, 한 필드가 검색어의 토큰을 모두 가지고 있으면 그 필드가 맞은 것으로 본다.
+# (한 글자 한글 검색어는 그 글자가 들어 있는 bigram 을 모두 합쳐서 찾는다. 글자 -> bigram 목록을 따로 들고 있다)
+_TOKEN = re.compile(r"[가-힣]+|[^\W_가-힣]+")
+
+
+def is_hangul(text: str) -> bool:
+    return "가" <= text[0] <= "힣"
+
+
+@lru_cache(maxsize=65536)
+def _run_tokens(run: str) -> Tuple[str, ...]:
+    # 같은 단어가 계속 나오므로 단어(덩어리)별 토큰을 기억해 둔다 (색인할 때 토큰 만드는 시간이 절반 이하로)
+    if is_hangul(run) and len(run) > 1:
+        return tuple(map(add, run, run[1:]))
+    return (run,)
+
+
+def tokenize(text: Optional[str]) -> Set[str]:
+    return set().union(*map(_run_tokens, _TOKEN.findall((text or "").lower())))
+
+
+class TextIndex:
+    """
+    필드별 역색인 (토큰 -> 기본키), 삭제되지 않은 레코드만
+    - weights: 필드 -> 점수 (예: 제목 3, 본문 1). 검색어가 맞은 필드의 점수를 더한 것이 관련도
+    - 레코드를 추가/수정/삭제할 때 Collection 이 그 레코드의 토큰만 넣고 뺀다 (전체를 다시 만들지 않는다)
+    - 토큰이 레코드 하나에만 있으면 set 대신 기본키 하나만 들고 있는다 (숫자/고유 단어가 많아서 메모리 절약)
+    - 한글 토큰은 글자 -> 그 글자가 들어 있는 토큰 목록도 들고 있어서, 한 글자 검색어도 어휘 전체를 훑지 않는다
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = weights
+        self.fields = set(weights) | {"is_deleted"}
+        self._postings: Dict[str, Dict[str, Any]] = {field: {} for field in weights}
+        self._by_char: Dict[str, Dict[str, Set[str]]] = {field: {} for field in weights}
+
+    def add(self, record: Dict[str, Any], seq: int, key):
+        if not is_active(record):
+            return
+        for field, postings in self._postings.items():
+            for token in tokenize(record.get(field)):
+                found = postings.get(token)
+                if found is None:
+                    postings[token] = key
+                    if is_hangul(token):
+                        for char in token:
+                            self._by_char[field].setdefault(char, set()).add(token)
+                elif isinstance(found, set):
+                    found.add(key)
+                elif found != key:
+                    postings[token] = {found, key}
+
+    def discard(self, key, record: Optional[Dict[str, Any]] = None):
+        # 역색인은 기본키 -> 토큰을 따로 들고 있지 않으므로, 색인할 때의 레코드로 토큰을 다시 만든다
+        if record is None or not is_active(record):
+            return
+        for field, postings in self._postings.items():
+            for token in tokenize(record.get(field)):
+                found = postings.get(token)
+                if isinstance(found, set):
+                    found.discard(key)
+                    if len(found) == 1:
+                        postings[token] = next(iter(found))
+                elif found == key:
+                    del postings[token]
+                    if is_hangul(token):
+                        self._forget_token(field, token)
+
+    def _forget_token(self, field: str, token: str):
+        by_char = self._by_char[field]
+        for char in token:
+            tokens = by_char.get(char)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del by_char[char]
+
+    def _lookup(self, field: str, token: str) -> Set:
+        postings = self._postings[field]
+        if len(token) == 1 and is_hangul(token):
+            # 한 글자: 그 글자가 들어 있는 토큰(bigram, 한 글자 단어)을 모두 합친다
+            matched = set()
+            for term in self._by_char[field].get(token, ()):
+                keys = postings[term]
+                matched.update(keys if isinstance(keys, set) else (keys,))
+            return matched
+        found = postings.get(token)
+        if found is None:
+            return set()
+        return found if isinstance(found, set) else {found}
+
+    def search(self, text: str) -> Dict[Any, float]:
+        # 기본키 -> 관련도 점수 (맞은 필드의 점수 합)
+        tokens = tokenize(text)
+        scores: Dict[Any, float] = {}
+        if not tokens:
+            return scores
+        for field, weight in self.weights.items():
+            matched = self._match(field, tokens)
+            # 결과가 수십만 건이어도 빠르도록 집합 연산/dict.fromkeys 로 점수를 더한다
+            both = matched & scores.keys()
+            scores.update(dict.fromkeys(matched - both, weight))
+            scores.update({key: scores[key] + weight for key in both})
+        return scores
+
+    def _match(self, field: str, tokens: Iterable[str]) -> Set:
+        # 모든 토큰을 가진 기본키 (작은 집합부터 교집합)
+        found = []
+        for token in tokens:
+            keys = self._lookup(field, token)
+            if not keys:
+                return set()
+            found.append(keys)
+        found.sort(key=len)
+        result = set(found[0])
+        for keys in found[1:]:
+            result &= keys
+            if not result:
+                break
+        return result
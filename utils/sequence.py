@@ -0,0 +1,76 @@
+import os
+import logging
+from threading import Lock
+from typing import Callable
+
+try:
+    import fcntl  # 여러 워커 프로세스 사이의 잠금 (리눅스/맥)
+except ImportError:  # Windows 에서는 프로세스 내부 잠금만 사용
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# =====================
+# ID 발급기
+# =====================
+# max(id) + 1 을 매번 계산하지 않고, {filename}.seq 파일에 "지금까지 예약한 마지막 id" 를 저장한다.
+# 한 번에 block_size 개씩 예약해 두고 메모리에서 하나씩 나눠주므로 발급은 O(1) 이다.
+# 예약은 파일 잠금(flock) 아래에서 하므로 워커 프로세스가 여러 개여도 id 가 겹치지 않는다.
+# (서버가 재시작되면 예약만 하고 쓰지 않은 id 는 건너뛴다)
+# 컬렉션 전체를 바꾸면 reseed() 로 파일 값을 새 데이터의 최대 id 이상으로 올린다.
+
+
+class SequenceAllocator:
+    def __init__(self, path: str, seed: Callable[[], int], block_size: int = 32):
+        self.path = path
+        self.seed = seed  # 파일이 없을 때 현재 데이터의 최대 id 를 돌려주는 함수
+        self.block_size = max(1, block_size)
+        self._lock = Lock()
+        self._next = 1
+        self._limit = 0  # 이 값까지는 이미 예약해 둔 상태
+
+    def next_id(self) -> int:
+        with self._lock:
+            if self._next > self._limit:
+                self._reserve()
+            value = self._next
+            self._next += 1
+            return value
+
+    def reseed(self, max_id: int):
+        # 컬렉션을 통째로 바꾼 뒤 (save_data / migrate / convert): 파일 값을 max(지금 값, max_id) 로 올린다.
+        # 메모리에 예약해 둔 구간이 max_id 와 겹치면 버리고 다음 발급 때 파일에서 새로 예약한다
+        with self._lock:
+            self._update(lambda high: max(high, max_id), seed=lambda: max_id)
+            if self._next <= max_id:
+                self._next, self._limit = 1, 0
+
+    def _reserve(self):
+        high = self._update(lambda high: high + self.block_size, seed=self.seed)
+        self._next = high + 1
+        self._limit = high + self.block_size
+
+    def _update(self, change: Callable[[int], int], seed: Callable[[], int]) -> int:
+        # 파일 잠금 아래에서 "지금까지 예약한 마지막 id" 를 change(값) 으로 바꾸고 예전 값을 돌려준다
+        with open(self.path, "a+", encoding="utf-8") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                text = f.read().strip()
+                try:
+                    high = int(text)
+                except ValueError:
+                    if text:
+                        logger.warning(f"시퀀스 파일 파싱 실패: {self.path}. 데이터에서 다시 계산")
+                    high = seed()
+
+                f.seek(0)
+                f.truncate()
+                f.write(str(change(high)))
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        return high
@@ -0,0 +1,103 @@
+import asyncio
+from threading import Event, Lock
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# =====================
+# 같은 요청 합치기 (single-flight)
+# =====================
+# 같은 키의 계산이 이미 진행 중이면 새로 계산하지 않고 그 결과를 같이 받는다.
+# (인기 게시글이 공유되어 같은 목록/댓글 요청이 한꺼번에 몰릴 때 같은 파일을 스레드마다 따로 읽고 파싱하지 않도록)
+# - 진행 중인 계산에만 붙는다. 끝난 결과를 들고 있지는 않는다 (그건 utils.response_cache 와 저장소 캐시가 한다)
+# - 계산이 예외로 끝나면 기다리던 요청도 같은 예외를 받는다
+# - 키에 컬렉션 버전을 넣어서, 쓰기가 끝난 뒤에 온 요청이 쓰기 전에 시작한 계산에 붙지 않게 한다
+# - async 라우트는 ado() 를 쓴다. 기다리는 쪽은 스레드를 잡지 않고 await 한다 (같은 이벤트 루프의 요청끼리만 합친다)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled  # False 면 합치지 않고 매번 계산 (벤치마크 비교용)
+        self._lock = Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Hashable, asyncio.Future] = {}  # ado() 용, 키는 (이벤트 루프, key)
+        self.executions = 0  # 실제로 계산한 횟수
+        self.coalesced = 0   # 진행 중인 계산에 붙어서 계산을 건너뛴 횟수
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return fn()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await fn()
+        loop = asyncio.get_running_loop()
+        key = (loop, key)
+        with self._lock:
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = self._futures[key] = loop.create_future()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            # 기다리던 요청이 취소돼도 계산 중인 future 는 취소하지 않는다
+            return await asyncio.shield(future)
+
+        try:
+            result = await fn()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # 기다린 요청이 없어도 "never retrieved" 경고를 남기지 않는다
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._futures[key]
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + len(self._futures),
+            }
@@ -0,0 +1,15 @@
+import os
+
+from utils.storage.base import PRIMARY_KEYS, SECONDARY_INDEXES, StorageBackend
+from utils.storage.json_backend import JSONFileBackend
+from utils.storage.sqlite_backend import SQLiteBackend
+
+
+def create_backend(kind: str, data_dir: str = "data") -> StorageBackend:
+    # DATA_BACKEND 환경 변수 값으로 저장소를 만든다 (json | sqlite)
+    kind = kind.lower()
+    if kind == "json":
+        return JSONFileBackend(data_dir)
+    if kind == "sqlite":
+        return SQLiteBackend(os.getenv("DATA_SQLITE_PATH", os.path.join(data_dir, "social.db")))
+    raise ValueError(f"알 수 없는 DATA_BACKEND: {kind}")
@@ -0,0 +1,176 @@
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, Iterable, List, Optional, Tuple
+
+from utils.indexes import CountIndex, GroupIndex, SortedIndex, UniqueIndex, is_active
+from utils.search import TextIndex
+
+# 컬렉션별 기본키
+PRIMARY_KEYS = {
+    "users": "userId",
+    "posts": "postId",
+    "comments": "commentId",
+    "likes": "likeId",
+}
+
+# 기본키 값의 타입 (userId 는 uuid 문자열, 나머지는 시퀀스에서 발급한 정수)
+PRIMARY_KEY_TYPES = {
+    "users": str,
+    "posts": int,
+    "comments": int,
+    "likes": int,
+}
+
+# 정렬 기준 필드가 비어 있을 때 쓰는 값
+SORT_DEFAULTS = {
+    "created_at": "",
+    "viewCount": 0,
+    "likeCount": 0,
+}
+
+# 게시글 검색에서 필드별 관련도 점수 (제목에 맞으면 본문보다 높게)
+SEARCH_WEIGHTS = {"title": 3, "content": 1}
+
+# 컬렉션별 보조 인덱스 (이름 -> 인덱스 생성 함수)
+# GroupIndex 는 list_by, UniqueIndex 는 find_by, TextIndex 는 search, CountIndex 는 count 로 조회하고,
+# SortedIndex 는 list_page 가 알아서 쓴다 (UniqueIndex, SortedIndex, TextIndex, CountIndex 는 삭제되지 않은 레코드만 본다)
+SECONDARY_INDEXES = {
+    "users": {
+        "nickname_text": lambda: TextIndex({"nickname": 1}),  # 게시글 검색의 작성자 닉네임
+    },
+    "posts": {
+        "userId": lambda: GroupIndex("userId"),  # 작성자 -> 게시글 (파일 순서)
+        # 게시글 목록 정렬 (최신순 / 조회수순 / 좋아요순), 전체와 작성자별
+        "latest": lambda: SortedIndex("created_at", default=SORT_DEFAULTS["created_at"]),
+        "views": lambda: SortedIndex("viewCount", default=SORT_DEFAULTS["viewCount"]),
+        "likes": lambda: SortedIndex("likeCount", default=SORT_DEFAULTS["likeCount"]),
+        "user_latest": lambda: SortedIndex("created_at", "userId", default=SORT_DEFAULTS["created_at"]),
+        "user_views": lambda: SortedIndex("viewCount", "userId", default=SORT_DEFAULTS["viewCount"]),
+        "user_likes": lambda: SortedIndex("likeCount", "userId", default=SORT_DEFAULTS["likeCount"]),
+        "text": lambda: TextIndex(SEARCH_WEIGHTS),  # 제목/본문 검색 (utils.search)
+        # 개수 (전체 게시글 수, 작성자별 게시글 수)
+        "count": lambda: CountIndex(),
+        "user_count": lambda: CountIndex("userId"),
+    },
+    "comments": {
+        "postId": lambda: GroupIndex("postId", order_field="created_at"),  # 게시글 -> 댓글 (최신순)
+        "userId": lambda: GroupIndex("userId", order_field="created_at"),  # 작성자 -> 댓글 (최신순)
+        # 댓글 목록 (게시글별 / 작성자별 최신순, 삭제 안 된 것만)
+        "post_latest": lambda: SortedIndex("created_at", "postId", default=SORT_DEFAULTS["created_at"]),
+        "user_latest": lambda: SortedIndex("created_at", "userId", default=SORT_DEFAULTS["created_at"]),
+        # 개수 (게시글별 / 작성자별 댓글 수)
+        "post_count": lambda: CountIndex("postId"),
+        "user_count": lambda: CountIndex("userId"),
+    },
+    "likes": {
+        "active": lambda: UniqueIndex(("postId", "userId"), when=is_active),  # (게시글, 유저) -> 현재 좋아요
+        "postId": lambda: GroupIndex("postId"),  # 게시글 -> 좋아요 (게시글 삭제 때 같이 지운다)
+        # 내가 좋아요한 목록 (유저별, 좋아요 누른 시간 최신순, 취소 안 한 것만)
+        "user_latest": lambda: SortedIndex("created_at", "userId", default=SORT_DEFAULTS["created_at"]),
+    },
+}
+
+# json 저장소에서 샤드로 나눠 저장할 수 있는 컬렉션 (DATA_SHARD_SIZE > 0 일 때)
+# 값: 매니페스트에 샤드별 최소/최대값을 적어 두는 필드 (목록 조회 때 필요 없는 샤드를 건너뛴다)
+SHARD_RANGES = {
+    "posts": ("created_at",),
+    "comments": ("created_at", "postId"),
+}
+
+Record = Dict[str, Any]
+
+
+def collection_kind(filename: str) -> str:
+    # 샤드 파일 이름("posts/000003")에서 컬렉션 이름("posts")
+    return filename.split("/", 1)[0]
+
+
+class StorageBackend(ABC):
+    """
+    저장소 인터페이스
+    - 라우터는 utils.data 의 함수만 쓰고, utils.data 가 선택된 백엔드에 위임한다.
+    - 돌려받은 레코드는 직접 수정하지 않는다 (메모리 백엔드에서는 캐시와 공유된다).
+    - 목록 순서는 항상 "정렬 기준 내림차순, 같으면 먼저 저장된 레코드가 앞" 이다.
+    """
+
+    @abstractmethod
+    def load_all(self, filename: str) -> List[Record]:
+        """컬렉션 전체 (저장된 순서)"""
+
+    @abstractmethod
+    def replace_all(self, filename: str, records: List[Record]):
+        """컬렉션 전체 교체"""
+
+    @abstractmethod
+    def get(self, filename: str, key) -> Optional[Record]:
+        """기본키로 하나 찾기 (삭제된 레코드 포함)"""
+
+    @abstractmethod
+    def get_many(self, filename: str, keys: Iterable[Any]) -> Dict[Any, Record]:
+        """기본키 여러 개로 한 번에 찾기 (삭제된 레코드 포함). 없는 기본키는 결과에 없다"""
+
+    @abstractmethod
+    def list_by(self, filename: str, index_name: str, value) -> List[Record]:
+        """GroupIndex 로 해당 그룹 전체 (삭제된 레코드 포함, 인덱스 순서)"""
+
+    @abstractmethod
+    def find_by(self, filename: str, index_name: str, value) -> Optional[Record]:
+        """UniqueIndex 로 하나 찾기"""
+
+    @abstractmethod
+    def count(self, filename: str, index_name: str, groups: Iterable[Any]) -> Dict[Any, int]:
+        """CountIndex 로 그룹별 삭제되지 않은 레코드 수 (그룹이 없는 인덱스는 groups=[None])"""
+
+    @abstractmethod
+    def list_page(self, filename: str, *, order_by: str, limit: int, offset: int = 0,
+                  where: Optional[Dict[str, Any]] = None,
+                  after: Optional[Tuple[Any, Any]] = None) -> Tuple[List[Record], int]:
+        """
+        삭제되지 않은 레코드 중 where 조건에 맞는 것을 order_by 내림차순으로 한 페이지 + 전체 개수
+        after=(order_by 값, 기본키) 를 주면 목록에서 그 레코드 다음부터 (cursor 페이지네이션).
+        전체 개수는 after 와 상관없이 조건에 맞는 전체 수이다.
+        """
+
+    @abstractmethod
+    def search(self, filename: str, index_name: str, text: str) -> Dict[Any, float]:
+        """TextIndex 로 검색. 삭제되지 않은 레코드의 기본키 -> 관련도 점수 (순서 없음)"""
+
+    @abstractmethod
+    def insert(self, filename: str, record: Record) -> Record:
+        """레코드 추가"""
+
+    @abstractmethod
+    def update(self, filename: str, key, changes: Dict[str, Any]) -> Optional[Record]:
+        """바뀐 필드만 반영. 대상이 없으면 None"""
+
+    @abstractmethod
+    def update_many(self, filename: str, changes_by_key: Dict[Any, Dict[str, Any]]) -> int:
+        """여러 레코드의 변경을 한 번의 쓰기로 반영. 실제로 바뀐 레코드 수"""
+
+    @abstractmethod
+    def soft_delete(self, filename: str, key, changes: Dict[str, Any]) -> Optional[Record]:
+        """is_deleted = True 와 함께 changes 반영. 대상이 없으면 None"""
+
+    @abstractmethod
+    def next_id(self, filename: str) -> int:
+        """새 정수 id 발급 (동시 요청에도 겹치지 않는다)"""
+
+    def transaction(self) -> ContextManager:
+        """
+        utils.data.transaction 의 쓰기 구간 전체를 저장소 트랜잭션 하나로 묶는다
+        (여러 프로세스가 같은 저장소를 쓸 때 읽기-수정-쓰기가 섞이지 않도록. 기본은 아무것도 하지 않는다)
+        """
+        return nullcontext()
+
+    def stamp(self, filename: str) -> Any:
+        """
+        컬렉션이 바뀌면(다른 프로세스의 쓰기 포함) 달라지는 값. 메모리에 따로 들고 있는 정보를
+        다시 읽어야 하는지 볼 때 쓴다 (None 이면 알 수 없음)
+        """
+        return None
+
+    def clear_cache(self, filename: Optional[str] = None):
+        """메모리 캐시가 있으면 비운다"""
+
+    def close(self):
+        """열린 자원 정리"""
@@ -0,0 +1,139 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.indexes import GroupIndex, SortedIndex, is_active
+from utils.storage.base import PRIMARY_KEYS, SECONDARY_INDEXES, SORT_DEFAULTS, collection_kind
+from utils.storage.topk import top
+
+
+class Collection:
+    """
+    메모리에 올라온 컬렉션 하나
+    - records: 파일 순서 그대로의 레코드 목록
+    - by_id: 기본키 -> 레코드 (get_record 를 O(1)로)
+    - indexes: SECONDARY_INDEXES 에 정의된 보조 인덱스
+    - stamp: 읽어올 당시 파일 상태 (바뀌면 다시 읽는다)
+    - name 이 샤드 파일 이름("posts/000003")이면 그 컬렉션("posts")의 기본키/인덱스를 쓴다
+    """
+
+    def __init__(self, name: str, records: List[Dict[str, Any]], stamp=None):
+        self.name = name
+        kind = collection_kind(name)
+        self.primary_key = PRIMARY_KEYS.get(kind)
+        self.records = records
+        self.stamp = stamp
+        self.by_id: Dict[Any, Dict[str, Any]] = {}
+        self._seq: Dict[Any, int] = {}  # 기본키 -> 파일 안에서의 순서
+        self._next_seq = 0
+        self.indexes = {
+            index_name: factory()
+            for index_name, factory in SECONDARY_INDEXES.get(kind, {}).items()
+        } if self.primary_key else {}
+        # (정렬 기준, 그룹 필드) -> SortedIndex
+        self._sorted = {
+            (index.order_field, index.group_field): index
+            for index in self.indexes.values() if isinstance(index, SortedIndex)
+        }
+        for record in records:
+            self._index(record)
+
+    def _index(self, record: Dict[str, Any]):
+        if not self.primary_key:
+            return
+        key = record.get(self.primary_key)
+        if key in self.by_id:
+            # 같은 기본키가 두 번 나오면 뒤의 레코드가 이긴다
+            old = self.by_id[key]
+            for index in self.indexes.values():
+                index.discard(key, old)
+        self.by_id[key] = record
+        self._seq[key] = seq = self._next_seq
+        self._next_seq += 1
+        for index in self.indexes.values():
+            index.add(record, seq, key)
+
+    def get(self, key) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(key)
+
+    def get_many(self, keys: Iterable[Any]) -> Dict[Any, Dict[str, Any]]:
+        by_id = self.by_id
+        return {key: by_id[key] for key in keys if key in by_id}
+
+    def add(self, record: Dict[str, Any]):
+        self.records.append(record)
+        self._index(record)
+
+    def change(self, record: Dict[str, Any], changes: Dict[str, Any]):
+        # 기본키는 바뀌지 않는다는 전제. 바뀐 필드를 쓰는 인덱스만 다시 넣는다
+        key = record.get(self.primary_key)
+        touched = [index for index in self.indexes.values() if index.fields & changes.keys()]
+        for index in touched:
+            index.discard(key, record)
+        record.update(changes)
+        for index in touched:
+            index.add(record, self._seq[key], key)
+
+    def list_by(self, index_name: str, value) -> List[Dict[str, Any]]:
+        return [self.by_id[key] for key in self.indexes[index_name].keys(value)]
+
+    def find_by(self, index_name: str, value) -> Optional[Dict[str, Any]]:
+        key = self.indexes[index_name].get(value)
+        return self.by_id.get(key) if key is not None else None
+
+    def count(self, index_name: str, groups: Iterable[Any]) -> Dict[Any, int]:
+        index = self.indexes[index_name]
+        return {group: index.count(group) for group in groups}
+
+    def search(self, index_name: str, text: str) -> Dict[Any, float]:
+        return self.indexes[index_name].search(text)
+
+    def position(self, value, key) -> Tuple:
+        # 목록 순서에서 (정렬 기준 값, 기본키) 레코드의 자리 (SortedIndex 와 같은 정렬 키).
+        # 이 컬렉션에 없는 기본키면 같은 값의 레코드를 모두 앞쪽으로 본다
+        seq = self._seq.get(key)
+        return (value,) if seq is None else (value, -seq, key)
+
+    def list_page(self, order_by: str, limit: int, offset: int = 0,
+                  where: Optional[Dict[str, Any]] = None,
+                  after: Optional[Tuple] = None) -> Tuple[List[Dict[str, Any]], int]:
+        # after: position() 으로 만든 자리. 목록에서 그 자리 다음 레코드부터 센다
+        where = dict(where or {})
+
+        # 조건/정렬이 딱 맞는 SortedIndex 가 있으면 정렬 없이 필요한 구간만 꺼낸다
+        group_field = next(iter(where)) if len(where) == 1 else None
+        index = self._sorted.get((order_by, group_field)) if len(where) <= 1 else None
+        if index is not None:
+            group = where.get(group_field)
+            keys = index.page(group, offset, limit, after)
+            return [self.by_id[key] for key in keys], index.count(group)
+
+        rows = self.records
+        presorted = False
+
+        # where 에 GroupIndex 가 있는 필드가 있으면 그 그룹만 본다
+        for field in list(where):
+            index = self.indexes.get(field)
+            if isinstance(index, GroupIndex) and index.group_field == field:
+                rows = self.list_by(field, where.pop(field))
+                if index.order_field == order_by:
+                    presorted = True
+                elif index.order_field is not None:
+                    # 동점 순서를 파일 순서로 맞추기 위해 먼저 파일 순서로 되돌린다
+                    rows.sort(key=lambda r: self._seq[r.get(self.primary_key)])
+                break
+
+        rows = [
+            r for r in rows
+            if is_active(r) and all(r.get(f) == v for f, v in where.items())
+        ]
+        total = len(rows)
+        default = SORT_DEFAULTS.get(order_by, 0)
+        if after is not None:
+            rows = [
+                r for r in rows
+                if self.position(r.get(order_by, default), r.get(self.primary_key)) < after
+            ]
+        if not presorted:
+            # 앞 페이지면 힙으로 필요한 만큼만 고르고, 깊은 페이지면 전체 정렬 (utils.storage.topk)
+            rows = top(rows, lambda r: r.get(order_by, default), offset + limit)
+        return rows[offset:offset + limit], total
+
@@ -0,0 +1,39 @@
+"""
+data 파일 형식/샤드 구조 바꾸기 (json <-> json-compact <-> msgpack)
+  python -m utils.storage.convert --to msgpack [--data-dir data] [--shard-size 10000]
+
+지금 형식은 파일 내용으로 알아내고, journal 이 남아 있으면 적용한 뒤의 상태를 새 형식으로 저장한다.
+예전 형식의 파일과 journal 은 지워진다. 바꾼 뒤에는 DATA_FORMAT (과 DATA_SHARD_SIZE) 도 같은 값으로 맞춰 서버를 띄운다.
+(서버를 멈춘 상태에서 실행하세요)
+"""
+import argparse
+import os
+from typing import Optional
+
+from utils import formats
+from utils.storage.base import PRIMARY_KEYS
+from utils.storage.json_backend import JSONFileBackend
+
+
+def convert(data_dir: str, data_format: str, shard_size: Optional[int] = None):
+    backend = JSONFileBackend(data_dir, cache_enabled=False, data_format=data_format, shard_size=shard_size)
+    for name in PRIMARY_KEYS:
+        records = backend.load_all(name)
+        backend.replace_all(name, records)
+        size = sum(os.path.getsize(p) for p in backend.data_files(name))
+        print(f"{name:<10} {len(records):>9} rows {size:>12,} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="data 파일 형식을 바꾼다")
+    parser.add_argument("--to", required=True, choices=sorted(formats.EXTENSIONS))
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--shard-size", type=int, default=None,
+                        help="posts/comments 샤드 크기 (0 이면 파일 하나, 기본값: DATA_SHARD_SIZE)")
+    args = parser.parse_args()
+
+    convert(args.data_dir, args.to, args.shard_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+import os
+import logging
+import shutil
+import tempfile   #임시파일 만들기(저장 안정성을 위해)
+from collections import defaultdict
+from threading import Lock, RLock, Thread
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils import formats, journal
+from utils.sequence import SequenceAllocator
+from utils.storage.base import PRIMARY_KEYS, SHARD_RANGES, Record, StorageBackend, collection_kind
+from utils.storage.collection import Collection
+from utils.storage.shards import ShardSet, shard_file
+
+logger = logging.getLogger(__name__)
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() not in ("0", "false", "no")
+
+
+class JSONFileBackend(StorageBackend):
+    """
+    data/{filename}.json (또는 .msgpack) 파일 기반 저장소 (기존 방식)
+    - 파싱한 컬렉션은 Collection(레코드 + 인덱스)으로 메모리에 캐시하고,
+      파일 mtime/크기가 바뀌었을 때만 다시 읽는다.
+    - storage_mode
+        snapshot: 변경할 때마다 파일 전체를 다시 쓴다
+        journal : 변경 내용만 {filename}.journal.jsonl 에 이어 쓰고,
+                  journal 이 커지면 백그라운드에서 스냅샷으로 합친다(compaction)
+    - data_format: 스냅샷 파일 형식 (utils.formats 참고). 읽을 때는 형식을 자동으로 알아낸다
+    - shard_size: 0 보다 크면 posts/comments 를 id 범위별 샤드 파일로 나눠 저장한다 (utils.storage.shards)
+      설정을 바꾸면 처음 접근할 때 기존 파일을 새 구조로 옮긴다.
+      샤드 매니페스트는 쓰기 manifest_save_every 번마다, 그리고 close() 할 때 저장한다
+    """
+
+    def __init__(self, data_dir: str = "data",
+                 storage_mode: Optional[str] = None,
+                 cache_enabled: Optional[bool] = None,
+                 journal_compact_bytes: Optional[int] = None,
+                 id_block_size: Optional[int] = None,
+                 data_format: Optional[str] = None,
+                 shard_size: Optional[int] = None):
+        self.data_dir = data_dir
+        self.storage_mode = (storage_mode or os.getenv("DATA_STORAGE_MODE", "snapshot")).lower()
+        self.data_format = formats.check_format(data_format or os.getenv("DATA_FORMAT", formats.FORMAT_JSON))
+        self.cache_enabled = cache_enabled if cache_enabled is not None else _env_flag("DATA_CACHE_ENABLED", "true")
+        self.journal_compact_bytes = journal_compact_bytes or int(
+            os.getenv("DATA_JOURNAL_COMPACT_BYTES", 4 * 1024 * 1024))
+        self.id_block_size = id_block_size or int(os.getenv("DATA_ID_BLOCK_SIZE", 32))
+        self.shard_size = shard_size if shard_size is not None else int(os.getenv("DATA_SHARD_SIZE", 0))
+        self.manifest_save_every = int(os.getenv("DATA_SHARD_MANIFEST_SAVE_EVERY", 100))
+
+        self._cache_lock = Lock()
+        self._collections: Dict[str, Collection] = {}
+        # 컬렉션별 쓰기 잠금 (journal 추가와 compaction 이 섞이지 않도록)
+        self._write_locks: Dict[str, RLock] = defaultdict(RLock)
+        self._compacting = set()
+        self._sequences: Dict[str, SequenceAllocator] = {}
+        self._shard_sets: Dict[str, Optional[ShardSet]] = {}
+
+    # =====================
+    # 파일 / 캐시
+    # =====================
+    def _path(self, filename: str) -> str:
+        # 저장할 파일 경로 (지금 설정한 형식)
+        return os.path.join(self.data_dir, filename + formats.extension(self.data_format))
+
+    def _existing_path(self, filename: str) -> Optional[str]:
+        # 읽을 파일 경로: 설정한 형식의 파일이 없으면 다른 형식으로 저장된 파일을 찾는다
+        for ext in formats.extensions(self.data_format):
+            file_path = os.path.join(self.data_dir, filename + ext)
+            if os.path.exists(file_path):
+                return file_path
+        return None
+
+    @staticmethod
+    def _file_stamp(file_path: str) -> Optional[Tuple[int, int]]:
+        # 다른 프로세스나 사람이 파일을 직접 고친 경우를 알아채기 위해 mtime + 크기를 같이 본다
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _collection_stamp(self, filename: str):
+        file_path = self._existing_path(filename)
+        return (self._file_stamp(file_path) if file_path else None,
+                self._file_stamp(journal.journal_path(self.data_dir, filename)))
+
+    def stamp(self, filename: str):
+        # 파일 mtime/크기 (샤드로 나눈 컬렉션은 파일이 여러 개라 알 수 없음)
+        if self._shards(filename) is not None:
+            return None
+        return self._collection_stamp(filename)
+
+    def close(self):
+        # 메모리에만 있는 샤드 매니페스트 변경을 저장한다
+        with self._cache_lock:
+            shard_sets = [s for s in self._shard_sets.values() if s is not None]
+        for shard_set in shard_sets:
+            with self._write_locks[shard_set.name]:
+                shard_set.flush()
+
+    def _set_cache(self, collection: Collection):
+        collection.stamp = self._collection_stamp(collection.name)
+        if self.cache_enabled:
+            with self._cache_lock:
+                self._collections[collection.name] = collection
+
+    def clear_cache(self, filename: Optional[str] = None):
+        with self._cache_lock:
+            if filename is None:
+                self._collections.clear()
+            else:
+                # 샤드로 나눈 컬렉션이면 샤드("posts/000003")도 함께 비운다
+                for name in [n for n in self._collections if collection_kind(n) == filename]:
+                    self._collections.pop(name, None)
+                self._collections.pop(filename, None)
+
+    def collection(self, filename: str) -> Collection:
+        # data 폴더가 없으면 생성
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+
+        # 파일이 없으면 빈 리스트 저장 후 반환
+        file_path = self._existing_path(filename)
+        if file_path is None:
+            return self._replace(filename, [])
+
+        stamp = self._collection_stamp(filename)
+        if self.cache_enabled:
+            with self._cache_lock:
+                cached = self._collections.get(filename)
+            if cached is not None and cached.stamp == stamp:
+                return cached
+
+        # 파일 읽기 (형식은 내용을 보고 판단)
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        try:
+            data = formats.loads(raw)
+        except ValueError:
+            logger.warning(f"데이터 파일 파싱 실패: {file_path}. 빈 리스트 반환")
+            data = []
+
+        # journal 이 남아 있으면 적용 (snapshot 모드로 바꾼 직후에도 유실되지 않도록 모드와 상관없이 적용)
+        data = journal.replay(data, journal.journal_path(self.data_dir, filename),
+                              PRIMARY_KEYS.get(collection_kind(filename)))
+
+        collection = Collection(filename, data, stamp)
+        if self.cache_enabled:
+            with self._cache_lock:
+                self._collections[filename] = collection
+        return collection
+
+    def _write_snapshot(self, filename: str, data):
+        # 임시 파일에 먼저 쓰기 (같은 폴더에 만들어야 교체가 atomic 하다)
+        target = self._path(filename)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with tempfile.NamedTemporaryFile(mode='wb', dir=self.data_dir, delete=False,
+                                         suffix=formats.extension(self.data_format)) as tmp:
+            tmp.write(formats.dumps(data, self.data_format))
+            tmp_path = tmp.name
+
+        # 성공 시 원본 교체 (atomic operation)
+        shutil.move(tmp_path, target)
+
+        # 형식을 바꿔서 확장자가 달라졌으면 예전 형식의 파일은 지운다
+        for ext in formats.extensions(self.data_format):
+            old_path = os.path.join(self.data_dir, filename + ext)
+            if old_path != target and os.path.exists(old_path):
+                os.remove(old_path)
+
+        # 스냅샷에 journal 내용이 모두 반영됐으므로 journal 은 비운다
+        journal_file = journal.journal_path(self.data_dir, filename)
+        if os.path.exists(journal_file):
+            os.remove(journal_file)
+
+    def _replace(self, filename: str, records: List[Record]) -> Collection:
+        # 컬렉션 전체 저장 (journal 모드에서도 스냅샷을 새로 쓰고 journal 을 비운다)
+        os.makedirs(self.data_dir, exist_ok=True)
+        with self._write_locks[filename]:
+            self._write_snapshot(filename, records)
+            # 방금 쓴 내용으로 캐시 갱신 (다음 load 에서 다시 파싱하지 않도록)
+            collection = Collection(filename, records)
+            self._set_cache(collection)
+        return collection
+
+    def _remove_files(self, filename: str):
+        # 컬렉션(또는 샤드) 파일과 journal 을 지운다
+        for ext in formats.extensions(self.data_format):
+            file_path = os.path.join(self.data_dir, filename + ext)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        journal_file = journal.journal_path(self.data_dir, filename)
+        if os.path.exists(journal_file):
+            os.remove(journal_file)
+        with self._cache_lock:
+            self._collections.pop(filename, None)
+
+    def data_files(self, filename: str) -> List[str]:
+        # 컬렉션을 이루는 스냅샷 파일 경로 (journal 제외)
+        shards = self._shards(filename)
+        names = [shard_file(filename, s) for s in shards.shard_ids()] if shards else [filename]
+        return [p for p in (self._existing_path(n) for n in names) if p]
+
+    # =====================
+    # 샤드
+    # =====================
+    def _shards(self, filename: str) -> Optional[ShardSet]:
+        # 샤드로 나눠 저장하는 컬렉션이면 ShardSet, 아니면 None
+        # 컬렉션마다 처음 한 번은 디스크의 저장 구조(파일 하나 / 샤드)를 지금 설정에 맞춘다
+        if filename not in SHARD_RANGES:
+            return None
+        with self._cache_lock:
+            if filename in self._shard_sets:
+                return self._shard_sets[filename]
+        with self._write_locks[filename]:
+            with self._cache_lock:
+                if filename in self._shard_sets:
+                    return self._shard_sets[filename]
+            shard_set = self._prepare_layout(filename)
+            with self._cache_lock:
+                self._shard_sets[filename] = shard_set
+        return shard_set
+
+    def _prepare_layout(self, filename: str) -> Optional[ShardSet]:
+        # 옮기는 도중 죽어도 데이터가 남도록 항상 "새 구조를 다 쓴 뒤 예전 것을 지운다"
+        legacy = self._existing_path(filename) is not None
+        current = ShardSet(self, filename, self.shard_size, self.manifest_save_every)
+        if current.exists():
+            if self.shard_size > 0 and current.shard_size == self.shard_size:
+                if legacy:
+                    # 샤드로 옮긴 뒤 지우지 못하고 남은 파일
+                    self._remove_files(filename)
+                return current
+            # 샤딩을 끄거나 샤드 크기를 바꾼 경우: 먼저 파일 하나로 합친다
+            self._replace(filename, current.load_all())
+            current.remove_all()
+            legacy = True
+            logger.info(f"{filename} 샤드를 파일 하나로 합침")
+
+        if self.shard_size <= 0:
+            return None
+        shard_set = ShardSet(self, filename, self.shard_size, self.manifest_save_every)
+        if legacy:
+            shard_set.replace_all(self.collection(filename).records)
+            self._remove_files(filename)
+            logger.info(f"{filename} 를 샤드로 나눔 (shard_size={self.shard_size})")
+        return shard_set
+
+    # =====================
+    # 읽기
+    # =====================
+    def load_all(self, filename: str) -> List[Record]:
+        shards = self._shards(filename)
+        if shards is not None:
+            return shards.load_all()
+        return self.collection(filename).records
+
+    def replace_all(self, filename: str, records: List[Record]):
+        shards = self._shards(filename)
+        if shards is not None:
+            with self._write_locks[filename]:
+                shards.replace_all(records)
+        else:
+            self._replace(filename, records)
+        # 새 데이터의 id 가 시퀀스 파일 값보다 클 수 있다 (가져온 데이터 / 다른 형식에서 변환)
+        primary_key = PRIMARY_KEYS[filename]
+        max_id = max((r[primary_key] for r in records if isinstance(r.get(primary_key), int)), default=0)
+        if max_id:
+            self._allocator(filename).reseed(max_id)
+
+    def get(self, filename: str, key) -> Optional[Record]:
+        shards = self._shards(filename)
+        if shards is not None:
+            return shards.get(key)
+        return self.collection(filename).get(key)
+
+    def get_many(self, filename: str, keys: Iterable[Any]) -> Dict[Any, Record]:
+        shards = self._shards(filename)
+        if shards is not None:
+            return shards.get_many(keys)
+        return self.collection(filename).get_many(keys)
+
+    def list_by(self, filename: str, index_name: str, value) -> List[Record]:
+        shards = self._shards(filename)
+        if shards is not None:
+            return shards.list_by(index_name, value)
+        return self.collection(filename).list_by(index_name, value)
+
+    def find_by(self, filename: str, index_name: str, value) -> Optional[Record]:
+        shards = self._shards(filename)
+        if shards is not None:
+            return shards.find_by(index_name, value)
+        return self.collection(filename).find_by(index_name, value)
+
+    def count(self, filename: str, index_name: str, groups: Iterable[Any]) -> Dict[Any, int]:
+        shards = self._shards(filename)
+        if shards is not None:
+            return shards.count(index_name, groups)
+        return self.collection(filename).count(index_name, groups)
+
+    def search(self, filename: str, index_name: str, text: str) -> Dict[Any, float]:
+        shards = self._shards(filename)
+        if shards is not None:
+            return shards.search(index_name, text)
+        return self.collection(filename).search(index_name, text)
+
+    def list_page(self, filename: str, *, order_by: str, limit: int, offset: int = 0,
+                  where: Optional[Dict[str, Any]] = None,
+                  after: Optional[Tuple[Any, Any]] = None) -> Tuple[List[Record], int]:
+        shards = self._shards(filename)
+        if shards is not None:
+            return shards.list_page(order_by, limit, offset, where, after)
+        collection = self.collection(filename)
+        position = collection.position(*after) if after is not None else None
+        return collection.list_page(order_by, limit, offset, where, position)
+
+    # =====================
+    # 레코드 단위 쓰기
+    # =====================
+    def _commit(self, collection: Collection, *entries: Dict[str, Any]):
+        # 변경을 디스크에 반영한다 (호출하는 쪽에서 _write_locks 를 잡고 있어야 한다)
+        # 메모리의 컬렉션은 이미 바뀐 상태이므로, 쓰기에 실패하면 캐시에서 버리고 다음 읽기 때 파일에서 다시 읽는다
+        try:
+            if self.storage_mode == "journal":
+                journal.append_entries(journal.journal_path(self.data_dir, collection.name), entries)
+            else:
+                self._write_snapshot(collection.name, collection.records)
+        except Exception:
+            with self._cache_lock:
+                if self._collections.get(collection.name) is collection:
+                    del self._collections[collection.name]
+            raise
+        self._set_cache(collection)
+        journal_size = collection.stamp[1][1] if collection.stamp[1] else 0
+        if self.storage_mode == "journal" and journal_size >= self.journal_compact_bytes:
+            self._schedule_compaction(collection.name)
+
+    def insert(self, filename: str, record: Record) -> Record:
+        shards = self._shards(filename)
+        with self._write_locks[filename]:
+            if shards is not None:
+                return shards.insert(record)
+            collection = self.collection(filename)
+            collection.add(record)
+            self._commit(collection, {"op": journal.OP_INSERT, "record": record})
+        return record
+
+    def _change(self, filename: str, key, changes: Dict[str, Any], op: str) -> Optional[Record]:
+        shards = self._shards(filename)
+        with self._write_locks[filename]:
+            if shards is not None:
+                return shards.change(key, changes, delete=op == journal.OP_DELETE)
+            collection = self.collection(filename)
+            record = collection.get(key)
+            if record is None:
+                return None
+            collection.change(record, changes)
+            self._commit(collection, {"op": op, "id": key, "changes": changes})
+        return record
+
+    def update(self, filename: str, key, changes: Dict[str, Any]) -> Optional[Record]:
+        return self._change(filename, key, changes, journal.OP_UPDATE)
+
+    def update_many(self, filename: str, changes_by_key: Dict[Any, Dict[str, Any]]) -> int:
+        # snapshot 모드에서는 파일을 한 번만 다시 쓰고, journal 모드에서는 줄을 한 번에 이어 쓴다
+        shards = self._shards(filename)
+        with self._write_locks[filename]:
+            if shards is not None:
+                return shards.update_many(changes_by_key)
+            collection = self.collection(filename)
+            entries = []
+            for key, changes in changes_by_key.items():
+                record = collection.get(key)
+                if record is None:
+                    continue
+                collection.change(record, changes)
+                entries.append({"op": journal.OP_UPDATE, "id": key, "changes": changes})
+            if entries:
+                self._commit(collection, *entries)
+        return len(entries)
+
+    def soft_delete(self, filename: str, key, changes: Dict[str, Any]) -> Optional[Record]:
+        return self._change(filename, key, {**changes, "is_deleted": True}, journal.OP_DELETE)
+
+    # =====================
+    # ID 발급
+    # =====================
+    def _max_id(self, filename: str) -> int:
+        # 시퀀스 파일이 없거나 깨졌을 때만 호출된다
+        shards = self._shards(filename)
+        if shards is not None:
+            return shards.max_id()
+        ids = self.collection(filename).by_id.keys()
+        return max((k for k in ids if isinstance(k, int)), default=0)
+
+    def _allocator(self, filename: str) -> SequenceAllocator:
+        with self._cache_lock:
+            allocator = self._sequences.get(filename)
+            if allocator is None:
+                os.makedirs(self.data_dir, exist_ok=True)
+                allocator = self._sequences[filename] = SequenceAllocator(
+                    os.path.join(self.data_dir, f"{filename}.seq"),
+                    seed=lambda: self._max_id(filename),
+                    block_size=self.id_block_size,
+                )
+        return allocator
+
+    def next_id(self, filename: str) -> int:
+        return self._allocator(filename).next_id()
+
+    # =====================
+    # journal compaction
+    # =====================
+    def _schedule_compaction(self, filename: str):
+        with self._cache_lock:
+            if filename in self._compacting:
+                return
+            self._compacting.add(filename)
+        Thread(target=self.compact, args=(filename,), name=f"compact-{filename}", daemon=True).start()
+
+    def compact(self, filename: str):
+        # 현재 상태를 새 스냅샷으로 쓰고 journal 을 비운다
+        try:
+            with self._write_locks[filename]:
+                collection = self.collection(filename)
+                self._write_snapshot(filename, collection.records)
+                self._set_cache(collection)
+            logger.info(f"journal compaction 완료: {filename}")
+        except Exception:
+            logger.exception(f"journal compaction 실패: {filename}")
+        finally:
+            with self._cache_lock:
+                self._compacting.discard(filename)
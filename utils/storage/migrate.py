@@ -0,0 +1,39 @@
+"""
+data/*.json -> SQLite 한 번에 옮기기
+  python -m utils.storage.migrate [--data-dir data] [--sqlite data/social.db]
+
+journal 이 남아 있으면 적용한 뒤의 상태를 옮긴다. 대상 테이블의 기존 내용은 지워진다.
+옮긴 뒤에는 DATA_BACKEND=sqlite 로 서버를 띄우면 된다.
+"""
+import argparse
+import os
+
+from utils.storage.base import PRIMARY_KEYS
+from utils.storage.json_backend import JSONFileBackend
+from utils.storage.sqlite_backend import SQLiteBackend
+
+
+def migrate(data_dir: str, sqlite_path: str):
+    source = JSONFileBackend(data_dir, cache_enabled=False)
+    target = SQLiteBackend(sqlite_path)
+    try:
+        for name in PRIMARY_KEYS:
+            records = source.load_all(name)
+            target.replace_all(name, records)
+            print(f"{name:<10} {len(records):>9} rows")
+    finally:
+        target.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="data/*.json 을 SQLite 로 옮긴다")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--sqlite", default=None, help="기본값: DATA_SQLITE_PATH 또는 <data-dir>/social.db")
+    args = parser.parse_args()
+
+    sqlite_path = args.sqlite or os.getenv("DATA_SQLITE_PATH", os.path.join(args.data_dir, "social.db"))
+    migrate(args.data_dir, sqlite_path)
+
+
+if __name__ == "__main__":
+    main()
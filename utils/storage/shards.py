@@ -0,0 +1,447 @@
+import json
+import os
+import shutil
+import logging
+import tempfile
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.indexes import is_active
+from utils.storage.base import PRIMARY_KEYS, SECONDARY_INDEXES, SHARD_RANGES, SORT_DEFAULTS, Record
+from utils.storage.topk import top
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+Manifest = Dict[str, Any]  # {"shard_size": int, "shards": {샤드 번호: 통계}}
+
+
+def _plain(value):
+    # 파일 stamp 를 매니페스트(JSON)에 적었다 읽은 값과 비교할 수 있게 튜플을 리스트로 바꾼다
+    if isinstance(value, (tuple, list)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def shard_file(name: str, shard: int) -> str:
+    # 샤드 하나의 파일 이름 (data/posts/000003.json 처럼 저장된다)
+    return f"{name}/{shard:06d}"
+
+
+def shard_stats(records: List[Record], fields) -> Dict[str, Any]:
+    # 매니페스트에 적는 샤드 통계: 레코드 수, 삭제 안 된 수, fields 의 최소/최대값
+    ranges: Dict[str, List[Any]] = {}
+    active = 0
+    for record in records:
+        if is_active(record):
+            active += 1
+        for field in fields:
+            value = record.get(field)
+            if value is None:
+                continue
+            low_high = ranges.get(field)
+            if low_high is None:
+                ranges[field] = [value, value]
+            elif value < low_high[0]:
+                low_high[0] = value
+            elif value > low_high[1]:
+                low_high[1] = value
+    return {"records": len(records), "active": active, "ranges": ranges}
+
+
+def extend_stats(stats: Dict[str, Any], record: Record, fields) -> Dict[str, Any]:
+    # 레코드 하나를 추가한 뒤의 통계 (shard_stats 를 다시 계산하지 않고 개수와 최소/최대값만 넓힌다)
+    ranges = dict(stats["ranges"])
+    for field in fields:
+        value = record.get(field)
+        if value is None:
+            continue
+        low_high = ranges.get(field)
+        if low_high is None:
+            ranges[field] = [value, value]
+        elif value < low_high[0]:
+            ranges[field] = [value, low_high[1]]
+        elif value > low_high[1]:
+            ranges[field] = [low_high[0], value]
+    return {**stats, "records": stats["records"] + 1,
+            "active": stats["active"] + (1 if is_active(record) else 0), "ranges": ranges}
+
+
+class ShardSet:
+    """
+    샤드로 나눠 저장하는 컬렉션 (json 저장소의 posts, comments)
+    - 기본키 범위로 나눈다: shard = (id - 1) // shard_size -> data/{name}/{shard:06d}.json
+      id 는 작성할 때 순서대로 발급되므로 번호가 큰 샤드일수록 최근 레코드다.
+    - 샤드 하나하나는 보통 컬렉션과 똑같이 저장/캐시된다 (snapshot/journal, 형식, Collection 인덱스).
+      그래서 수정은 그 레코드가 든 샤드만 다시 쓴다.
+    - data/{name}/manifest.json 에 샤드별 레코드 수와 SHARD_RANGES 필드의 최소/최대값을 적어 두고,
+      목록 조회는 이 값으로 필요 없는 샤드를 읽지 않고 건너뛴다.
+    - 추가/삭제는 메모리의 매니페스트만 고치고(개수 +-1, 최소/최대 넓히기), 파일은 샤드가 새로 생길 때,
+      쓰기가 save_every 번 쌓일 때, flush() 할 때만 다시 쓴다.
+      통계마다 그 샤드 파일의 stamp 를 같이 적어 두고, 파일에서 매니페스트를 읽을 때 stamp 가 다른 샤드
+      (저장 전에 죽었거나 다른 프로세스가 쓴 샤드)만 통계를 다시 계산한다.
+    - 쓰기 메서드는 backend 가 _write_locks[name] 을 잡은 상태에서 호출한다.
+    """
+
+    def __init__(self, backend, name: str, shard_size: int, save_every: int = 1):
+        self.backend = backend
+        self.name = name
+        self.primary_key = PRIMARY_KEYS[name]
+        self.range_fields = SHARD_RANGES[name]
+        self.default_shard_size = shard_size  # 매니페스트가 없을 때(새로 만들 때) 쓰는 크기
+        self.dir = os.path.join(backend.data_dir, name)
+        self.manifest_path = os.path.join(self.dir, MANIFEST_NAME)
+        self._lock = Lock()
+        self._manifest: Optional[Manifest] = None
+        self._manifest_stamp = None
+        self.save_every = max(save_every, 1)
+        self._unsaved = 0  # 파일에 아직 쓰지 않은 매니페스트 변경 수
+
+    # =====================
+    # 매니페스트
+    # =====================
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def manifest(self) -> Manifest:
+        # 다른 프로세스가 고쳤을 수 있으므로 파일 mtime/크기가 바뀌면 다시 읽는다.
+        # 돌려준 dict 는 수정하지 않는다 (바꿀 때는 새 dict 를 만들어 교체한다)
+        stamp = self.backend._file_stamp(self.manifest_path)
+        with self._lock:
+            if self._manifest is not None and self._manifest_stamp == stamp:
+                return self._manifest
+
+        if stamp is None:
+            manifest = {"shard_size": self.default_shard_size, "shards": {}}
+        else:
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    raw = json.load(f)
+                manifest = {
+                    "shard_size": int(raw["shard_size"]),
+                    "shards": {int(shard): stats for shard, stats in raw["shards"].items()},
+                }
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"매니페스트 파싱 실패: {self.manifest_path}. 샤드 파일에서 다시 만든다")
+                manifest = self._rebuild()
+            else:
+                manifest = self._verify(manifest)
+
+        with self._lock:
+            self._manifest, self._manifest_stamp = manifest, stamp
+            self._unsaved = 0
+        return manifest
+
+    def _shard_stamp(self, shard: int):
+        return _plain(self.backend._collection_stamp(shard_file(self.name, shard)))
+
+    def _stats(self, shard: int, records: List[Record]) -> Dict[str, Any]:
+        return {**shard_stats(records, self.range_fields), "stamp": self._shard_stamp(shard)}
+
+    def _verify(self, manifest: Manifest) -> Manifest:
+        # 적어 둔 stamp 와 지금 샤드 파일의 stamp 가 다른 샤드만 통계를 다시 계산한다
+        stale = [shard for shard, stats in manifest["shards"].items()
+                 if stats.get("stamp") != self._shard_stamp(shard)]
+        if not stale:
+            return manifest
+        shards = dict(manifest["shards"])
+        for shard in stale:
+            shards[shard] = self._stats(shard, self._collection(shard).records)
+        return {"shard_size": manifest["shard_size"], "shards": shards}
+
+    def _rebuild(self) -> Manifest:
+        shards = set()
+        for entry in os.listdir(self.dir):
+            prefix = entry.split(".", 1)[0]
+            if prefix.isdigit():
+                shards.add(int(prefix))
+        manifest = {"shard_size": self.default_shard_size, "shards": {}}
+        for shard in shards:
+            manifest["shards"][shard] = self._stats(shard, self._collection(shard).records)
+        self._save(manifest)
+        return manifest
+
+    def _save(self, manifest: Manifest):
+        os.makedirs(self.dir, exist_ok=True)
+        data = {
+            "shard_size": manifest["shard_size"],
+            "shards": {str(shard): stats for shard, stats in sorted(manifest["shards"].items())},
+        }
+        with tempfile.NamedTemporaryFile(mode="w", encoding="utf-8", dir=self.dir,
+                                         delete=False, suffix=".tmp") as tmp:
+            json.dump(data, tmp, ensure_ascii=False, indent=4)
+            tmp_path = tmp.name
+        shutil.move(tmp_path, self.manifest_path)
+        with self._lock:
+            self._manifest = manifest
+            self._manifest_stamp = self.backend._file_stamp(self.manifest_path)
+            self._unsaved = 0
+
+    def _update(self, stats_by_shard: Dict[int, Dict[str, Any]]):
+        # 바뀐 샤드의 통계로 메모리의 매니페스트를 교체한다.
+        # 새 샤드가 생겼거나 쓰기가 save_every 번 쌓였으면 파일에도 쓴다
+        manifest = self.manifest()
+        updated = {"shard_size": manifest["shard_size"], "shards": {**manifest["shards"], **stats_by_shard}}
+        if any(shard not in manifest["shards"] for shard in stats_by_shard) or self._unsaved + 1 >= self.save_every:
+            self._save(updated)
+            return
+        with self._lock:
+            self._manifest = updated
+            self._unsaved += 1
+
+    def _refresh(self, shards):
+        # 쓴 샤드의 통계를 다시 계산한다 (기록 범위 필드가 바뀐 경우처럼 드문 변경)
+        self._update({shard: self._stats(shard, self._collection(shard).records) for shard in shards})
+
+    def flush(self):
+        # 메모리에만 있는 매니페스트 변경을 파일에 쓴다
+        with self._lock:
+            manifest = self._manifest if self._unsaved else None
+        if manifest is not None:
+            self._save(manifest)
+
+    @property
+    def shard_size(self) -> int:
+        return self.manifest()["shard_size"]
+
+    def shard_ids(self) -> List[int]:
+        return sorted(self.manifest()["shards"])
+
+    def shard_of(self, key) -> Optional[int]:
+        try:
+            return (int(key) - 1) // self.shard_size
+        except (TypeError, ValueError):
+            return None
+
+    def _collection(self, shard: int):
+        return self.backend.collection(shard_file(self.name, shard))
+
+    def _candidates(self, manifest: Manifest, where: Dict[str, Any]) -> List[int]:
+        # where 값이 샤드의 최소/최대 범위 밖이면 그 샤드는 읽지 않는다
+        shards = []
+        for shard, stats in sorted(manifest["shards"].items()):
+            ranges = stats["ranges"]
+            if all(f not in ranges or ranges[f][0] <= v <= ranges[f][1] for f, v in where.items()):
+                shards.append(shard)
+        return shards
+
+    # =====================
+    # 읽기
+    # =====================
+    def load_all(self) -> List[Record]:
+        records = []
+        for shard in self.shard_ids():
+            records.extend(self._collection(shard).records)
+        return records
+
+    def get(self, key) -> Optional[Record]:
+        shard = self.shard_of(key)
+        if shard not in self.manifest()["shards"]:
+            return None
+        return self._collection(shard).get(key)
+
+    def get_many(self, keys: Iterable[Any]) -> Dict[Any, Record]:
+        # 샤드별로 묶어서 샤드마다 한 번씩만 연다
+        by_shard: Dict[int, List[Any]] = {}
+        for key in keys:
+            by_shard.setdefault(self.shard_of(key), []).append(key)
+        shards = self.manifest()["shards"]
+        found: Dict[Any, Record] = {}
+        for shard, shard_keys in by_shard.items():
+            if shard in shards:
+                found.update(self._collection(shard).get_many(shard_keys))
+        return found
+
+    def list_by(self, index_name: str, value) -> List[Record]:
+        index = SECONDARY_INDEXES[self.name][index_name]()
+        rows = []
+        for shard in self._candidates(self.manifest(), {index.group_field: value}):
+            rows.extend(self._collection(shard).list_by(index_name, value))
+        if index.order_field:
+            # 샤드 안에서는 이미 정렬돼 있다. 샤드끼리 합칠 때 같은 값이면 앞 샤드가 먼저 온다
+            default = SORT_DEFAULTS.get(index.order_field, "")
+            rows.sort(key=lambda r: r.get(index.order_field, default), reverse=True)
+        return rows
+
+    def find_by(self, index_name: str, value) -> Optional[Record]:
+        for shard in reversed(self.shard_ids()):
+            record = self._collection(shard).find_by(index_name, value)
+            if record is not None:
+                return record
+        return None
+
+    def count(self, index_name: str, groups: Iterable[Any]) -> Dict[Any, int]:
+        # 샤드별 개수의 합. 전체 개수는 매니페스트에서, 그룹은 범위에 들어오는 샤드만 센다
+        index = SECONDARY_INDEXES[self.name][index_name]()
+        manifest = self.manifest()
+        counts = {}
+        for group in groups:
+            if index.group_field is None:
+                counts[group] = sum(stats["active"] for stats in manifest["shards"].values())
+                continue
+            shards = [s for s in self._candidates(manifest, {index.group_field: group})
+                      if manifest["shards"][s]["active"]]
+            counts[group] = sum(self._collection(s).indexes[index_name].count(group) for s in shards)
+        return counts
+
+    def search(self, index_name: str, text: str) -> Dict[Any, float]:
+        # 기본키는 한 샤드에만 있으므로 샤드별 결과를 그대로 합친다
+        scores: Dict[Any, float] = {}
+        for shard in self.shard_ids():
+            scores.update(self._collection(shard).search(index_name, text))
+        return scores
+
+    def _position(self, shard: int, collection, after: Tuple[Any, Any]) -> Tuple:
+        # cursor(after) 레코드의 자리를 이 샤드의 정렬 키로 바꾼다.
+        # 같은 값이면 앞 샤드가 먼저이므로, cursor 보다 앞 샤드는 같은 값을 모두 제외하고 뒤 샤드는 모두 포함한다
+        value, key = after
+        cursor_shard = self.shard_of(key)
+        if cursor_shard is None or shard < cursor_shard:
+            return (value,)
+        if shard > cursor_shard:
+            return (value, float("inf"))
+        return collection.position(value, key)
+
+    def list_page(self, order_by: str, limit: int, offset: int = 0,
+                  where: Optional[Dict[str, Any]] = None,
+                  after: Optional[Tuple[Any, Any]] = None) -> Tuple[List[Record], int]:
+        where = where or {}
+        manifest = self.manifest()
+        stats = manifest["shards"]
+        shards = [s for s in self._candidates(manifest, where) if stats[s]["active"]]
+        need = offset + limit
+        default = SORT_DEFAULTS.get(order_by, 0)
+
+        def high(shard):
+            return stats[shard]["ranges"].get(order_by, [default, default])[1]
+
+        def low(shard):
+            return stats[shard]["ranges"].get(order_by, [default, default])[0]
+
+        # 조건 없이 샤드 범위를 아는 필드(created_at)로 정렬하면 최댓값이 큰 샤드부터 읽다가,
+        # 남은 샤드가 이 페이지에 들어올 수 없게 되면 멈춘다. 전체 개수는 매니페스트에서 센다
+        early_stop = not where and order_by in self.range_fields
+        if early_stop:
+            total = sum(stats[s]["active"] for s in shards)
+            shards.sort(key=high, reverse=True)
+            if after is not None:
+                # 모든 값이 cursor 보다 큰 샤드는 이미 지나온 샤드다
+                shards = [s for s in shards if not low(s) > after[0]]
+
+        picked: Dict[int, List[Record]] = {}
+        counted = 0
+        rows: List[Record] = []
+        for shard in shards:
+            if early_stop and len(rows) >= need and high(shard) < rows[need - 1].get(order_by, default):
+                break
+            collection = self._collection(shard)
+            position = self._position(shard, collection, after) if after is not None else None
+            page, count = collection.list_page(order_by, need, 0, where, position)
+            picked[shard] = page
+            counted += count
+            # 샤드 번호 순으로 이어 붙인 뒤 앞쪽 need 개 (안정 정렬과 같은 순서)
+            # -> 같은 값이면 앞 샤드, 샤드 안에서는 파일 순서
+            rows = [r for s in sorted(picked) for r in picked[s]]
+            rows = top(rows, lambda r: r.get(order_by, default), need)
+
+        if not early_stop:
+            total = counted
+        return rows[offset:offset + limit], total
+
+    def max_id(self) -> int:
+        for shard in reversed(self.shard_ids()):
+            ids = [k for k in self._collection(shard).by_id if isinstance(k, int)]
+            if ids:
+                return max(ids)
+        return 0
+
+    # =====================
+    # 쓰기
+    # =====================
+    def insert(self, record: Record) -> Record:
+        shard = self.shard_of(record.get(self.primary_key))
+        if shard is None:
+            raise ValueError(f"{self.name} 샤드는 정수 기본키가 필요합니다: {record.get(self.primary_key)!r}")
+        self.backend.insert(shard_file(self.name, shard), record)
+        stats = self.manifest()["shards"].get(shard)
+        if stats is None:
+            self._refresh([shard])
+        else:
+            self._update({shard: {**extend_stats(stats, record, self.range_fields), "stamp": self._shard_stamp(shard)}})
+        return record
+
+    def _touches_stats(self, changes: Dict[str, Any]) -> bool:
+        # 조회수/좋아요 수처럼 매니페스트 통계와 상관없는 변경이면 통계를 다시 계산하지 않는다 (stamp 만 바꾼다)
+        return "is_deleted" in changes or any(f in changes for f in self.range_fields)
+
+    def change(self, key, changes: Dict[str, Any], delete: bool = False) -> Optional[Record]:
+        shard = self.shard_of(key)
+        if shard not in self.manifest()["shards"]:
+            return None
+        filename = shard_file(self.name, shard)
+        before = self._collection(shard).get(key)
+        was_active = before is not None and is_active(before)
+        if delete:
+            record = self.backend.soft_delete(filename, key, changes)
+        else:
+            record = self.backend.update(filename, key, changes)
+        if record is None:
+            return None
+        if any(f in changes for f in self.range_fields):
+            self._refresh([shard])
+        else:
+            # 삭제/복구는 개수만 바뀐다 (최소/최대는 넓은 채로 두어도 건너뛰기가 틀리지 않는다)
+            stats = self.manifest()["shards"][shard]
+            active = stats["active"] + (1 if is_active(record) else 0) - (1 if was_active else 0)
+            self._update({shard: {**stats, "active": active, "stamp": self._shard_stamp(shard)}})
+        return record
+
+    def update_many(self, changes_by_key: Dict[Any, Dict[str, Any]]) -> int:
+        shards = self.manifest()["shards"]
+        groups: Dict[int, Dict[Any, Dict[str, Any]]] = {}
+        for key, changes in changes_by_key.items():
+            shard = self.shard_of(key)
+            if shard in shards:
+                groups.setdefault(shard, {})[key] = changes
+        updated = 0
+        for shard, group in groups.items():
+            updated += self.backend.update_many(shard_file(self.name, shard), group)
+        if groups:
+            self._update({
+                shard: (self._stats(shard, self._collection(shard).records)
+                        if any(self._touches_stats(c) for c in group.values())
+                        else {**shards[shard], "stamp": self._shard_stamp(shard)})
+                for shard, group in groups.items()
+            })
+        return updated
+
+    def replace_all(self, records: List[Record]):
+        groups: Dict[int, List[Record]] = {}
+        for record in records:
+            shard = self.shard_of(record.get(self.primary_key))
+            if shard is None:
+                raise ValueError(f"{self.name} 샤드는 정수 기본키가 필요합니다: {record.get(self.primary_key)!r}")
+            groups.setdefault(shard, []).append(record)
+
+        old_shards = set(self.manifest()["shards"])
+        for shard, group in groups.items():
+            self.backend._replace(shard_file(self.name, shard), group)
+        # 매니페스트를 먼저 바꾼 뒤 빠진 샤드 파일을 지운다 (매니페스트가 없는 파일을 가리키지 않도록)
+        self._save({
+            "shard_size": self.shard_size,
+            "shards": {shard: self._stats(shard, group) for shard, group in groups.items()},
+        })
+        for shard in old_shards - set(groups):
+            self.backend._remove_files(shard_file(self.name, shard))
+
+    def remove_all(self):
+        # 매니페스트를 먼저 지운다 (중간에 죽어도 매니페스트가 없는 샤드를 가리키지 않도록)
+        shards = self.shard_ids()
+        if self.exists():
+            os.remove(self.manifest_path)
+        for shard in shards:
+            self.backend._remove_files(shard_file(self.name, shard))
+        with self._lock:
+            self._manifest = self._manifest_stamp = None
+        shutil.rmtree(self.dir, ignore_errors=True)
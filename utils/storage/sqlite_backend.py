@@ -0,0 +1,480 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.indexes import CountIndex, GroupIndex, UniqueIndex
+from utils.search import TextIndex, is_hangul, tokenize
+from utils.storage.base import PRIMARY_KEYS, SECONDARY_INDEXES, SORT_DEFAULTS, Record, StorageBackend
+
+# =====================
+# 테이블 정의
+# =====================
+# 레코드 전체는 doc(JSON) 컬럼에 저장하고, 검색/정렬에 쓰는 필드만 따로 컬럼으로 뺀다.
+# seq 는 저장된 순서 (JSON 파일의 리스트 순서와 같은 의미)
+TABLES = {
+    "users": {
+        "columns": {"userId": "TEXT", "email": "TEXT", "nickname": "TEXT", "is_deleted": "INTEGER"},
+        "indexes": [("email",), ("nickname",)],
+    },
+    "posts": {
+        "columns": {"postId": "INTEGER", "userId": "TEXT", "created_at": "TEXT",
+                    "viewCount": "INTEGER", "likeCount": "INTEGER", "is_deleted": "INTEGER"},
+        "indexes": [("is_deleted", "created_at"), ("is_deleted", "viewCount"), ("is_deleted", "likeCount"),
+                    ("userId", "is_deleted", "created_at"), ("userId", "is_deleted", "viewCount"),
+                    ("userId", "is_deleted", "likeCount")],
+    },
+    "comments": {
+        "columns": {"commentId": "INTEGER", "postId": "INTEGER", "userId": "TEXT",
+                    "created_at": "TEXT", "is_deleted": "INTEGER"},
+        "indexes": [("postId", "created_at"), ("userId", "created_at")],
+    },
+    "likes": {
+        "columns": {"likeId": "INTEGER", "postId": "INTEGER", "userId": "TEXT",
+                    "created_at": "TEXT", "is_deleted": "INTEGER"},
+        "indexes": [("postId", "userId", "is_deleted"), ("userId",), ("userId", "is_deleted", "created_at")],
+    },
+}
+
+# 검색 토큰 테이블 ({컬렉션}_terms): TextIndex 가 있는 컬렉션만, 삭제되지 않은 레코드의 (필드, 토큰, 기본키)
+# TextIndex 와 같은 토큰으로 넣고, 레코드를 쓸 때 같은 트랜잭션에서 그 레코드의 토큰만 바꾼다
+def _text_fields(indexes: Dict[str, Any]) -> List[str]:
+    fields = set()
+    for factory in indexes.values():
+        index = factory()
+        if isinstance(index, TextIndex):
+            fields.update(index.weights)
+    return sorted(fields)
+
+
+TEXT_FIELDS = {
+    name: _text_fields(indexes)
+    for name, indexes in SECONDARY_INDEXES.items() if _text_fields(indexes)
+}
+
+# 개수 테이블 (counters): CountIndex 마다 (이름, 그룹 값) -> 삭제되지 않은 행 수.
+# 트리거로 insert / update / delete 와 같은 트랜잭션에서 바뀌므로 COUNT(*) 없이 바로 읽는다.
+# 이름은 "컬렉션.인덱스", 그룹이 없는 인덱스의 그룹 값은 ''
+def _counters(indexes: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    # CountIndex 이름 -> 그룹 필드
+    counters = {}
+    for index_name, factory in indexes.items():
+        index = factory()
+        if isinstance(index, CountIndex):
+            counters[index_name] = index.group_field
+    return counters
+
+
+COUNTERS = {
+    name: _counters(indexes)
+    for name, indexes in SECONDARY_INDEXES.items() if _counters(indexes)
+}
+
+
+# get_many 에서 한 번에 IN (...) 으로 찾는 기본키 수 (SQLite 변수 개수 제한보다 작게)
+GET_MANY_CHUNK = 500
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    SQLite 저장소 (WAL 모드)
+    - 스레드마다 연결을 하나씩 두고, SQL 문은 고정 문자열이라 sqlite3 의 statement 캐시를 그대로 탄다.
+    - 정렬 + limit/offset 은 SQL 로 내려보내므로 한 페이지만 읽는다.
+    - 메서드 하나의 쓰기는 BEGIN IMMEDIATE 트랜잭션 하나이다.
+      라우터의 읽기-수정-쓰기(확인 후 추가, likeCount + 1 등)는 utils.data.transaction 이 transaction() 으로
+      구간 전체를 BEGIN IMMEDIATE 하나로 묶으므로 워커 프로세스가 여러 개여도 값이 유실되지 않는다.
+      그 안에서 부르는 메서드의 트랜잭션은 SAVEPOINT 로 중첩된다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._sql = {name: self._build_sql(name, spec) for name, spec in TABLES.items()}
+        self._create_schema()
+
+    # =====================
+    # 연결 / 스키마
+    # =====================
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False,
+                                   cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        # 이 스레드에서 이미 트랜잭션 안이면 SAVEPOINT 로 중첩한다 (바깥 트랜잭션이 COMMIT 할 때 함께 반영)
+        conn = self._conn()
+        depth = getattr(self._local, "depth", 0)
+        savepoint = f"sp{depth}"
+        conn.execute(f"SAVEPOINT {savepoint}" if depth else "BEGIN IMMEDIATE")
+        self._local.depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            if depth:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            else:
+                conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute(f"RELEASE {savepoint}" if depth else "COMMIT")
+        finally:
+            self._local.depth = depth
+
+    @contextmanager
+    def transaction(self):
+        with self._transaction():
+            yield
+
+    def _create_schema(self):
+        conn = self._conn()
+        for name, spec in TABLES.items():
+            primary_key = PRIMARY_KEYS[name]
+            columns = ", ".join(
+                f"{col} {col_type} UNIQUE" if col == primary_key else f"{col} {col_type}"
+                for col, col_type in spec["columns"].items()
+            )
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} "
+                f"(seq INTEGER PRIMARY KEY AUTOINCREMENT, {columns}, doc TEXT NOT NULL)"
+            )
+            for fields in spec["indexes"]:
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{name}_{'_'.join(fields)} "
+                    f"ON {name} ({', '.join(fields)})"
+                )
+        conn.execute("CREATE TABLE IF NOT EXISTS sequences (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters "
+            "(name TEXT NOT NULL, grp NOT NULL, value INTEGER NOT NULL, PRIMARY KEY (name, grp)) WITHOUT ROWID"
+        )
+        for name, counters in COUNTERS.items():
+            for index_name, group_field in counters.items():
+                self._create_counter(conn, name, index_name, group_field)
+        conn.execute("CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID")
+        for name in TABLES:
+            self._create_version_trigger(conn, name)
+        for name in TEXT_FIELDS:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {name}_terms "
+                f"(field TEXT NOT NULL, term TEXT NOT NULL, key NOT NULL, PRIMARY KEY (field, term, key)) "
+                f"WITHOUT ROWID"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_terms_key ON {name}_terms (key)")
+            # 한 글자 한글 검색: bigram 의 둘째 글자로 찾는 인덱스 (첫 글자는 기본키 범위로 찾는다)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_terms_second ON {name}_terms (field, substr(term, 2))")
+            # 토큰 테이블이 생기기 전에 만든 DB 면 한 번 채운다
+            if (conn.execute(f"SELECT 1 FROM {name}_terms LIMIT 1").fetchone() is None
+                    and conn.execute(f"SELECT 1 FROM {name} LIMIT 1").fetchone() is not None):
+                with self._transaction() as tx:
+                    for record in self._docs(tx.execute(self._sql[name]["all"])):
+                        self._index_terms(tx, name, record)
+
+    @staticmethod
+    def _build_sql(name: str, spec: Dict[str, Any]) -> Dict[str, str]:
+        primary_key = PRIMARY_KEYS[name]
+        columns = list(spec["columns"])
+        return {
+            "all": f"SELECT doc FROM {name} ORDER BY seq",
+            "get": f"SELECT doc FROM {name} WHERE {primary_key} = ?",
+            "insert": f"INSERT INTO {name} ({', '.join(columns)}, doc) "
+                      f"VALUES ({', '.join('?' for _ in columns)}, ?)",
+            "update": f"UPDATE {name} SET {', '.join(f'{c} = ?' for c in columns)}, doc = ? "
+                      f"WHERE {primary_key} = ?",
+            "delete_all": f"DELETE FROM {name}",
+            "max_id": f"SELECT MAX({primary_key}) FROM {name}",
+        }
+
+    def _row(self, filename: str, record: Record) -> Tuple:
+        values = []
+        for col in TABLES[filename]["columns"]:
+            value = record.get(col)
+            if isinstance(value, bool):
+                value = int(value)
+            if value is None:
+                value = 0 if col == "is_deleted" else SORT_DEFAULTS.get(col)
+            values.append(value)
+        return (*values, json.dumps(record, ensure_ascii=False))
+
+    def _column(self, filename: str, field: str) -> str:
+        # 컬럼으로 뺀 필드만 SQL 에 넣는다
+        if field not in TABLES[filename]["columns"]:
+            raise ValueError(f"{filename}.{field} 는 SQLite 컬럼이 아닙니다")
+        return field
+
+    def _create_counter(self, conn: sqlite3.Connection, name: str, index_name: str, group_field: Optional[str]):
+        counter = f"{name}.{index_name}"
+        trigger = f"trg_{name}_{index_name}"
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+                        (f"{trigger}_insert",)).fetchone() is not None:
+            return
+        group = f"{self._column(name, group_field)}" if group_field else "''"
+        old_group, new_group = (f"OLD.{group}", f"NEW.{group}") if group_field else ("''", "''")
+        increment = (f"INSERT INTO counters (name, grp, value) SELECT '{counter}', {new_group}, 1 "
+                     f"WHERE NEW.is_deleted = 0 ON CONFLICT (name, grp) DO UPDATE SET value = value + 1;")
+        decrement = (f"UPDATE counters SET value = value - 1 "
+                     f"WHERE name = '{counter}' AND grp = {old_group} AND OLD.is_deleted = 0;")
+        with self._transaction() as tx:
+            tx.execute(f"CREATE TRIGGER {trigger}_insert AFTER INSERT ON {name} BEGIN {increment} END")
+            tx.execute(f"CREATE TRIGGER {trigger}_update AFTER UPDATE ON {name} BEGIN {decrement} {increment} END")
+            tx.execute(f"CREATE TRIGGER {trigger}_delete AFTER DELETE ON {name} BEGIN {decrement} END")
+            # 트리거가 생기기 전의 행은 한 번 세어 둔다
+            tx.execute("DELETE FROM counters WHERE name = ?", (counter,))
+            tx.execute(
+                f"INSERT INTO counters (name, grp, value) "
+                f"SELECT ?, {group}, COUNT(*) FROM {name} WHERE is_deleted = 0 GROUP BY {group}",
+                (counter,),
+            )
+
+    def _create_version_trigger(self, conn: sqlite3.Connection, name: str):
+        # 변경 번호 (versions): 컬렉션 -> 쓰기마다 1씩 올라가는 번호 (stamp).
+        # 트리거로 같은 트랜잭션에서 올리므로 다른 워커 프로세스의 쓰기도 이 값으로 알아챈다
+        trigger = f"trg_{name}_version"
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+                        (f"{trigger}_insert",)).fetchone() is not None:
+            return
+        bump = (f"INSERT INTO versions (name, value) VALUES ('{name}', 1) "
+                f"ON CONFLICT (name) DO UPDATE SET value = value + 1;")
+        with self._transaction() as tx:
+            for event in ("insert", "update", "delete"):
+                tx.execute(f"CREATE TRIGGER {trigger}_{event} AFTER {event.upper()} ON {name} BEGIN {bump} END")
+
+    def _index_terms(self, conn: sqlite3.Connection, filename: str, record: Record, replace: bool = False):
+        # 레코드 하나의 검색 토큰을 넣는다 (replace 면 기존 토큰을 먼저 지운다). 삭제된 레코드는 빼기만 한다
+        key = record.get(PRIMARY_KEYS[filename])
+        if replace:
+            conn.execute(f"DELETE FROM {filename}_terms WHERE key = ?", (key,))
+        if record.get("is_deleted"):
+            return
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {filename}_terms (field, term, key) VALUES (?, ?, ?)",
+            ((field, term, key) for field in TEXT_FIELDS[filename] for term in tokenize(record.get(field))),
+        )
+
+    def _touches_terms(self, filename: str, changes: Dict[str, Any]) -> bool:
+        fields = TEXT_FIELDS.get(filename)
+        return bool(fields) and ("is_deleted" in changes or any(f in changes for f in fields))
+
+    @staticmethod
+    def _docs(cursor) -> List[Record]:
+        return [json.loads(row[0]) for row in cursor]
+
+    def stamp(self, filename: str) -> int:
+        row = self._conn().execute("SELECT value FROM versions WHERE name = ?", (filename,)).fetchone()
+        return row[0] if row else 0
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    # =====================
+    # 읽기
+    # =====================
+    def load_all(self, filename: str) -> List[Record]:
+        return self._docs(self._conn().execute(self._sql[filename]["all"]))
+
+    def replace_all(self, filename: str, records: List[Record]):
+        with self._transaction() as conn:
+            conn.execute(self._sql[filename]["delete_all"])
+            conn.executemany(self._sql[filename]["insert"], (self._row(filename, r) for r in records))
+            if filename in TEXT_FIELDS:
+                conn.execute(f"DELETE FROM {filename}_terms")
+                for record in records:
+                    self._index_terms(conn, filename, record)
+            # 시퀀스가 이미 있어도 새 데이터의 최대 id 보다 작으면 올린다 (migrate 로 다시 옮긴 경우 등)
+            max_id = conn.execute(self._sql[filename]["max_id"]).fetchone()[0]
+            if isinstance(max_id, int):
+                conn.execute(
+                    "INSERT INTO sequences (name, value) VALUES (?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET value = MAX(value, excluded.value)",
+                    (filename, max_id),
+                )
+
+    def get(self, filename: str, key) -> Optional[Record]:
+        row = self._conn().execute(self._sql[filename]["get"], (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, filename: str, keys: Iterable[Any]) -> Dict[Any, Record]:
+        # IN (...) 한 번에 (변수 개수 제한 때문에 GET_MANY_CHUNK 개씩 나눈다)
+        keys = list(dict.fromkeys(keys))
+        primary_key = PRIMARY_KEYS[filename]
+        conn = self._conn()
+        found: Dict[Any, Record] = {}
+        for start in range(0, len(keys), GET_MANY_CHUNK):
+            chunk = keys[start:start + GET_MANY_CHUNK]
+            sql = f"SELECT doc FROM {filename} WHERE {primary_key} IN ({', '.join('?' for _ in chunk)})"
+            for record in self._docs(conn.execute(sql, chunk)):
+                found[record[primary_key]] = record
+        return found
+
+    def list_by(self, filename: str, index_name: str, value) -> List[Record]:
+        index = SECONDARY_INDEXES[filename][index_name]()
+        assert isinstance(index, GroupIndex)
+        group = self._column(filename, index.group_field)
+        if index.order_field:
+            order = f"{self._column(filename, index.order_field)} DESC, seq ASC"
+        else:
+            order = "seq ASC"
+        sql = f"SELECT doc FROM {filename} WHERE {group} = ? ORDER BY {order}"
+        return self._docs(self._conn().execute(sql, (value,)))
+
+    def find_by(self, filename: str, index_name: str, value) -> Optional[Record]:
+        index = SECONDARY_INDEXES[filename][index_name]()
+        assert isinstance(index, UniqueIndex)
+        conditions = " AND ".join(f"{self._column(filename, f)} = ?" for f in index.key_fields)
+        sql = f"SELECT doc FROM {filename} WHERE {conditions} AND is_deleted = 0 ORDER BY seq DESC LIMIT 1"
+        row = self._conn().execute(sql, tuple(value)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self, filename: str, index_name: str, groups: Iterable[Any]) -> Dict[Any, int]:
+        counter = f"{filename}.{index_name}"
+        if index_name not in COUNTERS.get(filename, {}):
+            raise ValueError(f"{counter} 는 CountIndex 가 아닙니다")
+        conn = self._conn()
+        counts = {}
+        for group in groups:
+            row = conn.execute("SELECT value FROM counters WHERE name = ? AND grp = ?",
+                               (counter, "" if group is None else group)).fetchone()
+            counts[group] = row[0] if row else 0
+        return counts
+
+    def _counter_for(self, filename: str, where: Dict[str, Any]) -> Optional[str]:
+        # where 조건과 딱 맞는 CountIndex 이름 (없으면 None)
+        for index_name, group_field in COUNTERS.get(filename, {}).items():
+            if (list(where) == [group_field]) if group_field else not where:
+                return index_name
+        return None
+
+    def search(self, filename: str, index_name: str, text: str) -> Dict[Any, float]:
+        index = SECONDARY_INDEXES[filename][index_name]()
+        assert isinstance(index, TextIndex)
+        tokens = tokenize(text)
+        scores: Dict[Any, float] = {}
+        if not tokens:
+            return scores
+        conn = self._conn()
+        for field, weight in index.weights.items():
+            # 토큰마다 기본키 집합을 읽어서 교집합 (한 글자 한글은 그 글자가 들어 있는 토큰 전부)
+            matched = None
+            for token in tokens:
+                if len(token) == 1 and is_hangul(token):
+                    # 한글 토큰은 두 글자 이하라서, 그 글자로 시작하거나 둘째 글자가 그 글자인 토큰이다
+                    sql = (f"SELECT key FROM {filename}_terms WHERE field = ? AND term >= ? AND term < ? "
+                           f"UNION SELECT key FROM {filename}_terms WHERE field = ? AND substr(term, 2) = ?")
+                    params = (field, token, chr(ord(token) + 1), field, token)
+                else:
+                    sql = f"SELECT key FROM {filename}_terms WHERE field = ? AND term = ?"
+                    params = (field, token)
+                keys = {row[0] for row in conn.execute(sql, params)}
+                matched = keys if matched is None else matched & keys
+                if not matched:
+                    break
+            for key in matched or ():
+                scores[key] = scores.get(key, 0) + weight
+        return scores
+
+    def list_page(self, filename: str, *, order_by: str, limit: int, offset: int = 0,
+                  where: Optional[Dict[str, Any]] = None,
+                  after: Optional[Tuple[Any, Any]] = None) -> Tuple[List[Record], int]:
+        where = where or {}
+        conditions = " AND ".join(
+            ["is_deleted = 0"] + [f"{self._column(filename, f)} = ?" for f in where]
+        )
+        params = tuple(where.values())
+        column = self._column(filename, order_by)
+        order = f"{column} DESC, seq ASC"
+
+        # cursor: (값, 기본키) 레코드 다음부터. 인덱스를 타고 그 자리로 바로 간다
+        page_conditions, page_params = conditions, params
+        if after is not None:
+            value, key = after
+            page_conditions += (
+                f" AND ({column} < ? OR ({column} = ? AND seq > "
+                f"(SELECT seq FROM {filename} WHERE {PRIMARY_KEYS[filename]} = ?)))"
+            )
+            page_params += (value, value, key)
+
+        conn = self._conn()
+        rows = self._docs(conn.execute(
+            f"SELECT doc FROM {filename} WHERE {page_conditions} ORDER BY {order} LIMIT ? OFFSET ?",
+            page_params + (limit, offset),
+        ))
+        # 전체 개수는 조건과 맞는 개수 테이블이 있으면 거기서, 없으면 COUNT(*)
+        counter = self._counter_for(filename, where)
+        if counter is not None:
+            group = next(iter(where.values()), None)
+            return rows, self.count(filename, counter, [group])[group]
+        total = conn.execute(f"SELECT COUNT(*) FROM {filename} WHERE {conditions}", params).fetchone()[0]
+        return rows, total
+
+    # =====================
+    # 쓰기
+    # =====================
+    def insert(self, filename: str, record: Record) -> Record:
+        if filename not in TEXT_FIELDS:
+            self._conn().execute(self._sql[filename]["insert"], self._row(filename, record))
+            return record
+        with self._transaction() as conn:
+            conn.execute(self._sql[filename]["insert"], self._row(filename, record))
+            self._index_terms(conn, filename, record)
+        return record
+
+    def update(self, filename: str, key, changes: Dict[str, Any]) -> Optional[Record]:
+        with self._transaction() as conn:
+            row = conn.execute(self._sql[filename]["get"], (key,)).fetchone()
+            if row is None:
+                return None
+            record = json.loads(row[0])
+            record.update(changes)
+            conn.execute(self._sql[filename]["update"], self._row(filename, record) + (key,))
+            if self._touches_terms(filename, changes):
+                self._index_terms(conn, filename, record, replace=True)
+        return record
+
+    def update_many(self, filename: str, changes_by_key: Dict[Any, Dict[str, Any]]) -> int:
+        updated = 0
+        with self._transaction() as conn:
+            for key, changes in changes_by_key.items():
+                row = conn.execute(self._sql[filename]["get"], (key,)).fetchone()
+                if row is None:
+                    continue
+                record = json.loads(row[0])
+                record.update(changes)
+                conn.execute(self._sql[filename]["update"], self._row(filename, record) + (key,))
+                if self._touches_terms(filename, changes):
+                    self._index_terms(conn, filename, record, replace=True)
+                updated += 1
+        return updated
+
+    def soft_delete(self, filename: str, key, changes: Dict[str, Any]) -> Optional[Record]:
+        return self.update(filename, key, {**changes, "is_deleted": True})
+
+    def next_id(self, filename: str) -> int:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT value FROM sequences WHERE name = ?", (filename,)).fetchone()
+            if row is None:
+                # 처음 한 번은 기존 데이터의 최대 id 에서 시작한다
+                current = conn.execute(self._sql[filename]["max_id"]).fetchone()[0] or 0
+                conn.execute("INSERT INTO sequences (name, value) VALUES (?, ?)", (filename, current + 1))
+                return current + 1
+            conn.execute("UPDATE sequences SET value = ? WHERE name = ?", (row[0] + 1, filename))
+            return row[0] + 1
@@ -0,0 +1,22 @@
+import heapq
+from typing import Any, Callable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# =====================
+# 앞쪽 k 개 고르기
+# =====================
+# 목록의 앞 페이지(1~3 페이지)만 필요할 때 전체를 정렬하지 않고 힙으로 앞쪽 k(= offset + limit) 개만 고른다.
+# k 가 전체의 TOPK_MAX_RATIO 보다 크면(깊은 페이지) 힙이 오히려 느려서 전체 정렬로 돌아간다.
+# 경계값은 python -m benchmarks.bench_topk 로 잰 값 (1k~100k 행에서 k/n 이 5~10% 사이에서 역전된다)
+# heapq.nlargest 는 sorted(..., reverse=True)[:k] 와 결과가 같다 (같은 값이면 원래 순서대로) -> 동점 순서도 그대로
+TOPK_MAX_RATIO = 0.05
+
+
+def top(rows: Sequence[T], key: Callable[[T], Any], k: int) -> List[T]:
+    # key 내림차순으로 앞쪽 k 개 (같은 값이면 rows 순서)
+    if k <= 0:
+        return []
+    if k < len(rows) * TOPK_MAX_RATIO:
+        return heapq.nlargest(k, rows, key=key)
+    return sorted(rows, key=key, reverse=True)[:k]
@@ -0,0 +1,143 @@
+import os
+from threading import Lock
+from time import monotonic
+from typing import Any, Dict, Iterable, Optional
+
+# =====================
+# 유저 디렉터리
+# =====================
+# 목록/상세 응답에 작성자 닉네임을 붙이거나 이메일/닉네임 중복을 확인할 때마다 users 전체를 읽지 않도록
+# 유저 공개 정보를 메모리에 계속 들고 있는다.
+# - 처음 쓸 때 users 를 한 번 읽고, 이후에는 signup / update_me / soft_delete_user 가 put() 으로 바로 갱신한다
+# - 다른 워커 프로세스의 가입/수정/탈퇴는 users 저장소의 stamp(utils.data.storage_stamp)가 바뀐 것으로 알아채고
+#   users 를 다시 읽는다
+#   - 로그인 이메일 찾기, 이메일/닉네임 중복 확인은 찾을 때마다 stamp 를 확인한다
+#   - 닉네임 표시(profile / nickname)는 USER_DIRECTORY_RECHECK_SECONDS 마다 한 번만 확인한다
+#     (그 사이에는 다른 워커에서 바꾼 닉네임이 늦게 보일 수 있다)
+# - 저장소를 바꾸거나 users 캐시를 비우면(utils.data.set_backend / clear_cache) 다음에 다시 읽는다
+USER_DIRECTORY_RECHECK_SECONDS = float(os.getenv("USER_DIRECTORY_RECHECK_SECONDS", 1))
+
+UNKNOWN_NICKNAME = "알 수 없음"
+DELETED_NICKNAME = "탈퇴한 사용자"
+
+
+def public_profile(user: Dict[str, Any]) -> Dict[str, Any]:
+    # 다른 사람에게 보여도 되는 필드만
+    deleted = bool(user.get("is_deleted"))
+    return {
+        "userId": user.get("userId"),
+        "nickname": DELETED_NICKNAME if deleted else user.get("nickname", UNKNOWN_NICKNAME),
+        "profile_image": None if deleted else user.get("profile_image"),
+        "is_deleted": deleted,
+    }
+
+
+class UserDirectory:
+    """
+    - profiles: userId -> 공개 프로필 (탈퇴한 유저 포함)
+    - by_email: 소문자 이메일 -> userId (탈퇴하지 않은 유저만)
+    - by_nickname: 소문자 닉네임 -> userId (탈퇴하지 않은 유저만)
+    프로필 dict 는 바꿀 때마다 새로 만들어서 넣고, 다시 읽을 때는 새 dict 를 다 채운 뒤 바꿔 끼우므로
+    읽는 쪽은 잠금 없이 쓴다.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._loaded = False
+        self._stamp = None  # 마지막으로 맞춘 users 저장소의 stamp
+        self._checked = 0.0  # 마지막으로 stamp 를 확인한 시각 (monotonic)
+        self.profiles: Dict[str, Dict[str, Any]] = {}
+        self.by_email: Dict[str, str] = {}
+        self.by_nickname: Dict[str, str] = {}
+        self._keys: Dict[str, tuple] = {}  # userId -> 지금 등록된 (이메일, 닉네임) 키 (바뀌면 예전 키를 지운다)
+
+    def _ensure_loaded(self, fresh: bool = True):
+        # fresh 가 아니면 USER_DIRECTORY_RECHECK_SECONDS 안에 확인했을 때 stamp 를 다시 보지 않는다
+        if self._loaded and not fresh and monotonic() - self._checked < USER_DIRECTORY_RECHECK_SECONDS:
+            return
+        from utils.data import load_data, storage_stamp
+        stamp = storage_stamp("users")
+        self._checked = monotonic()
+        if self._loaded and stamp == self._stamp:
+            return
+        with self._lock:
+            if self._loaded and stamp == self._stamp:
+                return
+            # stamp 를 먼저 읽었으므로, 읽는 도중 바뀐 것은 다음 확인 때 다시 읽는다
+            loaded = UserDirectory()
+            for user in load_data("users"):
+                loaded._put(user)
+            self.profiles, self.by_email, self.by_nickname, self._keys = (
+                loaded.profiles, loaded.by_email, loaded.by_nickname, loaded._keys)
+            self._stamp = stamp
+            self._loaded = True
+
+    def _put(self, user: Dict[str, Any]):
+        user_id = user.get("userId")
+        if user_id is None:
+            return
+        email, nickname = self._keys.pop(user_id, (None, None))
+        if self.by_email.get(email) == user_id:
+            del self.by_email[email]
+        if self.by_nickname.get(nickname) == user_id:
+            del self.by_nickname[nickname]
+
+        self.profiles[user_id] = public_profile(user)
+        if user.get("is_deleted"):
+            return
+        email = (user.get("email") or "").lower() or None
+        nickname = (user.get("nickname") or "").lower() or None
+        if email:
+            self.by_email[email] = user_id
+        if nickname:
+            self.by_nickname[nickname] = user_id
+        self._keys[user_id] = (email, nickname)
+
+    def refresh(self):
+        # users 를 쓰기 전에 (users 쓰기 잠금 안에서) 다른 워커의 변경까지 맞춰 둔다
+        self._ensure_loaded()
+
+    def put(self, user: Optional[Dict[str, Any]]):
+        # 가입 / 정보 수정 / 탈퇴 후 저장된 유저 레코드로 갱신 (쓰기 전에 refresh() 한 users 쓰기 잠금 안에서 부른다).
+        # 쓰기 직전에 stamp 를 맞췄으므로 지금 stamp 는 이 쓰기만큼만 바뀐 값이다 (다시 읽지 않는다)
+        if user is None:
+            return
+        from utils.data import mark_changed, storage_stamp
+        with self._lock:
+            if self._loaded:
+                self._put(user)
+                self._stamp = storage_stamp("users")
+        # 닉네임이 들어간 응답 캐시는 디렉터리까지 바뀐 뒤에 무효화되어야 한다
+        mark_changed("users")
+
+    def reset(self):
+        with self._lock:
+            self._loaded = False
+            self._stamp = None
+            self.profiles, self.by_email, self.by_nickname, self._keys = {}, {}, {}, {}
+
+    # =====================
+    # 조회
+    # =====================
+    def profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        self._ensure_loaded(fresh=False)
+        return self.profiles.get(user_id)
+
+    def nickname(self, user_id: str) -> str:
+        # 응답에 붙일 작성자 닉네임 (탈퇴했으면 "탈퇴한 사용자", 없으면 "알 수 없음")
+        profile = self.profile(user_id)
+        return profile["nickname"] if profile else UNKNOWN_NICKNAME
+
+    def nicknames(self, user_ids: Iterable[str]) -> Dict[str, str]:
+        return {user_id: self.nickname(user_id) for user_id in user_ids}
+
+    def user_id_by_email(self, email: str) -> Optional[str]:
+        self._ensure_loaded()
+        return self.by_email.get(email.lower())
+
+    def user_id_by_nickname(self, nickname: str) -> Optional[str]:
+        self._ensure_loaded()
+        return self.by_nickname.get(nickname.lower())
+
+
+user_directory = UserDirectory()
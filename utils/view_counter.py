@@ -0,0 +1,106 @@
+import os
+import logging
+from threading import Event, Lock, Thread
+from typing import Dict, Optional
+
+from utils.data import get_record, transaction, update_records
+
+logger = logging.getLogger(__name__)
+
+# =====================
+# 조회수 버퍼
+# =====================
+# 게시글 상세 조회마다 posts 를 다시 쓰지 않고, 늘어난 조회수를 메모리에 모아 두었다가 한 번에 저장한다.
+# - VIEW_FLUSH_THRESHOLD 번 쌓이거나 VIEW_FLUSH_INTERVAL 초가 지나면 백그라운드 스레드가 저장
+# - 프로세스가 갑자기 죽으면 아직 저장 안 된 조회수(대략 threshold 개 또는 interval 초 분량)만 잃는다
+# - 상세 조회 응답은 저장된 값 + 아직 저장 안 된 값을 더해서 보여준다
+#   (목록의 조회수 정렬은 저장된 값 기준이라 최대 한 번의 flush 만큼 늦을 수 있다)
+VIEW_FLUSH_INTERVAL = float(os.getenv("VIEW_FLUSH_INTERVAL", 5))
+VIEW_FLUSH_THRESHOLD = int(os.getenv("VIEW_FLUSH_THRESHOLD", 100))
+
+
+class ViewCounter:
+    def __init__(self, flush_interval: float = VIEW_FLUSH_INTERVAL,
+                 flush_threshold: int = VIEW_FLUSH_THRESHOLD):
+        self.flush_interval = flush_interval
+        self.flush_threshold = max(1, flush_threshold)
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._pending: Dict[int, int] = {}   # postId -> 아직 저장 안 된 조회수
+        self._inflight: Dict[int, int] = {}  # 저장 중인 조회수 (저장이 끝나기 전까지는 계속 더해서 보여준다)
+        self._count = 0
+        self._stop = Event()
+        self._wake = Event()
+        self._thread: Optional[Thread] = None
+
+    def increment(self, post_id: int) -> int:
+        # 조회수 1 증가. 이 게시글에 아직 저장 안 된 조회수를 돌려준다
+        self._start()
+        with self._lock:
+            self._pending[post_id] = self._pending.get(post_id, 0) + 1
+            self._count += 1
+            delta = self._pending[post_id] + self._inflight.get(post_id, 0)
+            if self._count >= self.flush_threshold:
+                # 요청 스레드에서 직접 쓰지 않고 백그라운드 스레드를 깨운다
+                self._wake.set()
+        return delta
+
+    def pending(self, post_id: int) -> int:
+        with self._lock:
+            return self._pending.get(post_id, 0) + self._inflight.get(post_id, 0)
+
+    def flush(self) -> int:
+        # 모아 둔 조회수를 한 번의 쓰기로 저장한다. 저장한 게시글 수
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                self._inflight, self._pending = self._pending, {}
+                self._count = 0
+            try:
+                # 읽고 더해서 쓰는 사이에 다른 posts 쓰기(좋아요 수 등)가 끼어들지 않도록 잠근다
+                with transaction(write=["posts"]):
+                    changes = {}
+                    for post_id, delta in self._inflight.items():
+                        post = get_record("posts", post_id)
+                        if post is not None:
+                            changes[post_id] = {"viewCount": post.get("viewCount", 0) + delta}
+                    updated = update_records("posts", changes)
+                    # 저장된 값에 이미 들어갔으므로 posts 잠금을 풀기 전에 비운다
+                    # (풀고 나서 비우면 그 사이의 상세 조회가 같은 조회수를 두 번 더해서 보여준다)
+                    with self._lock:
+                        self._inflight = {}
+                    return updated
+            except Exception:
+                # 저장에 실패하면 다음 flush 때 다시 시도한다
+                logger.exception("조회수 저장 실패")
+                with self._lock:
+                    for post_id, delta in self._inflight.items():
+                        self._pending[post_id] = self._pending.get(post_id, 0) + delta
+                        self._count += delta
+                    self._inflight = {}
+                return 0
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = Thread(target=self._run, name="view-counter", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        # 서버 종료 시 남은 조회수 저장
+        self._stop.set()
+        self._wake.set()
+        self.flush()
+
+
+view_counter = ViewCounter()